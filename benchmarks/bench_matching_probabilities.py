@@ -0,0 +1,82 @@
+"""Benchmark the row-wise and the vectorized matching probability intervals.
+
+Run with `python benchmarks/bench_matching_probabilities.py [--rows N]`.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from liss_cleaning.make_final_datasets.cleaners.matching_probabilities import (
+    BISECTION_TREE,
+    _get_interval,
+    _get_interval_bounds,
+)
+
+OPTION = "e0"
+
+SHARE_SKIPPED = 0.1
+
+SHARE_MISSING = 0.01
+
+
+def make_synthetic_choices(n_rows, seed=0):
+    """Simulate answers of respondents with a random matching probability.
+
+    Respondents walk down the bisection tree, answering "AEX" whenever their matching
+    probability exceeds the lottery probability. A share of respondents skips the
+    module entirely and some answers are missing at random.
+    """
+    rng = np.random.default_rng(seed)
+    matching_probability = rng.random(n_rows)
+    answers = {probability: np.full(n_rows, None) for probability in BISECTION_TREE}
+    node = np.full(n_rows, "50", dtype=object)
+    for _ in range(4):
+        for probability in BISECTION_TREE:
+            at_node = node == probability
+            chooses_aex = matching_probability > int(probability) / 100
+            answers[probability][at_node] = np.where(
+                chooses_aex[at_node], "AEX", "Lottery"
+            )
+            aex_child, lottery_child = BISECTION_TREE[probability]
+            next_node = np.where(chooses_aex, str(aex_child), str(lottery_child))
+            node = np.where(at_node, next_node, node)
+    skipped = rng.random(n_rows) < SHARE_SKIPPED
+    dtype = pd.CategoricalDtype(categories=["AEX", "Lottery"])
+    choices = {}
+    for probability, values in answers.items():
+        values[skipped | (rng.random(n_rows) < SHARE_MISSING)] = None
+        choices[f"choice_aex_{OPTION}_vs_{probability}"] = pd.Series(
+            values, dtype=dtype
+        )
+    return pd.DataFrame(choices)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    choices = make_synthetic_choices(args.rows)
+
+    start = time.perf_counter()
+    row_wise = choices.apply(lambda x: _get_interval(x, OPTION), axis=1)
+    time_row_wise = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lower, upper = _get_interval_bounds(choices, OPTION)
+    time_vectorized = time.perf_counter() - start
+
+    expected = row_wise.apply(lambda x: (np.nan, np.nan) if x is pd.NA else x).tolist()
+    np.testing.assert_array_equal(np.array(expected), np.column_stack([lower, upper]))
+
+    print(f"rows:        {args.rows:,}")  # noqa: T201
+    print(f"row-wise:    {time_row_wise:.2f}s")  # noqa: T201
+    print(f"vectorized:  {time_vectorized:.3f}s")  # noqa: T201
+    print(f"speed-up:    {time_row_wise / time_vectorized:.0f}x")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Benchmark the yearly aggregation of the monthly background variables.
+
+Compares the single-pass aggregation engine of `yearly_background_variables` against
+the previous implementation, which ran one groupby-transform per column at the monthly
+grain and aligned the results to the first month of each person-year. The engine
+agrees with it wherever that first month was observed. The previous implementation used
+"first" instead of "mode", so those columns are not compared; instead the mode kernel
+is timed against "first".
+
+Run with `python benchmarks/bench_yearly_background_variables.py [--persons N]`.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from liss_cleaning.helper_modules.general_cleaners import (
+    _apply_lowest_float_dtype,
+    _apply_lowest_int_dtype,
+)
+from liss_cleaning.make_final_datasets.cleaners.yearly_background_variables import (
+    YEARLY_AGGREGATIONS,
+    _aggregate_by_index,
+    clean_dataset,
+)
+
+INDEX = ["personal_id", "year"]
+
+YEARS = range(2008, 2024)
+
+SHARE_MISSING = 0.05
+
+
+def make_synthetic_panel(n_persons, years=YEARS, seed=0):
+    """Simulate a stacked monthly background variables panel with missing values."""
+    rng = np.random.default_rng(seed)
+    year_months = [f"{year}-{month:02d}" for year in years for month in range(1, 13)]
+    n_rows = n_persons * len(year_months)
+    panel = pd.DataFrame(
+        {
+            "personal_id": np.repeat(
+                rng.choice(1_000_000, n_persons, replace=False), len(year_months)
+            ),
+            "year_month": np.tile(year_months, n_persons),
+        }
+    )
+    panel["year"] = panel["year_month"].str[:4].astype("uint16[pyarrow]")
+    panel["month"] = panel["year_month"].str[5:].astype("uint8[pyarrow]")
+    for column, (_, dtype) in YEARLY_AGGREGATIONS.items():
+        if dtype == "category":
+            labels = [f"{column}_{i}" for i in range(6)]
+            values = pd.Categorical(rng.choice(labels, n_rows), categories=labels)
+        elif dtype == "int":
+            values = pd.array(rng.integers(18, 90, n_rows), dtype="uint8[pyarrow]")
+        else:
+            values = pd.array(rng.normal(3000, 1000, n_rows), dtype="float64[pyarrow]")
+        panel[column] = values
+        panel.loc[rng.random(n_rows) < SHARE_MISSING, column] = np.nan
+    return panel
+
+
+def make_synthetic_assets(panel):
+    """Simulate the yearly assets data for the persons of the panel."""
+    rng = np.random.default_rng(1)
+    assets = panel[["personal_id"]].drop_duplicates()
+    assets = assets.merge(pd.DataFrame({"year": YEARS}), how="cross")
+    assets["total_wealth"] = rng.normal(50_000, 10_000, len(assets))
+    assets["has_risky_assets"] = rng.choice(["Yes", "No"], len(assets))
+    assets["share_risky_assets"] = rng.random(len(assets))
+    return assets
+
+
+def legacy_aggregation(raw):
+    """Aggregate the monthly panel to years with one groupby-transform per column."""
+    raw = raw.reset_index(drop=False)
+    df = pd.DataFrame()
+    df["personal_id"] = _apply_lowest_int_dtype(raw["personal_id"])
+    df["year"] = pd.to_numeric(raw["year_month"].apply(lambda x: x.split("-")[0]))
+    df = df.drop_duplicates(subset=INDEX, keep="first")
+    raw["year"] = pd.to_numeric(raw["year_month"].apply(lambda x: x.split("-")[0]))
+    for column, (how, dtype) in YEARLY_AGGREGATIONS.items():
+        values = (
+            raw.dropna(subset=[column])
+            .groupby(INDEX)[column]
+            .transform("first" if how == "mode" else how)
+        )
+        if dtype == "int":
+            df[column] = _apply_lowest_int_dtype(
+                values.round() if how == "median" else values
+            )
+        elif dtype == "float":
+            df[column] = _apply_lowest_float_dtype(values)
+        else:
+            df[column] = values
+            df[column] = df[column].astype("category")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--persons", type=int, default=10_000)
+    args = parser.parse_args()
+
+    panel = make_synthetic_panel(args.persons)
+    assets = make_synthetic_assets(panel)
+
+    start = time.perf_counter()
+    legacy = legacy_aggregation(panel)
+    time_legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = clean_dataset(panel, assets)
+    time_engine = time.perf_counter() - start
+
+    legacy = legacy.sort_values(INDEX, ignore_index=True)
+    for column, (how, _) in YEARLY_AGGREGATIONS.items():
+        if how == "mode":
+            continue
+        observed = legacy[column].notna()
+        pd.testing.assert_series_equal(
+            result.loc[observed, column], legacy.loc[observed, column]
+        )
+
+    mode_aggregations = {
+        column: spec
+        for column, spec in YEARLY_AGGREGATIONS.items()
+        if spec[0] == "mode"
+    }
+    first_aggregations = {
+        column: ("first", dtype) for column, (_, dtype) in mode_aggregations.items()
+    }
+    start = time.perf_counter()
+    _aggregate_by_index(panel, INDEX, mode_aggregations)
+    time_mode = time.perf_counter() - start
+    start = time.perf_counter()
+    _aggregate_by_index(panel, INDEX, first_aggregations)
+    time_first = time.perf_counter() - start
+
+    print(f"monthly rows:  {len(panel):,}")  # noqa: T201
+    print(f"transform:     {time_legacy:.2f}s")  # noqa: T201
+    print(f"clean_dataset: {time_engine:.2f}s")  # noqa: T201
+    print(f"{len(mode_aggregations)} categoricals, first: {time_first:.2f}s")  # noqa: T201
+    print(f"{len(mode_aggregations)} categoricals, mode:  {time_mode:.2f}s")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,10 @@ SRC_RAW_DATASETS_CLEANING = SRC / "raw_datasets_cleaning"
 SRC_EXTRA_DATASETS_CLEANING = SRC / "make_final_datasets"
 BLD = SRC.joinpath("../..", "bld").resolve()
 BLD_CLEANED_DATA = BLD / "individual_wave"
+BLD_RAW_CACHE = BLD / "raw_cache"
+BLD_RAW_INDEX = BLD / "raw_index.json"
+BLD_RAW_INVENTORY = BLD / "raw_inventory.json"
+BLD_STACKED = BLD / "stacked"
 
 TEST_DIR = SRC.joinpath("..", "tests").resolve()
 
@@ -15,6 +19,10 @@ TEST_DIR = SRC.joinpath("..", "tests").resolve()
 __all__ = [
     "BLD",
     "BLD_CLEANED_DATA",
+    "BLD_RAW_CACHE",
+    "BLD_RAW_INDEX",
+    "BLD_RAW_INVENTORY",
+    "BLD_STACKED",
     "SRC",
     "TEST_DIR",
 ]
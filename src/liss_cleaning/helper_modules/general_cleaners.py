@@ -27,6 +27,44 @@ def _handle_missing_column(df: pd.DataFrame, column_name: str) -> dict:
     }
 
 
+def filter_complete_panel(
+    df: pd.DataFrame,
+    question_cols: list,
+    min_waves: int,
+    id_col: str = "personal_id",
+    wave_col: str = "wave",
+) -> pd.DataFrame:
+    """Keep the respondents who answered all questions in at least `min_waves` waves.
+
+    A respondent-wave is dropped if any of its rows misses an answer to one of the
+    question columns. A respondent is then dropped if fully observed rows, i.e. rows
+    with no missing value in any column other than the identifiers, remain in fewer
+    than `min_waves` distinct waves.
+
+    Args:
+        df(pd.DataFrame): the panel, with one or more rows per respondent and wave.
+        question_cols(list): the columns that must be answered in a respondent-wave.
+        min_waves(int): the minimum number of distinct waves with a fully observed
+            row per respondent.
+        id_col(str): the respondent identifier column.
+        wave_col(str): the wave identifier column.
+
+    Returns:
+        pd.DataFrame: the rows of the eligible respondents, in their original order.
+    """
+    keys = [df[id_col], df[wave_col]]
+    has_keys = df[[id_col, wave_col]].notna().all(axis=1)
+
+    answered = df[question_cols].notna().all(axis=1)
+    answered_wave = answered.groupby(keys, dropna=False).transform("all")
+    df = df[answered_wave & has_keys]
+
+    complete = df.drop(columns=[id_col, wave_col]).notna().all(axis=1)
+    complete_waves = df[wave_col].where(complete)
+    n_waves = complete_waves.groupby(df[id_col]).transform("nunique")
+    return df[n_waves >= min_waves]
+
+
 def _replace_values(value, replacing_dict):
     """Replaces values in a series.
 
@@ -83,31 +121,63 @@ def _replace_mixed_categoricals_floats(
 def _categorical_to_float(series: pd.Series, nan_entries: list) -> pd.Series:
     """Convert a categorical series to float.
 
+    The category labels are parsed once and the codes of the series are mapped to the
+    parsed values, so the cost grows with the number of categories, not of rows.
+
     Args:
         series(pd.Series): the series to convert.
         nan_entries(list): the categories to convert to NaN.
-        changing_categories(bool): whether some of the categories miss in some waves.
 
     Returns:
         series(pd.Series): the converted series.
+
+    Raises:
+        ValueError: if labels of categories in the series, other than the nan_entries,
+        cannot be parsed to numbers. All of them are listed.
     """
-    nan_entries = _handle_changing_na_categories(series, nan_entries)
-    series = series.cat.remove_categories(nan_entries)
-    series = series.apply(lambda x: pd.to_numeric(x))
-    return _apply_lowest_float_dtype(series)
+    codes = series.cat.codes.to_numpy()
+    is_used = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories)) > 0
+    values, unparseable = _parse_category_labels(
+        series.cat.categories, set(nan_entries), is_used
+    )
+    if unparseable:
+        msg = (
+            f"Cannot convert the categories of {series.name!r} to float, the labels "
+            f"{unparseable} are not numbers."
+        )
+        raise ValueError(msg)
+    floats = np.append(values, np.nan)[codes]
+    return _apply_lowest_float_dtype(
+        pd.Series(floats, index=series.index, name=series.name)
+    )
 
 
-def _handle_changing_na_categories(series: pd.Series, nan_entries: list) -> pd.Series:
-    if not set(nan_entries).issubset(set(series.unique())):
-        series_values = series.unique()
-        series_values = [x for x in series_values if x is not pd.NA]
-        nan_entries = [x for x in nan_entries if x in series_values]
-    return nan_entries
+def _parse_category_labels(
+    labels: pd.Index, nan_entries: set, is_used: np.ndarray
+) -> tuple[np.ndarray, list]:
+    """Parse category labels to floats.
+
+    Returns the parsed values, NaN for the nan_entries, and the used labels that
+    cannot be parsed.
+    """
+    values = np.full(len(labels), np.nan)
+    unparseable = []
+    for i, label in enumerate(labels):
+        if label in nan_entries:
+            continue
+        try:
+            values[i] = pd.to_numeric(label)
+        except (ValueError, TypeError):
+            if is_used[i]:
+                unparseable.append(label)
+    return values, unparseable
 
 
 def _replace_rename_categorical_column(
     series: pd.Series,
     renaming_dict: dict,
+    *,
+    dtype: pd.CategoricalDtype | None = None,
     is_ordered: bool = False,
     is_missing: bool = False,
 ) -> pd.Series:
@@ -117,8 +187,12 @@ def _replace_rename_categorical_column(
 
     Args:
         series(pd.Series): the series to replace and rename.
-        renaming_dict(dict): the dictionary with the values to replace and rename.
-        is_ordered(bool): whether the categories should be ordered.
+        renaming_dict(dict): the dictionary with the values to replace and rename. The
+        new categories are ordered as they first appear among its values.
+        dtype(pd.CategoricalDtype): the dtype of the recoded column, as compiled by
+        _compile_recoding. Built from the renaming_dict if None.
+        is_ordered(bool): whether the categories should be ordered. Only used if dtype
+        is None.
         is_missing(bool): whether the column is missing in the dataset. This is used to
         handle loops over survey waves that may not have a query. Use
         _handle_missing_column if this is the case-. Otherwise, if the query is present
@@ -128,52 +202,362 @@ def _replace_rename_categorical_column(
         series(pd.Series): the series with the replaced and renamed values.
     """
     if not is_missing:
+        if dtype is None:
+            dtype = _get_recode_dtype(renaming_dict, is_ordered=is_ordered)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return _recode_categorical_column(series, renaming_dict, dtype)
         series = series.astype(str)
         series = series.str.lower()
         series = series.map(renaming_dict)
-        new_categories = set(renaming_dict.values()) - {pd.NA} - {np.nan}
-        old_categories_not_renamed = (
-            set(series.unique()) - new_categories - {pd.NA} - {np.nan}
-        )
-        if len(old_categories_not_renamed) > 0:
-            warnings.warn(
-                f"Categories {old_categories_not_renamed} from the raw data "
-                "not found in the renaming dictionary. "
-                "The missing categories will become pd.NA, check if this is intended.",
-                stacklevel=2,
-            )
-        series = pd.Categorical(series, categories=new_categories, ordered=is_ordered)
-        return pd.Series(series)
+        _warn_categories_not_renamed(set(series.unique()), dtype, stacklevel=3)
+        return pd.Series(pd.Categorical(series, dtype=dtype))
     return series
 
 
+def _compile_recoding(renaming_dict: dict, *, is_ordered: bool = False) -> dict:
+    """Compile a renaming dictionary with the dtype of the recoded column.
+
+    Args:
+        renaming_dict(dict): the dictionary with the values to replace and rename.
+        is_ordered(bool): whether the categories should be ordered.
+
+    Returns:
+        dict: the keyword arguments renaming_dict and dtype of
+        _replace_rename_categorical_column.
+    """
+    return {
+        "renaming_dict": renaming_dict,
+        "dtype": _get_recode_dtype(renaming_dict, is_ordered=is_ordered),
+    }
+
+
+def _get_recode_dtype(renaming_dict: dict, *, is_ordered: bool) -> pd.CategoricalDtype:
+    """Get the dtype of a recoded column, the same for every wave.
+
+    Args:
+        renaming_dict(dict): the dictionary with the values to replace and rename.
+        is_ordered(bool): whether the categories should be ordered.
+
+    Returns:
+        pd.CategoricalDtype: the dtype, with the non-missing values as categories in
+        the order of their first appearance.
+    """
+    categories = dict.fromkeys(
+        value for value in renaming_dict.values() if not pd.isna(value)
+    )
+    return pd.CategoricalDtype(list(categories), ordered=is_ordered)
+
+
+def _recode_categorical_column(
+    series: pd.Series, renaming_dict: dict, dtype: pd.CategoricalDtype
+) -> pd.Series:
+    """Recode a categorical series by renaming its categories instead of its values.
+
+    Gives the same result as the string path of _replace_rename_categorical_column:
+    the categories are converted to lower-case strings and renamed, missing values
+    are renamed like the string "nan", and the codes are remapped with a take.
+    """
+    labels = pd.Series(series.cat.categories).astype(str)
+    labels = pd.Series([*labels, "nan"]).str.lower()
+    renamed = labels.map(renaming_dict)
+    # Missing values have code -1, which takes the renamed "nan" label at the end.
+    codes = series.cat.codes.to_numpy()
+    used = np.unique(codes)
+    _warn_categories_not_renamed(set(renamed.iloc[used].unique()), dtype, stacklevel=4)
+    label_codes = dtype.categories.get_indexer(renamed)
+    return pd.Series(pd.Categorical.from_codes(label_codes[codes], dtype=dtype))
+
+
+def _warn_categories_not_renamed(
+    values: set, dtype: pd.CategoricalDtype, stacklevel: int
+) -> None:
+    """Warn about renamed values that are not among the new categories."""
+    old_categories_not_renamed = values - set(dtype.categories) - {pd.NA} - {np.nan}
+    if len(old_categories_not_renamed) > 0:
+        warnings.warn(
+            f"Categories {old_categories_not_renamed} from the raw data "
+            "not found in the renaming dictionary. "
+            "The missing categories will become pd.NA, check if this is intended.",
+            stacklevel=stacklevel,
+        )
+
+
 def _handle_inconsistent_column_code_in_raw(
     pre_change_code: int | str,
     post_change_code: int | str,
     year_switch: int,
     year_current_df: int,
 ) -> int:
-    """Handle the case where the column code in the raw data changes between survey
-    waves.
-    """
+    """Get the column code of a wave, if the code changes between survey waves."""
     if int(year_current_df) >= int(year_switch):
         return str(post_change_code)
     return str(pre_change_code)
 
 
+# The codes of missing values in the numeric answers of each survey.
+MISSING_SENTINELS = {
+    "economic_situation_income": (9999999999, 9999999998),
+    "economic_situation_assets": (
+        np.nan,
+        9999999999.0,
+        99999999998.0,
+        99999999999.0,
+        9999999998.0,
+        -9999999999.0,
+        -9999999998.0,
+        -8,
+        -9,
+    ),
+}
+
+
+def _compile_column_table(
+    prefix: str, column_time_identifier: str, column_codes: dict
+) -> dict:
+    """Resolve the raw column of each variable in one wave.
+
+    Args:
+        prefix(str): the prefix of the raw column names, e.g. "ci".
+        column_time_identifier(str): the wave identifier in the raw column names,
+            e.g. "08a".
+        column_codes(dict): the code of the raw column of each variable, or a tuple
+            (pre_change_code, post_change_code, year_switch) if the code changed
+            between waves.
+
+    Returns:
+        dict: the raw column name of each variable.
+    """
+    year = int(f"20{column_time_identifier[0:2]}")
+    table = {}
+    for variable, code in column_codes.items():
+        if isinstance(code, tuple):
+            resolved = _handle_inconsistent_column_code_in_raw(*code, year)
+        else:
+            resolved = code
+        table[variable] = f"{prefix}{column_time_identifier}{resolved}"
+    return table
+
+
+def _select_columns(
+    raw: pd.DataFrame, column_table: dict, optional: tuple = ()
+) -> pd.DataFrame:
+    """Select the raw columns of a wave and name them by variable.
+
+    Args:
+        raw(pd.DataFrame): the raw data.
+        column_table(dict): the raw column name of each variable.
+        optional(tuple): the variables whose raw column may be missing.
+
+    Returns:
+        pd.DataFrame: the columns of the variables that are in the raw data.
+
+    Raises:
+        KeyError: if the raw columns of required variables are missing, listing all
+            of them.
+    """
+    present = {
+        variable: column
+        for variable, column in column_table.items()
+        if column in raw.columns
+    }
+    missing = [
+        f"{variable} ({column})"
+        for variable, column in column_table.items()
+        if variable not in present and variable not in optional
+    ]
+    if missing:
+        msg = f"Raw columns missing for the variables: {', '.join(missing)}."
+        raise KeyError(msg)
+    selected = raw[list(present.values())]
+    selected.columns = list(present)
+    return selected
+
+
 def _replace_missing_floats(series: pd.Series, float_nan_values: list) -> pd.Series:
     """Replace missing floats in a series.
 
     Args:
         series(pd.Series): the series to replace missing floats in.
-        float_nan_values(list): the values to replace with NaN.
+        float_nan_values(list): the values to replace with NaN, e.g. an entry of
+        MISSING_SENTINELS.
 
     Returns:
         series(pd.Series): the series with the missing floats replaced.
     """
-    for value in float_nan_values:
-        series = series.replace(value, pd.NA)
-    return series
+    mask = _get_sentinel_mask(series, float_nan_values)
+    if not mask.any():
+        return series
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf":
+        values = series.to_numpy(dtype=np.float64, copy=True)
+        values[mask] = np.nan
+        return pd.Series(values, index=series.index, name=series.name)
+    return series.mask(mask, pd.NA)
+
+
+def _get_sentinel_mask(series: pd.Series, sentinels: list) -> np.ndarray:
+    """Get a boolean mask of the values of a series that are missing-value sentinels.
+
+    NaN among the sentinels marks all missing values of the series.
+    """
+    has_nan = any(pd.isna(sentinel) for sentinel in sentinels)
+    sentinels = [sentinel for sentinel in sentinels if not pd.isna(sentinel)]
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf":
+        values = series.to_numpy()
+        mask = np.isin(values, sentinels)
+        if has_nan and values.dtype.kind == "f":
+            mask |= np.isnan(values)
+        return mask
+    mask = series.isin(sentinels).to_numpy(dtype=bool, na_value=False)
+    if has_nan:
+        mask |= series.isna().to_numpy()
+    return mask
+
+
+# The smallest integer dtypes first, with the range of values they hold.
+INT_DTYPE_BOUNDS = (
+    (0, 255, "uint8[pyarrow]"),
+    (0, 65535, "uint16[pyarrow]"),
+    (0, 4294967295, "uint32[pyarrow]"),
+    (-128, 127, "int8[pyarrow]"),
+    (-32768, 32767, "int16[pyarrow]"),
+    (-2147483648, 2147483647, "int32[pyarrow]"),
+)
+
+# The largest values held by uint32, above which a non-negative column is uint64,
+# and by float32.
+UINT32_MAX = 4294967295
+FLOAT32_MAX = 3.4028235e38
+
+# The largest change of an amount in euros by storing it as float32, half a cent.
+CURRENCY_TOLERANCE = 0.005
+
+NARROW_KINDS = ("int", "float", "currency")
+
+
+def narrow_dtypes(
+    df: pd.DataFrame,
+    spec: dict,
+    *,
+    return_report: bool = False,
+    currency_tolerance: float = CURRENCY_TOLERANCE,
+) -> pd.DataFrame | tuple[pd.DataFrame, pd.DataFrame]:
+    """Cast numeric columns of a dataframe to the lowest dtype that holds them.
+
+    The minimum, maximum and presence of missing values of all columns in spec are
+    computed in one reduction, and the dataframe is cast in one astype call. The
+    dtypes of "int" and "float" columns are chosen as by _find_lowest_int_dtype and
+    _find_lowest_float_dtype. "currency" columns are stored as float32 if no value
+    changes by more than currency_tolerance, whether or not values are missing.
+
+    Args:
+        df(pd.DataFrame): the dataframe to narrow.
+        spec(dict): maps the columns to narrow to "int", "float" or "currency".
+        return_report(bool): whether to also return a report of the memory saved.
+        currency_tolerance(float): the largest change of a value allowed by storing a
+        "currency" column as float32.
+
+    Returns:
+        df(pd.DataFrame): the narrowed dataframe, the other columns are unchanged.
+        report(pd.DataFrame): only if return_report, the dtype and bytes before and
+        after narrowing, and the bytes saved, of each column in spec.
+
+    Raises:
+        ValueError: if a kind in spec is not "int", "float" or "currency".
+    """
+    invalid = {kind for kind in spec.values() if kind not in NARROW_KINDS}
+    if invalid:
+        msg = f"Kinds must be one of {NARROW_KINDS}, got {sorted(invalid)}."
+        raise ValueError(msg)
+    columns = list(spec)
+    values = _get_numeric_values([df[column] for column in columns])
+    minima, maxima, has_na = _get_numeric_stats(values)
+    currency = [i for i, column in enumerate(columns) if spec[column] == "currency"]
+    float32_errors = dict(
+        zip(currency, _get_float32_errors(values[:, currency]), strict=True)
+    )
+    dtypes = {}
+    for i, column in enumerate(columns):
+        if i in float32_errors:
+            is_exact = not float32_errors[i] > currency_tolerance
+            dtypes[column] = "float32[pyarrow]" if is_exact else "float64[pyarrow]"
+        else:
+            dtypes[column] = _get_narrow_dtype(
+                spec[column], minima[i], maxima[i], has_na=has_na[i]
+            )
+    narrowed = df.astype(dtypes)
+    if not return_report:
+        return narrowed
+    bytes_before = df[columns].memory_usage(index=False, deep=True)
+    bytes_after = narrowed[columns].memory_usage(index=False, deep=True)
+    report = pd.DataFrame(
+        {
+            "dtype_before": df[columns].dtypes.astype(str),
+            "dtype_after": narrowed[columns].dtypes.astype(str),
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "bytes_saved": bytes_before - bytes_after,
+        }
+    )
+    return narrowed, report
+
+
+def _get_numeric_values(columns: list[pd.Series]) -> np.ndarray:
+    """Copy series of equal length to the columns of one float64 array.
+
+    Missing values are NaN.
+    """
+    n_rows = len(columns[0]) if columns else 0
+    values = np.empty((n_rows, len(columns)), dtype=np.float64, order="F")
+    for i, column in enumerate(columns):
+        if isinstance(column.dtype, np.dtype) and column.dtype.kind in "biuf":
+            values[:, i] = column.to_numpy()
+        else:
+            values[:, i] = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    return values
+
+
+def _get_numeric_stats(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get the minimum, maximum and presence of missing values of array columns.
+
+    The three are computed in one reduction. Minimum and maximum ignore missing
+    values and are NaN for columns without values.
+    """
+    if not len(values):
+        nan = np.full(values.shape[1], np.nan)
+        return nan, nan, np.zeros(values.shape[1], dtype=bool)
+    return (
+        np.fmin.reduce(values, axis=0),
+        np.fmax.reduce(values, axis=0),
+        np.isnan(values).any(axis=0),
+    )
+
+
+def _get_float32_errors(values: np.ndarray) -> np.ndarray:
+    """Get the largest change of a value of each array column by storing it as float32.
+
+    Missing values are ignored, columns without values have NaN.
+    """
+    if not len(values):
+        return np.full(values.shape[1], np.nan)
+    with np.errstate(over="ignore", invalid="ignore"):
+        rounded = values.astype(np.float32).astype(np.float64)
+        return np.fmax.reduce(np.abs(rounded - values), axis=0)
+
+
+def _get_narrow_dtype(
+    kind: str, minimum: float, maximum: float, *, has_na: bool
+) -> str:
+    """Get the lowest dtype of a kind ("int" or "float") that holds a column."""
+    if kind == "float":
+        if not has_na and minimum >= 0 and maximum <= FLOAT32_MAX:
+            return "float32[pyarrow]"
+        return "float64[pyarrow]"
+    if minimum >= 0 and maximum > UINT32_MAX:
+        return "uint64[pyarrow]"
+    for lower, upper, dtype in INT_DTYPE_BOUNDS:
+        if minimum >= lower and maximum <= upper:
+            return dtype
+    return "int64[pyarrow]"
 
 
 def _find_lowest_int_dtype(sr: pd.Series) -> str:
@@ -186,23 +570,8 @@ def _find_lowest_int_dtype(sr: pd.Series) -> str:
         str: The lowest integer dtype.
 
     """
-    if "float" in sr.dtype.name:
-        sr = sr.astype("float[pyarrow]")
-    if sr.min() >= 0:
-        if sr.max() <= 255:
-            return "uint8[pyarrow]"
-        if sr.max() <= 65535:
-            return "uint16[pyarrow]"
-        if sr.max() <= 4294967295:
-            return "uint32[pyarrow]"
-        return "uint64[pyarrow]"
-    if sr.min() >= -128 and sr.max() <= 127:
-        return "int8[pyarrow]"
-    if sr.min() >= -32768 and sr.max() <= 32767:
-        return "int16[pyarrow]"
-    if sr.min() >= -2147483648 and sr.max() <= 2147483647:
-        return "int32[pyarrow]"
-    return "int64[pyarrow]"
+    minima, maxima, has_na = _get_numeric_stats(_get_numeric_values([sr]))
+    return _get_narrow_dtype("int", minima[0], maxima[0], has_na=has_na[0])
 
 
 def _apply_lowest_int_dtype(sr: pd.Series) -> str:
@@ -220,15 +589,8 @@ def _find_lowest_float_dtype(sr: pd.Series) -> str:
         str: The lowest float dtype.
 
     """
-    if sr.isna().any():
-        return "float64[pyarrow]"
-    if sr.min() >= 0:
-        if sr.max() <= 3.4028235e38:
-            return "float32[pyarrow]"
-        return "float64[pyarrow]"
-    if sr.min() >= -1.7976931348623157e308 and sr.max() <= 1.7976931348623157e308:
-        return "float64[pyarrow]"
-    return "float64[pyarrow]"
+    minima, maxima, has_na = _get_numeric_stats(_get_numeric_values([sr]))
+    return _get_narrow_dtype("float", minima[0], maxima[0], has_na=has_na[0])
 
 
 def _check_if_np_nan_or_pd_na(sr: pd.Series):
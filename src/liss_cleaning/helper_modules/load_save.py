@@ -1,6 +1,28 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yaml
 
+from liss_cleaning.config import BLD_RAW_CACHE
+
+RAW_CACHE_MAX_BYTES = 20 * 1024**3
+
+# Bump when the conversion of raw files changes, to invalidate cached waves.
+RAW_CACHE_FORMAT_VERSION = 1
+
+# Waves converted in full, and waves written to the cache by a chunked read.
+RAW_CACHE_SUFFIXES = (".parquet", ".pickle")
+CHUNKED_RAW_CACHE_SUFFIX = "_chunks.parquet"
+
 
 def save_data(df, path):
     """Function to save a dataset depending on the format."""
@@ -19,24 +41,612 @@ def save_data(df, path):
         raise ValueError(msg)
 
 
-def load_data(path):
-    """Function to load a dataset depending on the format."""
+@contextmanager
+def atomic_write_path(path):
+    """Get a temporary path to write a file to, moved onto `path` once written.
+
+    Readers of `path` never see a partly written file. The temporary file is named
+    after the process, so that parallel writers do not collide, and it is removed if
+    writing fails.
+
+    Args:
+        path (str or pathlib.Path): Path to the file.
+
+    Yields:
+        pathlib.Path: The temporary path to write to.
+
+    """
+    path = Path(path)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        yield tmp_path
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_data(path, columns=None, cache_dir=None, content_hash=None):
+    """Function to load a dataset depending on the format.
+
+    Args:
+        path (str or pathlib.Path): Path to file.
+        columns (list, optional): The columns to read. Columns that are not in the
+            file are skipped, so that a cleaner can request columns that exist in
+            some waves only. Reads all columns if None.
+        cache_dir (pathlib.Path, optional): Folder of the raw-wave cache. If given,
+            Stata files are converted once and later loads are served from the
+            converted file. See `get_cached_raw_path`.
+        content_hash (str, optional): The SHA-256 hash of the raw file, e.g. from
+            the raw-data inventory. Computed if None and needed for the cache.
+
+    Returns:
+        pd.DataFrame: The loaded dataset.
+
+    """
     extension = str(path).split(".")[-1]
-    if extension == "pickle":
-        return pd.read_pickle(path)
-    if extension == "csv":
+    if extension not in _READERS:
+        msg = f"Format {extension} not supported."
+        raise ValueError(msg)
+    if cache_dir is not None and extension == "dta":
+        path = get_cached_raw_path(path, cache_dir, content_hash=content_hash)
+        extension = path.suffix[1:]
+    if columns is not None and extension in _HEADER_READERS:
+        columns = _get_existing_columns(columns, _HEADER_READERS[extension](path))
+    return _READERS[extension](path, columns)
+
+
+def _read_pickle(path, columns=None):
+    """Read a pickled dataset and select the requested columns that it has."""
+    df = pd.read_pickle(path)
+    if columns is None:
+        return df
+    return df[_get_existing_columns(columns, df.columns)]
+
+
+def _read_csv(path, columns=None):
+    """Read a csv file, parsing only the requested columns that it has."""
+    if columns is None:
         return pd.read_csv(path)
-    if extension == "dta":
-        try:
-            return pd.read_stata(path, convert_categoricals=True)
-        except ValueError:
-            return pd.read_stata(path, convert_categoricals=False)
-    if extension == "parquet":
-        return pd.read_parquet(path)
-    if extension == "arrow":
-        return pd.read_feather(path)
-    msg = f"Format {extension} not supported."
-    raise ValueError(msg)
+    requested = set(columns)
+    return pd.read_csv(path, usecols=lambda column: column in requested)
+
+
+def _read_parquet(path, columns=None):
+    """Read a Parquet file."""
+    return pd.read_parquet(path, columns=columns)
+
+
+def _read_arrow(path, columns=None):
+    """Read an Arrow IPC file."""
+    return pd.read_feather(path, columns=columns)
+
+
+def _read_stata(path, columns=None):
+    """Read a Stata file in one pass and apply its value labels column by column.
+
+    Value labels that are not unique cannot be converted to categories. The columns
+    using them keep their raw codes, and their labels are stored by column name in
+    `df.attrs["value_labels"]`.
+
+    Args:
+        path (str or pathlib.Path): Path to the Stata file.
+        columns (list, optional): The columns to read. Reads all columns if None.
+
+    Returns:
+        pd.DataFrame: The dataset, with labelled columns as ordered categoricals.
+
+    """
+    with pd.io.stata.StataReader(path, convert_categoricals=False) as reader:
+        labels_by_column = _get_stata_labels_by_column(reader)
+        raw = reader.read(columns=columns)
+    return _label_stata_columns(raw, labels_by_column)
+
+
+def _get_stata_labels_by_column(reader):
+    """Get the value labels of the labelled columns of a StataReader before reading.
+
+    Must be called before reading the data, as selecting columns while reading
+    changes the label names kept by the reader.
+    """
+    label_names = _get_stata_label_names(reader)
+    value_labels = reader.value_labels()
+    return {
+        column: value_labels[label_name]
+        for column, label_name in label_names.items()
+        if label_name in value_labels
+    }
+
+
+def _get_stata_label_names(reader):
+    """Get the name of the value labels attached to each variable of a StataReader.
+
+    pandas has no public accessor for it, so it is taken from the parsed header of the
+    reader. This is tested against the pandas versions allowed in `pixi.toml`, and an
+    error is raised if a pandas release no longer provides it.
+    """
+    variable_names = list(reader.variable_labels())
+    label_names = getattr(reader, "_lbllist", None)
+    if label_names is None or len(label_names) != len(variable_names):
+        msg = (
+            "Cannot get the value labels of the Stata variables with pandas "
+            f"{pd.__version__}."
+        )
+        raise RuntimeError(msg)
+    return dict(zip(variable_names, label_names, strict=True))
+
+
+def _label_stata_columns(raw, labels_by_column):
+    """Apply value labels to the columns of a Stata dataset where they are unique."""
+    data = {}
+    unconverted_labels = {}
+    for column in raw.columns:
+        data[column] = raw[column]
+        if column not in labels_by_column:
+            continue
+        labels = labels_by_column[column]
+        categorical = _apply_value_labels(raw[column], labels)
+        if categorical is None:
+            codes = np.asarray(list(labels)).tolist()
+            unconverted_labels[column] = dict(zip(codes, labels.values(), strict=True))
+        else:
+            data[column] = categorical
+    df = pd.DataFrame(data, index=raw.index)
+    df.attrs["value_labels"] = unconverted_labels
+    return df
+
+
+def _apply_value_labels(sr, labels):
+    """Convert a column of Stata codes to an ordered categorical of its labels.
+
+    Codes without a label are kept as categories, as `pd.read_stata` does. Returns
+    None if the labels of the codes in the column are not unique.
+    """
+    categorical = pd.Categorical(sr, ordered=True)
+    categories = [labels.get(code, code) for code in categorical.categories]
+    if len(set(categories)) < len(categories):
+        return None
+    return pd.Series(
+        categorical.rename_categories(categories), index=sr.index, name=sr.name
+    )
+
+
+def _read_stata_header(path):
+    """Get the variable names of a Stata file without reading its data."""
+    with pd.io.stata.StataReader(path) as reader:
+        return list(reader.variable_labels())
+
+
+def _read_arrow_header(path):
+    """Get the column names of an Arrow IPC file without reading its data."""
+    with pa.ipc.open_file(path) as reader:
+        return reader.schema.names
+
+
+def _read_parquet_header(path):
+    """Get the column names of a Parquet file without reading its data."""
+    return pq.read_schema(path).names
+
+
+_HEADER_READERS = {
+    "dta": _read_stata_header,
+    "parquet": _read_parquet_header,
+    "arrow": _read_arrow_header,
+}
+
+
+_READERS = {
+    "pickle": _read_pickle,
+    "csv": _read_csv,
+    "dta": _read_stata,
+    "parquet": _read_parquet,
+    "arrow": _read_arrow,
+}
+
+
+def _get_existing_columns(columns, available_columns):
+    """Keep the requested columns that are available, in the order of the file."""
+    requested = set(columns)
+    return [column for column in available_columns if column in requested]
+
+
+def load_data_in_chunks(
+    path, chunksize, columns=None, cache_dir=None, content_hash=None
+):
+    """Load a dataset in chunks of rows, depending on the format.
+
+    Args:
+        path (str or pathlib.Path): Path to file.
+        chunksize (int): The maximum number of rows per chunk.
+        columns (list, optional): The columns to read, see `load_data`.
+        cache_dir (pathlib.Path, optional): Folder of the raw-wave cache, see
+            `_iter_raw_cache_chunks`.
+        content_hash (str, optional): The SHA-256 hash of the raw file, see
+            `load_data`.
+
+    Yields:
+        pd.DataFrame: The chunks, each with a RangeIndex starting at 0, so that
+            cleaners process a chunk as they would process a whole dataset.
+
+    """
+    extension = str(path).split(".")[-1]
+    if extension not in _CHUNK_READERS:
+        msg = f"Format {extension} not supported."
+        raise ValueError(msg)
+    if cache_dir is not None and extension == "dta":
+        chunks = _iter_raw_cache_chunks(
+            path, chunksize, columns, cache_dir, content_hash=content_hash
+        )
+    else:
+        chunks = _iter_chunks(path, chunksize, columns)
+    for chunk in chunks:
+        yield chunk.reset_index(drop=True)
+
+
+def _iter_chunks(path, chunksize, columns):
+    """Read a file in chunks of rows with the reader of its format."""
+    extension = str(path).split(".")[-1]
+    if columns is not None and extension in _HEADER_READERS:
+        columns = _get_existing_columns(columns, _HEADER_READERS[extension](path))
+    return _CHUNK_READERS[extension](path, chunksize, columns)
+
+
+def _iter_raw_cache_chunks(path, chunksize, columns, cache_dir, content_hash=None):
+    """Read a Stata file in chunks of rows through the raw-wave cache.
+
+    The chunks are read from the row groups of the cached wave, if it was converted in
+    full by `get_cached_raw_path` or written by an earlier chunked read. Otherwise the
+    Stata file is read in chunks and written to the cache as it is read, so that the
+    next run skips decoding it while memory stays bounded by the chunk size.
+    """
+    if content_hash is None:
+        content_hash = get_file_hash(path)
+    cached = _find_cached_raw_path(
+        path,
+        cache_dir,
+        content_hash=content_hash,
+        suffixes=(*RAW_CACHE_SUFFIXES, CHUNKED_RAW_CACHE_SUFFIX),
+    )
+    if cached is not None:
+        return _iter_chunks(cached, chunksize, columns)
+    stem = _get_raw_cache_stem(path, content_hash)
+    cached = Path(cache_dir) / f"{stem}{CHUNKED_RAW_CACHE_SUFFIX}"
+    return _iter_and_cache_stata_chunks(path, cached, chunksize, columns)
+
+
+def _iter_and_cache_stata_chunks(path, cached, chunksize, columns):
+    """Read a Stata file in chunks and write all of its columns to the cache.
+
+    Each chunk is written to a Parquet part as it is read, and the parts are joined
+    into the cached file once the last chunk was read. The cache is left unchanged if
+    reading stops early or a chunk cannot be stored exactly by Arrow. The chunks of a
+    Stata file are labelled chunk by chunk, so they are cached under their own name
+    and never served to `load_data`.
+    """
+    cache_dir = Path(cached).parent
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=cache_dir) as spool_dir:
+        parts = []
+        is_cacheable = True
+        for i, chunk in enumerate(_iter_stata_chunks(path, chunksize, None)):
+            table = _convert_to_exact_arrow(chunk) if is_cacheable else None
+            is_cacheable = table is not None
+            if is_cacheable:
+                part = Path(spool_dir) / f"{i}.parquet"
+                with atomic_write_path(part) as tmp_path:
+                    pq.write_table(table, tmp_path)
+                parts.append(part)
+            if columns is None:
+                yield chunk
+            else:
+                yield chunk[_get_existing_columns(columns, chunk.columns)]
+        if is_cacheable and parts:
+            write_parquet_parts(parts, cached)
+            prune_raw_cache(cache_dir, RAW_CACHE_MAX_BYTES, keep=[cached])
+
+
+def _iter_stata_chunks(path, chunksize, columns):
+    """Read a Stata file in chunks, applying value labels consistently across chunks.
+
+    Whether a column is labelled is decided on its full set of value labels, so that
+    all chunks of a column have the same kind of values.
+    """
+    with pd.io.stata.StataReader(
+        path, convert_categoricals=False, columns=columns, chunksize=chunksize
+    ) as reader:
+        labels_by_column = {
+            column: labels
+            for column, labels in _get_stata_labels_by_column(reader).items()
+            if len(set(labels.values())) == len(labels)
+        }
+        for raw in reader:
+            yield _label_stata_columns(raw, labels_by_column)
+
+
+def _iter_parquet_chunks(path, chunksize, columns):
+    """Read a Parquet file in batches of rows."""
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        yield pa.Table.from_batches([batch]).to_pandas()
+
+
+def _iter_arrow_chunks(path, chunksize, columns):
+    """Read an Arrow IPC file record batch by record batch."""
+    with pa.ipc.open_file(path) as reader:
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for offset in range(0, batch.num_rows, chunksize):
+                table = pa.Table.from_batches([batch.slice(offset, chunksize)])
+                yield table.to_pandas()
+
+
+def _iter_csv_chunks(path, chunksize, columns):
+    """Read a csv file in chunks of rows."""
+    if columns is None:
+        yield from pd.read_csv(path, chunksize=chunksize)
+        return
+    requested = set(columns)
+    yield from pd.read_csv(
+        path, chunksize=chunksize, usecols=lambda column: column in requested
+    )
+
+
+def _iter_pickle_chunks(path, chunksize, columns):
+    """Split a pickled dataset in chunks of rows; pickles can only be read in full."""
+    df = load_data(path, columns=columns)
+    for offset in range(0, len(df), chunksize):
+        yield df.iloc[offset : offset + chunksize]
+
+
+_CHUNK_READERS = {
+    "dta": _iter_stata_chunks,
+    "parquet": _iter_parquet_chunks,
+    "arrow": _iter_arrow_chunks,
+    "csv": _iter_csv_chunks,
+    "pickle": _iter_pickle_chunks,
+}
+
+
+def save_data_in_chunks(chunks, path):
+    """Write chunks of a dataset to one Parquet file, holding one chunk at a time.
+
+    Chunks are spooled to disk first. The data types of the chunks are then unified,
+    as cleaners choose the smallest type that fits each chunk: integers and floats are
+    widened, categories are merged, and columns missing in a chunk are filled with
+    nulls.
+
+    Args:
+        chunks (iterable): The chunks, as pd.DataFrame.
+        path (pathlib.Path): Path to the Parquet file.
+
+    Returns:
+        pathlib.Path: Path to the Parquet file.
+
+    """
+    path = Path(path)
+    if path.suffix != ".parquet":
+        msg = f"Format {path.suffix} not supported for chunked saving."
+        raise ValueError(msg)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=path.parent) as spool_dir:
+        parts = []
+        for i, chunk in enumerate(chunks):
+            part = Path(spool_dir) / f"{i}.parquet"
+            pq.write_table(pa.Table.from_pandas(chunk, preserve_index=False), part)
+            parts.append(part)
+        if not parts:
+            msg = f"No chunks to save to {path}."
+            raise ValueError(msg)
+        write_parquet_parts(parts, path)
+    return path
+
+
+def write_parquet_parts(parts, path, drop_columns=()):
+    """Concatenate Parquet files written from pandas into one, part by part.
+
+    Args:
+        parts (list): Paths to the Parquet files.
+        path (pathlib.Path): Path to the concatenated Parquet file.
+        drop_columns (list): Columns to leave out of the concatenated file.
+
+    """
+    schemas = [pq.read_schema(part) for part in parts]
+    schema = _unify_pandas_schemas(schemas, drop_columns=drop_columns)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with (
+        atomic_write_path(path) as tmp_path,
+        pq.ParquetWriter(tmp_path, schema) as writer,
+    ):
+        for part in parts:
+            writer.write_table(_conform_table(pq.read_table(part), schema))
+
+
+def _unify_pandas_schemas(schemas, drop_columns=()):
+    """Unify Arrow schemas written from pandas, keeping the pandas metadata valid.
+
+    The pandas metadata records the dtype of each column. Columns with pyarrow dtypes
+    are updated to their widened type, so that pandas restores them without casting
+    back to the narrower type of the first part.
+    """
+    schema = pa.unify_schemas(schemas, promote_options="permissive")
+    for name in drop_columns:
+        schema = schema.remove(schema.get_field_index(name))
+    pandas_metadata = [
+        json.loads(part_schema.metadata[b"pandas"])
+        for part_schema in schemas
+        if part_schema.metadata and b"pandas" in part_schema.metadata
+    ]
+    if not pandas_metadata:
+        return schema
+    columns = {}
+    for metadata in pandas_metadata:
+        for column in metadata["columns"]:
+            columns.setdefault(column["name"], column)
+    metadata = pandas_metadata[0]
+    metadata["columns"] = [columns[name] for name in schema.names if name in columns]
+    for column in metadata["columns"]:
+        if str(column["numpy_type"]).endswith("[pyarrow]"):
+            column["numpy_type"] = f"{schema.field(column['name']).type}[pyarrow]"
+    return schema.with_metadata({b"pandas": json.dumps(metadata).encode()})
+
+
+def _conform_table(table, schema):
+    """Cast a table to a schema, adding the columns it misses as nulls."""
+    columns = [
+        table[field.name].cast(field.type)
+        if field.name in table.column_names
+        else pa.nulls(table.num_rows, type=field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def get_cached_raw_path(
+    path, cache_dir, max_bytes=RAW_CACHE_MAX_BYTES, content_hash=None
+):
+    """Get the path of the converted copy of a raw file, converting it if needed.
+
+    Cached files are keyed by the content hash of the raw file and the versions of
+    pandas and pyarrow, so that a changed file or a library upgrade leads to a new
+    conversion. Files are stored as Parquet, or as pickle if Arrow cannot store the
+    data exactly (e.g. categories mixing labels and codes, or value labels kept in
+    `df.attrs`). After a conversion, the least recently used files are evicted until
+    the cache fits into `max_bytes`.
+
+    Args:
+        path (pathlib.Path): Path to the raw file.
+        cache_dir (pathlib.Path): Folder of the cache.
+        max_bytes (int): The maximum size of the cache.
+        content_hash (str, optional): The SHA-256 hash of the raw file, so that it
+            does not need to be read again. Computed if None.
+
+    Returns:
+        pathlib.Path: Path to the cached file.
+
+    """
+    cache_dir = Path(cache_dir)
+    if content_hash is None:
+        content_hash = get_file_hash(path)
+    cached = _find_cached_raw_path(path, cache_dir, content_hash=content_hash)
+    if cached is not None:
+        return cached
+
+    stem = _get_raw_cache_stem(path, content_hash)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    df = load_data(path)
+    table = _convert_to_exact_arrow(df)
+    if table is None:
+        cached = cache_dir / f"{stem}.pickle"
+        with atomic_write_path(cached) as tmp_path:
+            df.to_pickle(tmp_path)
+    else:
+        cached = cache_dir / f"{stem}.parquet"
+        with atomic_write_path(cached) as tmp_path:
+            pq.write_table(table, tmp_path)
+    prune_raw_cache(cache_dir, max_bytes, keep=[cached])
+    return cached
+
+
+def _find_cached_raw_path(
+    path, cache_dir, content_hash=None, suffixes=RAW_CACHE_SUFFIXES
+):
+    """Get the path of the converted copy of a raw file, or None if it is not cached.
+
+    The suffixes are tried in order. A cached file is marked as recently used.
+    """
+    if content_hash is None:
+        content_hash = get_file_hash(path)
+    stem = _get_raw_cache_stem(path, content_hash)
+    for suffix in suffixes:
+        cached = Path(cache_dir) / f"{stem}{suffix}"
+        if cached.exists():
+            os.utime(cached)
+            return cached
+    return None
+
+
+def _convert_to_exact_arrow(df):
+    """Convert a raw wave to Arrow, or return None if Arrow cannot store it exactly."""
+    if df.attrs.get("value_labels"):
+        return None
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+
+
+def _get_raw_cache_stem(path, content_hash):
+    """Get the name of the cached copies of a raw file, without their suffix."""
+    return f"{Path(path).stem}_{_get_raw_cache_key(content_hash)}"
+
+
+def _get_raw_cache_key(content_hash):
+    """Hash the content hash of a raw file together with the conversion settings."""
+    settings = f"{RAW_CACHE_FORMAT_VERSION}-{pd.__version__}-{pa.__version__}"
+    return hashlib.sha256(f"{settings}-{content_hash}".encode()).hexdigest()[:32]
+
+
+def get_file_hash(path):
+    """Get the SHA-256 hash of the content of a file.
+
+    Args:
+        path (pathlib.Path): Path to the file.
+
+    Returns:
+        str: The hexadecimal digest.
+
+    """
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as stream:
+        for block in iter(lambda: stream.read(1024**2), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def prune_raw_cache(cache_dir, max_bytes, keep=()):
+    """Evict the least recently used files until the cache fits into `max_bytes`.
+
+    Args:
+        cache_dir (pathlib.Path): Folder of the cache.
+        max_bytes (int): The maximum size of the cache.
+        keep (list): Paths that are never evicted.
+
+    Returns:
+        list: The paths of the evicted files.
+
+    """
+    cache_dir = Path(cache_dir)
+    if not cache_dir.exists():
+        return []
+    files = [p for p in cache_dir.iterdir() if p.suffix in (".parquet", ".pickle")]
+    files.sort(key=lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in files)
+    evicted = []
+    for cached in files:
+        if total <= max_bytes:
+            break
+        if cached in keep:
+            continue
+        total -= cached.stat().st_size
+        cached.unlink()
+        evicted.append(cached)
+    return evicted
+
+
+def prune_raw_cache_cli(argv=None):
+    """Command line entry point to prune the raw-wave cache."""
+    parser = argparse.ArgumentParser(description="Prune the raw-wave cache.")
+    parser.add_argument("--cache-dir", type=Path, default=BLD_RAW_CACHE)
+    parser.add_argument(
+        "--max-gb",
+        type=float,
+        default=RAW_CACHE_MAX_BYTES / 1024**3,
+        help="Evict the least recently used files above this size. 0 clears it.",
+    )
+    args = parser.parse_args(argv)
+    evicted = prune_raw_cache(args.cache_dir, int(args.max_gb * 1024**3))
+    print(f"Evicted {len(evicted)} files from {args.cache_dir}.")  # noqa: T201
 
 
 def read_yaml(path):
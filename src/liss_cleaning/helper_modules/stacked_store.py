@@ -0,0 +1,324 @@
+"""Stacking of the cleaned waves of a survey into one dataset.
+
+Waves are stacked on a unified schema: each column gets the smallest type that holds
+it in every wave, categories are merged, and waves in which a column is entirely NA
+do not take part in choosing its type. Columns whose types cannot be unified, e.g.
+categories in one wave and numbers in another, are stacked as strings. Integer, float
+and boolean columns are returned with pyarrow dtypes, categoricals stay categoricals.
+
+The incremental store keeps each cleaned wave of a survey in its own partition,
+`survey=<survey>/wave=<wave>.parquet`, next to a manifest listing the waves of the
+stacked dataset. Adding or re-cleaning a wave only rewrites its partition and the
+manifest; the stacked dataset is a lazy concatenation of the partitions.
+"""
+
+import json
+import warnings
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from liss_cleaning.helper_modules.load_save import _conform_table, atomic_write_path
+
+MANIFEST_NAME = "manifest.json"
+
+
+def concat_waves(dataframes):
+    """Stack the cleaned waves of a survey on a unified schema.
+
+    The waves are concatenated as Arrow tables, which does not copy the data, and
+    converted to pandas once.
+
+    Args:
+        dataframes (list): The cleaned waves, as pd.DataFrame.
+
+    Returns:
+        pd.DataFrame: The stacked dataset, with a RangeIndex.
+
+    """
+    return concat_wave_tables(
+        [pa.Table.from_pandas(df, preserve_index=False) for df in dataframes]
+    )
+
+
+def concat_wave_tables(tables):
+    """Stack the cleaned waves of a survey, given as Arrow tables.
+
+    Args:
+        tables (list): The cleaned waves, as pyarrow.Table.
+
+    Returns:
+        pd.DataFrame: The stacked dataset, with a RangeIndex.
+
+    """
+    tables = [table.replace_schema_metadata() for table in tables]
+    empty_columns = [
+        [
+            name
+            for name, column in zip(table.column_names, table.columns, strict=True)
+            if column.null_count == table.num_rows
+        ]
+        for table in tables
+    ]
+    schema = _unify_wave_schemas([table.schema for table in tables], empty_columns)
+    _check_category_orders(tables, schema)
+    stacked = pa.concat_tables([_conform_table(table, schema) for table in tables])
+    return _to_stacked_pandas(stacked)
+
+
+def _unify_wave_schemas(schemas, empty_columns):
+    """Unify the schemas of the waves of a survey.
+
+    The types of the columns that are entirely NA in a wave are ignored, so that the
+    stacked types do not depend on which waves miss a column. A column that is NA in
+    every wave keeps its type in the first wave.
+    """
+    first_types = {}
+    non_empty_types = {}
+    for schema, empty in zip(schemas, map(set, empty_columns), strict=True):
+        for field in schema:
+            first_types.setdefault(field.name, field.type)
+            if field.name not in empty:
+                non_empty_types.setdefault(field.name, {})[field.type] = None
+    return pa.schema(
+        [
+            pa.field(name, _unify_types(name, list(non_empty_types[name])))
+            if name in non_empty_types
+            else pa.field(name, first_type)
+            for name, first_type in first_types.items()
+        ]
+    )
+
+
+def _unify_types(name, types):
+    """Unify the types of a column in the waves of a survey.
+
+    A column that is an ordered categorical in some waves only is stacked as an
+    unordered categorical. Other types that cannot be unified fall back to strings.
+    Both cases are reported in a warning.
+    """
+    unified = _promote_types(name, types)
+    if unified is not None:
+        return unified
+    if all(pa.types.is_dictionary(type_) for type_ in types):
+        unified = _promote_types(
+            name,
+            [pa.dictionary(type_.index_type, type_.value_type) for type_ in types],
+        )
+        if unified is not None:
+            warnings.warn(
+                f"The column {name!r} is an ordered categorical in some waves only, "
+                "it is stacked as an unordered categorical.",
+                stacklevel=4,
+            )
+            return unified
+    warnings.warn(
+        f"The types {[str(type_) for type_ in types]} of the column {name!r} cannot "
+        "be unified across waves, it is stacked as strings.",
+        stacklevel=4,
+    )
+    return pa.string()
+
+
+def _promote_types(name, types):
+    """Promote types to a common type, None if there is none."""
+    schemas = [pa.schema([pa.field(name, type_)]) for type_ in types]
+    try:
+        unified = pa.unify_schemas(schemas, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+    return unified.field(name).type
+
+
+def _check_category_orders(tables, schema):
+    """Warn about ordered categoricals whose category order differs across waves.
+
+    The stacked categories can only have one order.
+    """
+    for field in schema:
+        if not (pa.types.is_dictionary(field.type) and field.type.ordered):
+            continue
+        categories = [
+            chunk.dictionary.to_pylist()
+            for table in tables
+            if field.name in table.column_names
+            for chunk in table[field.name].chunks
+            if pa.types.is_dictionary(chunk.type)
+        ]
+        if not _have_same_order(categories):
+            warnings.warn(
+                f"The ordered categories of the column {field.name!r} are in a "
+                "different order in some waves, they are stacked in the order in "
+                "which they first appear.",
+                stacklevel=3,
+            )
+
+
+def _have_same_order(category_lists):
+    """Check that the categories shared by lists are in the same order in each."""
+    positions = {}
+    for categories in category_lists:
+        known = [positions[c] for c in categories if c in positions]
+        if known != sorted(known):
+            return False
+        for category in categories:
+            positions.setdefault(category, len(positions))
+    return True
+
+
+def _to_stacked_pandas(table):
+    """Convert a stacked table to pandas, with pyarrow dtypes for numeric columns."""
+    return table.replace_schema_metadata().to_pandas(
+        types_mapper=_get_stacked_dtype, split_blocks=True, self_destruct=True
+    )
+
+
+def _get_stacked_dtype(arrow_type):
+    """Map numeric Arrow types to pyarrow dtypes; keep pandas defaults otherwise."""
+    if (
+        pa.types.is_integer(arrow_type)
+        or pa.types.is_floating(arrow_type)
+        or pa.types.is_boolean(arrow_type)
+    ):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def get_partition_path(store_dir, survey, wave):
+    """Get the path of the partition of one wave of a survey.
+
+    Args:
+        store_dir (pathlib.Path): Folder of the store.
+        survey (str): Name of the survey.
+        wave (str): Name of the wave, e.g. the stem of the raw file.
+
+    Returns:
+        pathlib.Path: Path to the partition.
+
+    """
+    return Path(store_dir) / f"survey={survey}" / f"wave={wave}.parquet"
+
+
+def get_manifest_path(store_dir, survey):
+    """Get the path of the manifest of a survey."""
+    return Path(store_dir) / f"survey={survey}" / MANIFEST_NAME
+
+
+def update_manifest(store_dir, survey, waves):
+    """Register the partitions of the waves of a survey in its manifest.
+
+    The statistics of a partition are only read again if its file changed since the
+    last update. Partitions of waves that are no longer part of the survey are
+    removed.
+
+    Args:
+        store_dir (pathlib.Path): Folder of the store.
+        survey (str): Name of the survey.
+        waves (list): Names of the waves, in the order of the stacked dataset.
+
+    Returns:
+        pathlib.Path: Path to the manifest.
+
+    """
+    manifest_path = get_manifest_path(store_dir, survey)
+    previous = _read_manifest(manifest_path)["waves"] if manifest_path.exists() else {}
+
+    entries = {}
+    for wave in waves:
+        path = get_partition_path(store_dir, survey, wave)
+        stat = path.stat()
+        entry = previous.get(wave)
+        if (
+            entry is None
+            or entry["size"] != stat.st_size
+            or entry["mtime_ns"] != stat.st_mtime_ns
+        ):
+            entry = _get_partition_entry(path)
+        entries[wave] = entry
+
+    partitions = {entry["file"] for entry in entries.values()}
+    for path in manifest_path.parent.glob("wave=*.parquet"):
+        if path.name not in partitions:
+            path.unlink()
+
+    manifest = {"survey": survey, "waves": entries}
+    with atomic_write_path(manifest_path) as tmp_path:
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+    return manifest_path
+
+
+def _get_partition_entry(path):
+    """Read the statistics of a partition from its Parquet footer."""
+    metadata = pq.read_metadata(path)
+    null_counts = {
+        field.name: metadata.num_rows
+        for field in metadata.schema.to_arrow_schema()
+        if pa.types.is_null(field.type)
+    }
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        for j in range(row_group.num_columns):
+            column = row_group.column(j)
+            statistics = column.statistics
+            has_null_count = statistics is not None and statistics.has_null_count
+            null_count = statistics.null_count if has_null_count else 0
+            name = column.path_in_schema
+            null_counts[name] = null_counts.get(name, 0) + null_count
+    stat = path.stat()
+    return {
+        "file": path.name,
+        "rows": metadata.num_rows,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "empty_columns": sorted(
+            name for name, count in null_counts.items() if count == metadata.num_rows
+        ),
+    }
+
+
+def _read_manifest(manifest_path):
+    """Read the manifest of a survey."""
+    return json.loads(Path(manifest_path).read_text())
+
+
+def open_stacked(manifest_path):
+    """Open the stacked dataset of a survey as a lazy concatenation of its waves.
+
+    The schema is unified as in `concat_waves`. Nothing is read until the dataset is
+    scanned, e.g. with `to_table(columns=...)`.
+
+    Args:
+        manifest_path (pathlib.Path): Path to the manifest of the survey.
+
+    Returns:
+        pyarrow.dataset.Dataset: The stacked dataset.
+
+    """
+    manifest_path = Path(manifest_path)
+    entries = _read_manifest(manifest_path)["waves"].values()
+    if not entries:
+        msg = f"No waves registered in {manifest_path}."
+        raise ValueError(msg)
+    paths = [manifest_path.parent / entry["file"] for entry in entries]
+    schema = _unify_wave_schemas(
+        [pq.read_schema(path).remove_metadata() for path in paths],
+        [entry["empty_columns"] for entry in entries],
+    )
+    return ds.dataset([str(path) for path in paths], schema=schema, format="parquet")
+
+
+def load_stacked(manifest_path, columns=None):
+    """Load the stacked dataset of a survey.
+
+    Args:
+        manifest_path (pathlib.Path): Path to the manifest of the survey.
+        columns (list, optional): The columns to read. Reads all columns if None.
+
+    Returns:
+        pd.DataFrame: The stacked dataset.
+
+    """
+    return _to_stacked_pandas(open_stacked(manifest_path).to_table(columns=columns))
@@ -1,44 +1,203 @@
+"""Matching probabilities elicited in the ambiguous beliefs survey.
+
+The final dataset has one row per respondent and wave, with the columns:
+
+- personal_id: respondent identifier.
+- mp_{option}_lower, mp_{option}_upper (float32[pyarrow]): lower and upper bound of the
+  matching probability interval of each ambiguity option (e0, e1, e2, e3, e1c, e2c,
+  e3c). Both are missing if the respondent did not answer any question of the option.
+- wave: survey wave.
+- survey_completion: date the respondent completed the survey.
+
+Use `get_interval_tuples` to get the intervals of an option as (lower, upper) tuples.
+"""
+
+import numpy as np
 import pandas as pd
 
+from liss_cleaning.helper_modules.general_cleaners import filter_complete_panel
+
 pd.set_option("future.no_silent_downcasting", True)
 
+# Bisection tree of the matching probability elicitation. Each lottery probability is
+# asked at most once; the answer ("AEX" or "Lottery") points either to the next
+# probability to ask or to the final matching probability interval.
+BISECTION_TREE = {
+    "50": ("90", "10"),
+    "90": ("95", "70"),
+    "95": ("99", (0.9, 0.95)),
+    "99": ((0.99, 1), (0.95, 0.99)),
+    "70": ("80", "60"),
+    "80": ((0.8, 0.9), (0.7, 0.8)),
+    "60": ((0.6, 0.7), (0.5, 0.6)),
+    "10": ("30", "5"),
+    "30": ("40", "20"),
+    "40": ((0.4, 0.5), (0.3, 0.4)),
+    "20": ((0.2, 0.3), (0.1, 0.2)),
+    "5": ((0.05, 0.1), "1"),
+    "1": ((0.01, 0.05), (0, 0.01)),
+}
+
+CHOICE_CODES = {"AEX": 0, "Lottery": 1}
+MISSING_CHOICE_CODE = 2
+
+OPTIONS_AMBIGUOUS = {
+    1: "e0",
+    2: "e1",
+    3: "e2",
+    4: "e3",
+    5: "e1c",
+    6: "e2c",
+    7: "e3c",
+}
+
+INTERVAL_DTYPE = "float32[pyarrow]"
+
 
 def clean_dataset(raw):
     df = pd.DataFrame()
-    options_ambiguous = {
-        1: "e0",
-        2: "e1",
-        3: "e2",
-        4: "e3",
-        5: "e1c",
-        6: "e2c",
-        7: "e3c",
-    }
-
     df["personal_id"] = raw["personal_id"]
-    for option in options_ambiguous.values():
+    for option in OPTIONS_AMBIGUOUS.values():
         matching_columns = [col for col in raw.columns if option in col]
-        df[f"mp_{option}"] = raw[matching_columns].apply(
-            lambda x, opt=option: _get_interval(x, opt), axis=1
-        )
+        lower, upper = _get_interval_bounds(raw[matching_columns], option)
+        df[f"mp_{option}_lower"] = pd.array(lower, dtype=INTERVAL_DTYPE)
+        df[f"mp_{option}_upper"] = pd.array(upper, dtype=INTERVAL_DTYPE)
     df["wave"] = raw["wave"]
     df["survey_completion"] = raw["data_completion"]
-    df = df.groupby(["personal_id", "wave"]).filter(_check_answered_all_questions)
-    filtered_df = df.groupby("personal_id").filter(_check_eligible)
-    return filtered_df
+    return filter_complete_panel(df, _get_question_columns(), min_waves=2)
+
+
+def get_interval_tuples(df, option):
+    """Get the matching probability intervals of an option as (lower, upper) tuples.
+
+    Args:
+        df (pd.DataFrame): the matching probabilities dataset.
+        option (str): the ambiguity option (e.g. "e0").
+
+    Returns:
+        pd.Series: the intervals as tuples of floats, pd.NA where the interval is
+        missing.
+    """
+    # The bounds are multiples of 0.01, so rounding undoes the float32 storage.
+    lower = df[f"mp_{option}_lower"].to_numpy(dtype="float64", na_value=np.nan)
+    upper = df[f"mp_{option}_upper"].to_numpy(dtype="float64", na_value=np.nan)
+    intervals = [
+        pd.NA if np.isnan(low) else (low, high)
+        for low, high in zip(
+            lower.round(2).tolist(), upper.round(2).tolist(), strict=True
+        )
+    ]
+    return pd.Series(intervals, index=df.index, name=f"mp_{option}")
 
 
-def _check_answered_all_questions(row):
-    """Return True if all questions in a row are answered, False otherwise."""
-    question_cols = ["mp_e0", "mp_e1", "mp_e2", "mp_e3", "mp_e1c", "mp_e2c", "mp_e3c"]
-    return row[question_cols].notna().all(axis=1).all()
+def _get_question_columns():
+    """Return the lower and upper bound columns of all ambiguity options."""
+    return [
+        f"mp_{option}_{bound}"
+        for option in OPTIONS_AMBIGUOUS.values()
+        for bound in ("lower", "upper")
+    ]
 
 
-def _check_eligible(individual_data):
-    """Return False if there is less than 2 waves of data, True otherwise."""
-    individual_data = individual_data.drop(["personal_id", "wave"], axis=1)
+def _get_interval_bounds(choices, option):
+    """Get the matching probability interval for every row at once.
+
+    Vectorized counterpart of `_get_interval`: the answers are encoded as integer
+    codes and all rows walk down the bisection tree together, one level per step.
+
+    Args:
+        choices (pd.DataFrame): the choice columns of one ambiguity option, i.e. the
+            frame `_get_interval` would be applied to row by row.
+        option (str): the ambiguity option (e.g. "e0").
+
+    Returns:
+        tuple: two float arrays with the lower and upper bound of the interval of each
+        row. Both are NaN where all choices of the row are missing.
+    """
+    codes = np.column_stack(
+        [
+            _encode_choices(choices[f"choice_aex_{option}_vs_{probability}"])
+            for probability in _COMPILED_TREE["probabilities"]
+        ]
+    )
+    rows = np.arange(len(choices))
+    states = np.zeros(len(choices), dtype=np.intp)
+    for _ in range(_COMPILED_TREE["depth"]):
+        answers = codes[rows, _COMPILED_TREE["question"][states]]
+        states = _COMPILED_TREE["transitions"][states, answers]
+
+    all_missing = choices.isna().all(axis=1).to_numpy()
+    lower = np.where(all_missing, np.nan, _COMPILED_TREE["lower"][states])
+    upper = np.where(all_missing, np.nan, _COMPILED_TREE["upper"][states])
+    return lower, upper
+
+
+def _encode_choices(series):
+    """Encode a choice column as integer codes (see CHOICE_CODES), missing otherwise."""
+    categorical = series.astype("category")
+    lookup = np.array(
+        [CHOICE_CODES.get(c, MISSING_CHOICE_CODE) for c in categorical.cat.categories]
+        + [MISSING_CHOICE_CODE],
+        dtype=np.intp,
+    )
+    # Missing values have code -1, which picks the trailing missing code.
+    return lookup[categorical.cat.codes.to_numpy()]
+
+
+def _compile_bisection_tree(tree):
+    """Compile the bisection tree into lookup tables for `_get_interval_bounds`.
+
+    Every question of the tree and every final interval becomes a state. Intervals are
+    absorbing states, and so is an extra state for rows that stop at a missing answer,
+    which keeps the (0, 0) interval `_get_interval` returns in that case.
+
+    Args:
+        tree (dict): mapping of lottery probability to the (AEX, Lottery) children.
+
+    Returns:
+        dict: the lookup tables. Contains: probabilities(list), question(np.ndarray),
+        transitions(np.ndarray), lower(np.ndarray), upper(np.ndarray), depth(int).
+    """
+    probabilities = list(tree)
+    intervals = [
+        child for children in tree.values() for child in children if child not in tree
+    ]
+    n_states = len(probabilities) + len(intervals) + 1
+    stuck = n_states - 1
+
+    def _state(child):
+        if child in tree:
+            return probabilities.index(child)
+        return len(probabilities) + intervals.index(child)
+
+    question = np.zeros(n_states, dtype=np.intp)
+    transitions = np.tile(np.arange(n_states)[:, None], (1, len(CHOICE_CODES) + 1))
+    lower = np.zeros(n_states)
+    upper = np.zeros(n_states)
+    for state, children in enumerate(tree.values()):
+        question[state] = state
+        for answer, child in zip(CHOICE_CODES.values(), children, strict=True):
+            transitions[state, answer] = _state(child)
+        transitions[state, MISSING_CHOICE_CODE] = stuck
+    for interval in intervals:
+        lower[_state(interval)], upper[_state(interval)] = interval
+
+    def _depth(node):
+        if node not in tree:
+            return 0
+        return 1 + max(_depth(child) for child in tree[node])
+
+    return {
+        "probabilities": probabilities,
+        "question": question,
+        "transitions": transitions,
+        "lower": lower,
+        "upper": upper,
+        "depth": _depth(probabilities[0]),
+    }
+
 
-    return not individual_data.dropna().shape[0] < 2
+_COMPILED_TREE = _compile_bisection_tree(BISECTION_TREE)
 
 
 def _get_interval(rows, option):  # noqa: C901, PLR0912
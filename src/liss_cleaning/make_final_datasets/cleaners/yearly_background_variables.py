@@ -1,142 +1,52 @@
+import numpy as np
 import pandas as pd
 
 from liss_cleaning.config import BLD
-from liss_cleaning.helper_modules.general_cleaners import (
-    _apply_lowest_float_dtype,
-    _apply_lowest_int_dtype,
-    _handle_missing_column,
-)
+from liss_cleaning.helper_modules.general_cleaners import narrow_dtypes
 
 dependencies_time_index = {
     BLD / "merged_waves" / "monthly_background_variables.arrow": "all_years",
     "index_name": "year",
 }
 
+# Aggregation of each monthly variable to the year: (aggregation, target dtype).
+YEARLY_AGGREGATIONS = {
+    "age": ("median", "int"),
+    "age_cbs": ("mode", "category"),
+    "birth_year": ("first", "int"),
+    "dom_situation": ("mode", "category"),
+    "dwelling_type": ("mode", "category"),
+    "education_cbs": ("mode", "category"),
+    "education_irrespective_diploma": ("mode", "category"),
+    "gender": ("mode", "category"),
+    "gross_income_cat": ("mode", "category"),
+    "gross_income_hh": ("mean", "float"),
+    "gross_income_imputed_personal": ("mean", "float"),
+    "gross_income_incl_cat": ("first", "category"),
+    "hh_children": ("mode", "category"),
+    "hh_head_age": ("median", "int"),
+    "hh_id": ("first", "int"),
+    "hh_members": ("mode", "category"),
+    "respondent_position_hh": ("mode", "category"),
+    "hh_sim_computer": ("mode", "category"),
+    "hh_head_lives_partner": ("mode", "category"),
+    "net_income_cat": ("mode", "category"),
+    "net_income_hh": ("mean", "float"),
+    "net_income_imputed_personal": ("mean", "float"),
+    "net_income_incl_cat": ("first", "category"),
+    "net_income_personal": ("first", "category"),
+    "occupation": ("mode", "category"),
+    "origin": ("mode", "category"),
+}
+
 
 def clean_dataset(
     raw_monthly_background_variables, raw_economic_situation_assets
 ) -> pd.DataFrame:
-    raw = raw_monthly_background_variables.reset_index(drop=False)
-    df = pd.DataFrame()
-
-    df["personal_id"] = _apply_lowest_int_dtype(raw["personal_id"])
-    df["year"] = pd.to_numeric(raw["year_month"].apply(lambda x: x.split("-")[0]))
-    df = df.drop_duplicates(subset=["personal_id", "year"], keep="first")
-    raw["year"] = pd.to_numeric(raw["year_month"].apply(lambda x: x.split("-")[0]))
-
-    df["age"] = _apply_lowest_int_dtype(
-        _get_median_for_index(raw, ["personal_id", "year"], "age").round()
-    )
-
-    ## to_do: test properly and fix mode function to replace some get first
-    df["age_cbs"] = _get_first_for_index(raw, ["personal_id", "year"], "age_cbs")
-    df["age_cbs"] = df["age_cbs"].astype("category")
-
-    df["birth_year"] = _apply_lowest_int_dtype(
-        _get_first_for_index(raw, ["personal_id", "year"], "birth_year")
-    )
-
-    df["dom_situation"] = _get_first_for_index(
-        raw, ["personal_id", "year"], "dom_situation"
-    )
-    df["dom_situation"] = df["dom_situation"].astype("category")
-
-    df["dwelling_type"] = _get_first_for_index(
-        raw, ["personal_id", "year"], "dwelling_type"
-    )
-
-    df["dwelling_type"] = df["dwelling_type"].astype("category")
-
-    df["education_cbs"] = _get_first_for_index(
-        raw, ["personal_id", "year"], "education_cbs"
-    )
-    df["education_cbs"] = df["education_cbs"].astype("category")
-
-    df["education_irrespective_diploma"] = _get_first_for_index(
-        raw, ["personal_id", "year"], "education_irrespective_diploma"
-    )
-    df["education_irrespective_diploma"] = df["education_irrespective_diploma"].astype(
-        "category"
-    )
-
-    df["gender"] = _get_first_for_index(raw, ["personal_id", "year"], "gender")
-    df["gender"] = df["gender"].astype("category")
-
-    df["gross_income_cat"] = _get_first_for_index(
-        raw, ["personal_id", "year"], "gross_income_cat"
-    )
-    df["gross_income_cat"] = df["gross_income_cat"].astype("category")
-
-    df["gross_income_hh"] = _apply_lowest_float_dtype(
-        _get_mean_for_index(raw, ["personal_id", "year"], "gross_income_hh")
-    )
-
-    df["gross_income_imputed_personal"] = _apply_lowest_float_dtype(
-        _get_mean_for_index(
-            raw, ["personal_id", "year"], "gross_income_imputed_personal"
-        )
-    )
-
-    df["gross_income_incl_cat"] = _get_first_for_index(
-        raw, ["personal_id", "year"], "gross_income_incl_cat"
-    )
-    df["gross_income_incl_cat"] = df["gross_income_incl_cat"].astype("category")
-
-    df["hh_children"] = _get_first_for_index(
-        raw, ["personal_id", "year"], "hh_children"
-    )
-    df["hh_children"] = df["hh_children"].astype("category")
-
-    df["hh_head_age"] = _apply_lowest_int_dtype(
-        _get_median_for_index(raw, ["personal_id", "year"], "hh_head_age").round()
-    )
-
-    df["hh_id"] = _apply_lowest_int_dtype(
-        _get_first_for_index(raw, ["personal_id", "year"], "hh_id")
-    )
-
-    df["hh_members"] = _get_first_for_index(raw, ["personal_id", "year"], "hh_members")
-    df["hh_members"] = df["hh_members"].astype("category")
-
-    df["respondent_position_hh"] = _get_first_for_index(
-        raw, ["personal_id", "year"], "respondent_position_hh"
-    )
-    df["respondent_position_hh"] = df["respondent_position_hh"].astype("category")
-
-    df["hh_sim_computer"] = _get_first_for_index(
-        raw, ["personal_id", "year"], "hh_sim_computer"
-    )
-    df["hh_sim_computer"] = df["hh_sim_computer"].astype("category")
-
-    df["hh_head_lives_partner"] = _get_first_for_index(
-        raw, ["personal_id", "year"], "hh_head_lives_partner"
-    )
-    df["hh_head_lives_partner"] = df["hh_head_lives_partner"].astype("category")
-
-    df["net_income_cat"] = _get_first_for_index(
-        raw, ["personal_id", "year"], "net_income_cat"
-    )
-    df["net_income_cat"] = df["net_income_cat"].astype("category")
-
-    df["net_income_hh"] = _apply_lowest_float_dtype(
-        _get_mean_for_index(raw, ["personal_id", "year"], "net_income_hh")
-    )
-
-    df["net_income_imputed_personal"] = _apply_lowest_float_dtype(
-        _get_mean_for_index(raw, ["personal_id", "year"], "net_income_imputed_personal")
-    )
-
-    for col in [
-        "net_income_incl_cat",
-        "net_income_personal",
-        "occupation",
-        "origin",
-    ]:
-        df[col] = _get_first_for_index(raw, ["personal_id", "year"], col)
-        df[col] = df[col].astype("category")
-    assets_subset = raw_economic_situation_assets.reset_index(drop=False)[
-        ["personal_id", "year", "total_wealth", "has_risky_assets"]
-    ].copy()
+    df = _aggregate_by_index(
+        raw_monthly_background_variables, ["personal_id", "year"], YEARLY_AGGREGATIONS
+    ).reset_index()
+    df = narrow_dtypes(df, {"personal_id": "int"})
 
     assets_reset = raw_economic_situation_assets.reset_index()
 
@@ -154,66 +64,118 @@ def clean_dataset(
         how="left",
     )
 
-    df["total_wealth"] = _apply_lowest_float_dtype(df["total_wealth"])
     df["has_risky_assets"] = df["has_risky_assets"].astype("category")
-    df["share_risky_assets"] = _apply_lowest_float_dtype(df["share_risky_assets"])
-    return df
+    return narrow_dtypes(df, {"total_wealth": "float", "share_risky_assets": "float"})
 
 
-def _get_median_for_index(df, index, column):
-    """Get the median value for a column grouped by an index.
+def _get_most_common_for_index(df, index, column):
+    """Get the most common value for a column grouped by an index.
 
     Args:
             df (pd.DataFrame): The dataframe to group.
             index (str|list): The column(s) to group by.
-            column (str): The column to get the median for.
+            column (str): The column to get the most common value for.
 
     Returns:
-            pd.Series: The median values for the column grouped by the index.
+            pd.Series: The most common value for the column grouped by the index.
     """
-    return df.dropna(subset=[column]).groupby(index)[column].transform("median")
+    grouped = df.groupby(index, sort=True)
+    mode = _groupwise_mode(_get_group_ids(grouped), grouped.ngroups, df[column])
+    return pd.Series(mode, index=grouped.size().index, name=column)
 
 
-def _get_first_for_index(df, index, column):
-    """Get the first value for a column grouped by an index.
+def _groupwise_mode(group_ids, n_groups, sr):
+    """Get the most common value of a series within each group.
+
+    The values are counted on their category codes. Ties are resolved in favour of
+    the value observed first in the group, and missing values are ignored.
 
     Args:
-            df (pd.DataFrame): The dataframe to group.
-            index (str|list): The column(s) to group by.
-            column (str): The column to get the first value for.
+            group_ids (np.ndarray): The group of each row, -1 for rows in no group.
+            n_groups (int): The number of groups.
+            sr (pd.Series): The values to get the most common value of.
 
     Returns:
-            pd.Series: The first values for the column grouped by the index.
+            pd.Categorical: The most common value of each group, missing if the group
+            has no observed values.
     """
-    df[column] = _handle_missing_column(df, column)["series"]
-    return df.dropna(subset=[column]).groupby(index)[column].transform("first")
-
-
-def _get_most_common_for_index(df, index, column):
-    """Get the most common value for a column grouped by an index.
+    categorical = sr.astype("category")
+    n_categories = len(categorical.cat.categories)
+    codes = categorical.cat.codes.to_numpy()
+    if n_categories == 0:
+        return pd.Categorical.from_codes(np.full(n_groups, -1), dtype=categorical.dtype)
+
+    # One slot per (category, group), laid out so reductions run over categories.
+    # Missing values go to an extra first category and rows without a group to an
+    # extra last group, both dropped before picking the mode.
+    groups = np.where(group_ids < 0, n_groups, group_ids)
+    keys = (codes.astype(np.int64) + 1) * (n_groups + 1) + groups
+    n_rows = len(keys)
+    counts = np.bincount(keys, minlength=(n_categories + 1) * (n_groups + 1))
+    first_seen = np.full(len(counts), n_rows)
+    np.minimum.at(first_seen, keys, np.arange(n_rows))
+
+    # Rank by count, then by how early the value was first observed.
+    score = counts * (n_rows + 1) + (n_rows - first_seen)
+    score = score.reshape(n_categories + 1, n_groups + 1)[1:, :n_groups]
+    mode_codes = score.argmax(axis=0)
+    mode_codes[score.max(axis=0) == 0] = -1
+    return pd.Categorical.from_codes(mode_codes, dtype=categorical.dtype)
+
+
+def _get_group_ids(grouped):
+    """Get the group number of each row, -1 for rows with missing group keys."""
+    return grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _aggregate_by_index(df, index, aggregations):
+    """Aggregate several columns grouped by an index in a single groupby pass.
 
     Args:
             df (pd.DataFrame): The dataframe to group.
             index (str|list): The column(s) to group by.
-            column (str): The column to get the most common value for.
+            aggregations (dict): Maps each column to a tuple of the aggregation
+                ("first", "median", "mean" or "mode") and the target dtype ("int",
+                "float" or "category"). Columns missing in df are treated as entirely
+                missing.
 
     Returns:
-            pd.Series: The most common value for the column grouped by the index.
+            pd.DataFrame: One row per group, indexed by the index columns.
     """
-    return (
-        df.dropna(subset=[column]).groupby(index)[column].transform(lambda x: x.mode())
-    )
+    missing_columns = [column for column in aggregations if column not in df.columns]
+    df = df.assign(**dict.fromkeys(missing_columns, np.nan))
+    grouped = df.groupby(index, sort=True)
 
+    builtin = {
+        column: how for column, (how, _) in aggregations.items() if how != "mode"
+    }
+    if builtin:
+        aggregated = grouped[list(builtin)].agg(builtin)
+    else:
+        aggregated = pd.DataFrame(index=grouped.size().index)
 
-def _get_mean_for_index(df, index, column):
-    """Get the mean value for a column grouped by an index.
+    mode_columns = [column for column in aggregations if column not in builtin]
+    if mode_columns:
+        group_ids = _get_group_ids(grouped)
+        for column in mode_columns:
+            aggregated[column] = _groupwise_mode(group_ids, len(aggregated), df[column])
 
-    Args:
-            df (pd.DataFrame): The dataframe to group.
-            index (str|list): The column(s) to group by.
-            column (str): The column to get the mean for.
+    aggregated = aggregated[list(aggregations)]
+    return _cast_aggregates(aggregated, aggregations)
 
-    Returns:
-            pd.Series: The mean values for the column grouped by the index.
+
+def _cast_aggregates(aggregated, aggregations):
+    """Cast the aggregated columns to their target dtypes.
+
+    The "int" and "float" columns are narrowed together, the others are cast to their
+    dtype, e.g. "category".
     """
-    return df.dropna(subset=[column]).groupby(index)[column].transform("mean")
+    spec = {}
+    for column, (_, dtype) in aggregations.items():
+        if dtype == "int":
+            aggregated[column] = aggregated[column].round()
+        if dtype in ("int", "float"):
+            spec[column] = dtype
+        else:
+            aggregated[column] = aggregated[column].astype(dtype)
+    return narrow_dtypes(aggregated, spec)
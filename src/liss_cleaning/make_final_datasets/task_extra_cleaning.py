@@ -1,20 +1,21 @@
 """Tasks to perform extra cleaning steps on datasets produced from raw files."""
 
+from pathlib import Path
 from typing import Annotated
 
 import pandas as pd
 from pytask import DataCatalog, task
 
 from liss_cleaning.config import SRC_EXTRA_DATASETS_CLEANING
+from liss_cleaning.helper_modules.stacked_store import load_stacked
 from liss_cleaning.make_final_datasets.cleaners import (
     matching_probabilities,
     yearly_background_variables,
 )
-from liss_cleaning.raw_datasets_cleaning.task_clean_datasets import (
+from liss_cleaning.raw_datasets_cleaning.registry import (
     CATALOG_STACKED_DATASETS,
 )
 
-
 CLEANER_MODULES = {
     "matching_probabilities": matching_probabilities,
     "yearly_background_variables": yearly_background_variables,
@@ -36,8 +37,12 @@ for final_dataset_name, source_datasets in CATALOGS_EXTRA_DATASETS.items():
     @task(id=f"make_{final_dataset_name}")
     def task_make_new_dataset(
         function=cleaner_module.clean_dataset,
-        source_datasets=[CATALOG_STACKED_DATASETS[n] for n in source_datasets],
+        source_datasets=tuple(CATALOG_STACKED_DATASETS[n] for n in source_datasets),
         script=SRC_EXTRA_DATASETS_CLEANING / "cleaners" / f"{final_dataset_name}.py",
     ) -> Annotated[pd.DataFrame, FINAL_DATASETS[final_dataset_name]]:
         """Make a new dataset from the cleaned datasets."""
+        source_datasets = [
+            load_stacked(dataset) if isinstance(dataset, Path) else dataset
+            for dataset in source_datasets
+        ]
         return function(*source_datasets)
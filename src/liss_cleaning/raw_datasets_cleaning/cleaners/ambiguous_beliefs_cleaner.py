@@ -41,6 +41,34 @@ LOTTERY_PROBABILITIES = {
 }
 
 
+def get_raw_columns(source_file_name):  # noqa: ARG001
+    """Get the raw columns used to clean a wave of the ambiguous beliefs dataset.
+
+    Args:
+        source_file_name: Name of the source file.
+
+    Returns:
+        List of the raw column names read by `clean_dataset`.
+
+    """
+    choice_columns = [
+        f"keuze_{opt1_key}_{opt2_key}"
+        for opt1_key in AMBIGUOUS_OPTIONS
+        for opt2_key in LOTTERY_PROBABILITIES
+    ]
+    return [
+        "nomem_encr",
+        "check_aex",
+        "check_rad",
+        "check_rad2",
+        "check_aex2",
+        *choice_columns,
+        "TijdE",
+        "TijdB",
+        "DatumE",
+    ]
+
+
 def clean_dataset(raw, source_file_name):
     """Clean the ambiguous beliefs dataset.
 
@@ -75,6 +103,11 @@ def clean_dataset(raw, source_file_name):
     return df
 
 
+def get_wave_identifier(source_file_name):
+    """Get the wave number of a source file, e.g. 2 for "survey_ab_2_2019.dta"."""
+    return _extract_wave_identifier(source_file_name)
+
+
 def _extract_wave_identifier(source_file_name):
     """Extract wave number from source file name."""
     return int(source_file_name.split("_")[2])
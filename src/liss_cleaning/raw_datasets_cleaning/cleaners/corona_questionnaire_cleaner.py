@@ -5,6 +5,47 @@ from liss_cleaning.helper_modules.general_cleaners import (
 )
 
 
+def get_raw_columns(source_file_name: str) -> list:  # noqa: ARG001
+    """Get the raw columns used to clean a wave of the corona questionnaire.
+
+    The forward-looking questions are only asked in the second wave and are skipped
+    when loading the other waves.
+
+    Args:
+        source_file_name (str): The name of the source file.
+
+    Returns:
+        list: The raw column names read by `clean_dataset`.
+    """
+    return [
+        "nomem_encr",
+        "DatumB",
+        "forw_look_1_nocheck",
+        "forw_look_2_nocheck",
+        "forw_look_3_nocheck",
+        "forw_look_1",
+        "forw_look_2",
+        "forw_look_3",
+        "arandom",
+    ]
+
+
+def get_wave_identifier(source_file_name: str) -> int:
+    """Get the wave number of a source file of the corona questionnaire.
+
+    Args:
+        source_file_name (str): The name of the source file.
+
+    Returns:
+        int: The wave number.
+    """
+    if "wave" not in source_file_name:
+        return 2 if "4.0" in source_file_name else 1
+    if "Macro" in source_file_name:
+        return 7
+    return int(str(source_file_name).split("wave")[1].split("_")[0])
+
+
 def clean_dataset(
     raw: pd.DataFrame,
     source_file_name: str,
@@ -21,12 +62,7 @@ def clean_dataset(
     cleaned_data = pd.DataFrame(index=raw.index)
     cleaned_data["personal_id"] = _apply_lowest_int_dtype(raw["nomem_encr"])
     cleaned_data["date"] = pd.to_datetime(raw["DatumB"], format="mixed", dayfirst=True)
-    if "wave" not in source_file_name:
-        wave_id = 2 if "4.0" in source_file_name else 1
-    elif "Macro" in source_file_name:
-        wave_id = 7
-    else:
-        wave_id = int(str(source_file_name).split("wave")[1].split("_")[0])
+    wave_id = get_wave_identifier(source_file_name)
     cleaned_data["wave"] = wave_id
 
     if wave_id == 2:
@@ -1,119 +1,263 @@
+import functools
+import warnings
+
 import numpy as np
 import pandas as pd
 
 from liss_cleaning.helper_modules.general_cleaners import (
+    MISSING_SENTINELS,
     _apply_lowest_int_dtype,
-    _handle_inconsistent_column_code_in_raw,
+    _compile_column_table,
+    _compile_recoding,
     _replace_missing_floats,
     _replace_rename_categorical_column,
+    _select_columns,
+    narrow_dtypes,
 )
 
 pd.set_option("future.no_silent_downcasting", True)
 
+# Code of the raw column of each variable, or (code before, code after, year of the
+# switch) for columns whose code changed between waves. The "_categ" columns hold
+# the brackets asked when the value is not known.
+COLUMN_CODES = {
+    "has_banking_assets": ("004", "001", 2010),
+    "value_banking_assets": "012",
+    "value_banking_assets_categ": "013",
+    "has_insurance_assets": "005",
+    "value_insurance_assets": "014",
+    "value_insurance_assets_categ": "015",
+    "has_risky_assets": "006",
+    "value_risky_assets": "016",
+    "value_risky_assets_categ": "017",
+    "has_real_estate": "007",
+    "value_real_estate": "018",
+    "value_real_estate_categ": "019",
+    "has_real_estate_mortgage": "020",
+    "value_real_estate_mortgage": "021",
+    "value_real_estate_mortgage_categ": "022",
+    "has_vehicles": "008",
+    "value_vehicles": "023",
+    "value_vehicles_categ": "024",
+    "has_loans_to_others": "010",
+    "value_loans_to_others": "025",
+    "value_loans_to_others_categ": "026",
+    "has_other_assets": "011",
+    "value_other_assets": "027",
+    "value_other_assets_categ": "028",
+    "is_dga": "079",
+    "has_private_pension_company": "030",
+    "private_company_stake_percentage": "034",
+    "value_private_company_equity": "035",
+    "value_private_company_equity_categ": "036",
+    "has_partnership": "080",
+    "partnership_fiscal_year_matches_calendar": "041",
+    "value_partnership_equity": "083",
+    "value_partnership_equity_categ": "084",
+}
+
+# Variables that are not asked in some waves, by column time identifier.
+VARIABLES_NOT_IN_WAVES = {
+    "is_dga": ["08a"],
+    "value_partnership_equity": ["08a", "10b"],
+    "value_partnership_equity_categ": ["08a", "10b"],
+}
+
+# Variables whose raw column may be missing. They are NA if missing.
+OPTIONAL_VARIABLES = (
+    "has_private_pension_company",
+    "private_company_stake_percentage",
+    "has_partnership",
+    "partnership_fiscal_year_matches_calendar",
+)
 
-def clean_dataset(raw, source_file_name) -> pd.DataFrame:
-    cleaned = pd.DataFrame(index=raw.index)
-    column_time_identifier = str(source_file_name).split("/")[-1].split("_")[0][2:5]
-    cleaned["personal_id"] = _apply_lowest_int_dtype(raw["nomem_encr"])
-    cleaned["year"] = int(f"20{column_time_identifier[0:2]}")
-    banking_has_col_name = _handle_inconsistent_column_code_in_raw(
-        str(4).zfill(3),
-        str(1).zfill(3),
-        2010,
-        cleaned["year"].unique(),
-    )
-    cleaned["has_banking_assets"] = raw[
-        f"ca{column_time_identifier}{banking_has_col_name}"
-    ]
-    cleaned["value_banking_assets"] = _process_asset_value(
-        raw, column_time_identifier, "012", "013"
-    )
+# The asset columns summed to total wealth, and whether they may be negative.
+ASSET_COLUMNS = {
+    "value_banking_assets": True,
+    "value_insurance_assets": False,
+    "value_risky_assets": True,
+    "value_real_estate": False,
+    "value_vehicles": False,
+    "value_loans_to_others": False,
+    "value_other_assets": False,
+    "value_private_company_equity": True,
+    "value_partnership_equity": True,
+}
+
+# The liability columns subtracted from total wealth. They may not be negative.
+LIABILITY_COLUMNS = ["value_real_estate_mortgage"]
+
+# The types inferred by pandas for object columns that only hold numbers.
+NUMERIC_INFERRED_TYPES = ("empty", "floating", "integer", "mixed-integer-float")
+
+# The number of invalid values shown per column in a validation report.
+N_SAMPLE_VALUES = 5
+
+# The midpoint imputed for each bracket asked when the value of an asset is not
+# known. Labels are matched after normalization, see _normalize_bracket_label, so
+# variants with a garbled or missing euro sign need no entry of their own.
+BRACKET_MIDPOINTS = {
+    "less than € 50": 25.0,
+    "€ 50 to € 250": 150.0,
+    "€ 250 to € 500": 375.0,
+    "€ 500 to € 750": 625.0,
+    "€ 750 to € 1,000": 875.0,
+    "€ 1,000 to € 2,500": 1750.0,
+    "€ 2,500 to € 5,000": 3750.0,
+    "€ 5,000 to € 7,500": 6250.0,
+    "€ 7,500 to € 10,000": 8750.0,
+    "€ 10,000 to € 11,500": 10750.0,
+    "€ 11,500 to € 14,000": 12750.0,
+    "€ 14,000 to € 17,000": 15500.0,
+    "€ 17,000 to € 20,000": 18500.0,
+    "€ 20,000 to € 25,000": 22500.0,
+    "€ 25,000 or more": 25000.0,
+    "less than € 500": 250.0,
+    "€ 500 to € 1,500": 1000.0,
+    "€ 1,500 to € 2,500": 2000.0,
+    "€ 10,000 to € 12,000": 11000.0,
+    "€ 12,000 to € 15,000": 13500.0,
+    "€ 15,000 to € 20,000": 17500.0,
+    "€ 25,000 to € 50,000": 37500.0,
+    "€ 25,550 to € 50,000": 37775.0,
+    "€ 25,500 to € 50,000": 37750.0,
+    "€ 50,000 to € 75,000": 62500.0,
+    "€ 75,000 to € 100,000": 87500.0,
+    "€ 100,000 or more": 100000.0,
+    "less than € 50,000": 25000.0,
+    "€ 50,000 to € 100,000": 75000.0,
+    "€ 100,000 to € 150,000": 125000.0,
+    "€ 150,000 to € 200,000": 175000.0,
+    "€ 200,000 to € 250,000": 225000.0,
+    "€ 250,000 to € 400,000": 325000.0,
+    "€ 400,000 to € 500,000": 450000.0,
+    "€ 500,000 to € 1,000,000": 750000.0,
+    "€ 1,000,000 to € 2,500,000": 1750000.0,
+    "€ 2,500,000 or more": 2500000.0,
+    "positive, but smaller than € 50,000": 25000.0,
+}
+
+# Bracket answers that are missing values.
+MISSING_BRACKET_LABELS = ("negative", "I don't know", "I prefer not to say", "nan")
+
+# Numeric bracket answers that are missing values. Numeric answers that are not
+# negative are taken as the value of the asset, other negative ones are unmapped.
+MISSING_BRACKET_CODES = (
+    -9,
+    999,
+    -200,
+    -1180,
+    -10000,
+    -45000,
+    -70000,
+    -88000,
+    -150000,
+    -500000,
+    -5000000,
+)
 
-    cleaned["has_insurance_assets"] = raw[f"ca{column_time_identifier}005"]
-    cleaned["value_insurance_assets"] = _process_asset_value(
-        raw, column_time_identifier, "014", "015"
-    )
-    cleaned["value_insurance_assets"] = _add_zeros_for_nas_in_indicator_column(
-        cleaned["value_insurance_assets"], cleaned["has_insurance_assets"]
-    )
 
-    cleaned["has_risky_assets"] = _replace_rename_categorical_column(
-        raw[f"ca{column_time_identifier}006"], {"no": "No", "yes": "Yes"}
-    )
-    cleaned["value_risky_assets"] = _process_asset_value(
-        raw, column_time_identifier, "016", "017"
-    )
-    cleaned["value_risky_assets"] = _add_zeros_for_nas_in_indicator_column(
-        cleaned["value_risky_assets"], cleaned["has_risky_assets"]
-    )
+def get_raw_columns(source_file_name) -> list:
+    """Get the raw columns used to clean a wave of the economic situation assets data.
 
-    cleaned["has_real_estate"] = raw[f"ca{column_time_identifier}007"]
-    cleaned["value_real_estate"] = _process_asset_value(
-        raw, column_time_identifier, "018", "019"
-    )
-    cleaned["value_real_estate"] = _add_zeros_for_nas_in_indicator_column(
-        cleaned["value_real_estate"], cleaned["has_real_estate"]
-    )
+    Args:
+        source_file_name (str): The name of the source file.
 
-    cleaned["has_real_estate_mortgage"] = raw[f"ca{column_time_identifier}020"]
-    cleaned["value_real_estate_mortgage"] = _process_asset_value(
-        raw, column_time_identifier, "021", "022"
-    )
-    cleaned["value_real_estate_mortgage"] = _add_zeros_for_nas_in_indicator_column(
-        cleaned["value_real_estate_mortgage"], cleaned["has_real_estate_mortgage"]
-    )
+    Returns:
+        list: The raw column names read by `clean_dataset`.
+    """
+    column_table = _get_column_table(_get_column_time_identifier(source_file_name))
+    return ["nomem_encr", *column_table.values()]
 
-    cleaned["has_vehicles"] = raw[f"ca{column_time_identifier}008"]
-    cleaned["value_vehicles"] = _process_asset_value(
-        raw, column_time_identifier, "023", "024"
-    )
-    cleaned["value_vehicles"] = _add_zeros_for_nas_in_indicator_column(
-        cleaned["value_vehicles"], cleaned["has_vehicles"]
-    )
 
-    cleaned["has_loans_to_others"] = raw[f"ca{column_time_identifier}010"]
-    cleaned["value_loans_to_others"] = _process_asset_value(
-        raw, column_time_identifier, "025", "026"
-    )
-    cleaned["value_loans_to_others"] = _add_zeros_for_nas_in_indicator_column(
-        cleaned["value_loans_to_others"], cleaned["has_loans_to_others"]
-    )
+@functools.lru_cache
+def _get_column_table(column_time_identifier):
+    """Get the raw column of each variable asked in one wave, see `COLUMN_CODES`."""
+    column_table = _compile_column_table("ca", column_time_identifier, COLUMN_CODES)
+    for variable, waves in VARIABLES_NOT_IN_WAVES.items():
+        if column_time_identifier in waves:
+            del column_table[variable]
+    return column_table
+
+
+def get_wave_identifier(source_file_name):
+    """Get the time identifier of a source file, e.g. "08a" for "ca08a_1.1p_EN.dta"."""
+    return _get_column_time_identifier(source_file_name)
+
+
+def _get_column_time_identifier(source_file_name):
+    """Get the wave identifier used in the raw column names, e.g. '08a'."""
+    return str(source_file_name).split("/")[-1].split("_")[0][2:5]
 
-    cleaned["has_other_assets"] = raw[f"ca{column_time_identifier}011"]
-    cleaned["value_other_assets"] = _process_asset_value(
-        raw, column_time_identifier, "027", "028"
+
+# The renaming dictionary of each recoded categorical column, compiled with the
+# dtype of the column once for all waves.
+RECODINGS = {
+    "has_risky_assets": _compile_recoding(
+        {"no": "No", "yes": "Yes"},
+    ),
+}
+
+
+def clean_dataset(raw, source_file_name) -> pd.DataFrame:
+    cleaned = pd.DataFrame(index=raw.index)
+    column_time_identifier = _get_column_time_identifier(source_file_name)
+    columns = _select_columns(
+        raw, _get_column_table(column_time_identifier), optional=OPTIONAL_VARIABLES
     )
-    cleaned["value_other_assets"] = _add_zeros_for_nas_in_indicator_column(
-        cleaned["value_other_assets"], cleaned["has_other_assets"]
+    cleaned["personal_id"] = _apply_lowest_int_dtype(raw["nomem_encr"])
+    cleaned["year"] = int(f"20{column_time_identifier[0:2]}")
+    cleaned["has_banking_assets"] = columns["has_banking_assets"]
+    cleaned["value_banking_assets"] = _process_asset_value(
+        columns, "value_banking_assets"
     )
 
-    if column_time_identifier in ["08a"]:
-        cleaned["is_dga"] = pd.Series(np.nan, index=raw.index)
+    for asset in [
+        "insurance_assets",
+        "risky_assets",
+        "real_estate",
+        "real_estate_mortgage",
+        "vehicles",
+        "loans_to_others",
+        "other_assets",
+    ]:
+        if asset == "risky_assets":
+            cleaned[f"has_{asset}"] = _replace_rename_categorical_column(
+                columns[f"has_{asset}"], **RECODINGS["has_risky_assets"]
+            )
+        else:
+            cleaned[f"has_{asset}"] = columns[f"has_{asset}"]
+        cleaned[f"value_{asset}"] = _add_zeros_for_nas_in_indicator_column(
+            _process_asset_value(columns, f"value_{asset}"), cleaned[f"has_{asset}"]
+        )
+
+    if "is_dga" in columns:
+        cleaned["is_dga"] = columns["is_dga"]
     else:
-        cleaned["is_dga"] = raw[f"ca{column_time_identifier}079"]
-    cleaned["has_private_pension_company"] = raw.get(
-        f"ca{column_time_identifier}030", np.nan
+        cleaned["is_dga"] = pd.Series(np.nan, index=raw.index)
+    cleaned["has_private_pension_company"] = columns.get(
+        "has_private_pension_company", np.nan
     )
-    cleaned["private_company_stake_percentage"] = raw.get(
-        f"ca{column_time_identifier}034", np.nan
+    cleaned["private_company_stake_percentage"] = columns.get(
+        "private_company_stake_percentage", np.nan
     )
     cleaned["value_private_company_equity"] = _process_asset_value(
-        raw, column_time_identifier, "035", "036"
+        columns, "value_private_company_equity"
     )
     cleaned["value_private_company_equity"] = _add_zeros_for_nas_in_indicator_column(
         cleaned["value_private_company_equity"], cleaned["is_dga"]
     )
 
-    cleaned["has_partnership"] = raw.get(f"ca{column_time_identifier}080", np.nan)
-    cleaned["partnership_fiscal_year_matches_calendar"] = raw.get(
-        f"ca{column_time_identifier}041", np.nan
+    cleaned["has_partnership"] = columns.get("has_partnership", np.nan)
+    cleaned["partnership_fiscal_year_matches_calendar"] = columns.get(
+        "partnership_fiscal_year_matches_calendar", np.nan
     )
-    if column_time_identifier in ["10b", "08a"]:
-        cleaned["value_partnership_equity"] = pd.Series(np.nan, index=raw.index)
-    else:
+    if "value_partnership_equity" in columns:
         cleaned["value_partnership_equity"] = _process_asset_value(
-            raw, column_time_identifier, "083", "084"
+            columns, "value_partnership_equity"
         )
+    else:
+        cleaned["value_partnership_equity"] = pd.Series(np.nan, index=raw.index)
     cleaned["value_partnership_equity"] = _add_zeros_for_nas_in_indicator_column(
         cleaned["value_partnership_equity"], cleaned["has_partnership"]
     )
@@ -124,103 +268,116 @@ def clean_dataset(raw, source_file_name) -> pd.DataFrame:
         0,
         cleaned["value_risky_assets"] / cleaned["total_wealth"].replace(0, np.nan),
     )
-    return cleaned
+    return narrow_dtypes(
+        cleaned,
+        {
+            column: "currency"
+            for column in cleaned
+            if column.startswith("value_") or column == "total_wealth"
+        },
+    )
 
 
-def _check_column_sanity(
-    cleaned: pd.DataFrame,
-    column_name: str,
-    source_file_name: str,
-    allow_negative: bool = False,
-) -> None:
-    """
-    Check that a column contains only valid numeric values.
+def validate_asset_columns(cleaned, allow_negative=None) -> pd.DataFrame:
+    """Check that asset and liability columns hold numbers of the allowed sign.
+
+    All columns are checked at once, and every violation is reported.
 
     Args:
-        cleaned: DataFrame containing the column
-        column_name: Name of the column to check
-        source_file_name: Name of the source file (for error messages)
-        allow_negative: Whether negative values are allowed
+        cleaned (pd.DataFrame): The cleaned wave.
+        allow_negative (dict, optional): Maps the columns to check to whether they
+            may be negative. Defaults to the asset and liability columns.
+
+    Returns:
+        pd.DataFrame: One row per column with violations, indexed by column, with the
+            number of non-numeric and of negative values, and a sample of them. Empty
+            if all columns are valid.
 
     Raises:
-        TypeError: If column contains non-numeric values
-        ValueError: If column contains negative values when not allowed
+        KeyError: If columns to check are not in cleaned.
+
     """
-    if column_name not in cleaned.columns:
-        raise KeyError(
-            f"Column '{column_name}' not found in dataset '{source_file_name}'"
-        )
+    if allow_negative is None:
+        allow_negative = ASSET_COLUMNS | dict.fromkeys(LIABILITY_COLUMNS, False)
+    columns = list(allow_negative)
+    missing = [column for column in columns if column not in cleaned.columns]
+    if missing:
+        msg = f"The columns {missing} to validate are not in the dataset."
+        raise KeyError(msg)
+
+    values = cleaned[columns]
+    numbers = np.empty(values.shape, dtype=np.float64, order="F")
+    for i, column in enumerate(columns):
+        numbers[:, i] = _coerce_to_numbers(values[column])
+    is_non_numeric = values.notna().to_numpy() & np.isnan(numbers)
+    with np.errstate(invalid="ignore"):
+        is_negative = (numbers < 0) & ~np.array([allow_negative[c] for c in columns])
+    n_non_numeric = is_non_numeric.sum(axis=0)
+    n_negative = is_negative.sum(axis=0)
+
+    rows = {}
+    for i in np.flatnonzero(n_non_numeric + n_negative):
+        sample = values.iloc[:, i][is_non_numeric[:, i]].unique()[:N_SAMPLE_VALUES]
+        negative = pd.unique(numbers[is_negative[:, i], i])
+        negative = negative[: N_SAMPLE_VALUES - len(sample)]
+        rows[columns[i]] = {
+            "non_numeric": int(n_non_numeric[i]),
+            "negative": int(n_negative[i]),
+            "sample": [*sample, *negative.tolist()],
+        }
+    report = pd.DataFrame.from_dict(
+        rows, orient="index", columns=["non_numeric", "negative", "sample"]
+    )
+    report.index.name = "column"
+    return report
 
-    col = cleaned[column_name]
 
-    if col.dtype == "object":
-        string_mask = col.apply(lambda x: isinstance(x, str))
-        if string_mask.any():
-            string_values = col.loc[string_mask].unique()
-            raise TypeError(
-                f"Column '{column_name}' in dataset '{source_file_name}' contains string values. "
-                f"Sample values: {list(string_values[:5])}"
-            )
+def _coerce_to_numbers(series: pd.Series) -> np.ndarray:
+    """Get the values of a series as floats, NaN for missing and non-numeric values.
 
-    test_numeric = pd.to_numeric(col, errors="coerce")
-    non_null_before = col.notna().sum()
-    non_null_after = test_numeric.notna().sum()
+    Strings are non-numeric, even if they could be parsed to numbers.
+    """
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    if pd.api.types.infer_dtype(series, skipna=True) not in NUMERIC_INFERRED_TYPES:
+        series = series.where(~series.map(lambda value: isinstance(value, str)))
+    return pd.to_numeric(series, errors="coerce").to_numpy(
+        dtype=np.float64, na_value=np.nan
+    )
 
-    if non_null_after < non_null_before:
-        problem_values = col.loc[col.notna() & test_numeric.isna()].unique()
-        raise TypeError(
-            f"Column '{column_name}' in dataset '{source_file_name}' contains "
-            f"non-numeric values. Sample problematic values: {list(problem_values[:5])}"
-        )
 
-    if not allow_negative:
-        if (test_numeric < 0).any():
-            negative_count = (test_numeric < 0).sum()
-            negative_sample = test_numeric[test_numeric < 0].head(5).tolist()
-            raise ValueError(
-                f"Column '{column_name}' in dataset '{source_file_name}' contains "
-                f"{negative_count} negative values (not allowed). "
-                f"Sample negative values: {negative_sample}"
-            )
+def _calculate_total_wealth(cleaned: pd.DataFrame, source_file_name: str) -> pd.Series:
+    """Calculate total wealth by summing assets and subtracting liabilities.
 
+    Raises:
+        TypeError: If asset or liability columns hold non-numeric values.
+        ValueError: If asset or liability columns hold negative values where they are
+            not allowed, and no non-numeric values.
+        All violations are listed in the message.
 
-def _calculate_total_wealth(cleaned: pd.DataFrame, source_file_name: str) -> pd.Series:
-    """Calculate total wealth by summing assets and subtracting liabilities."""
-
-    assets_allowing_negative = {
-        "value_banking_assets": True,
-        "value_insurance_assets": False,
-        "value_risky_assets": True,
-        "value_real_estate": False,
-        "value_vehicles": False,
-        "value_loans_to_others": False,
-        "value_other_assets": False,
-        "value_private_company_equity": True,
-        "value_partnership_equity": True,
-    }
-
-    liability_columns = [
-        "value_real_estate_mortgage",
-    ]
-
-    for col, allow_negative in assets_allowing_negative.items():
-        _check_column_sanity(
-            cleaned, col, source_file_name, allow_negative=allow_negative
+    """
+    report = validate_asset_columns(cleaned)
+    if not report.empty:
+        msg = (
+            f"Invalid asset values in dataset '{source_file_name}':\n"
+            f"{report.to_string()}"
         )
+        if report["non_numeric"].any():
+            raise TypeError(msg)
+        raise ValueError(msg)
 
-    for col in liability_columns:
-        _check_column_sanity(cleaned, col, source_file_name, allow_negative=False)
-
-    asset_columns = list(assets_allowing_negative.keys())
-    total_assets = cleaned[asset_columns].sum(axis=1)
-    total_liabilities = cleaned[liability_columns].sum(axis=1)
+    total_assets = cleaned[list(ASSET_COLUMNS)].sum(axis=1)
+    total_liabilities = cleaned[LIABILITY_COLUMNS].sum(axis=1)
 
     return total_assets - total_liabilities
 
 
-def _process_asset_value(raw, column_time_identifier, value_code, categorical_code):
-    """Process asset value column with missing value replacement and categorical imputation."""
-    value_col = raw[f"ca{column_time_identifier}{value_code}"].copy()
+def _process_asset_value(columns, variable):
+    """Process asset value column.
+
+    Missing values are replaced, and imputed from the categorical column.
+    """
+    value_col = columns[variable].copy()
 
     if value_col.dtype.name == "category":
         value_col = value_col.astype(str)
@@ -237,22 +394,12 @@ def _process_asset_value(raw, column_time_identifier, value_code, categorical_co
 
     value_col = _replace_missing_floats(
         value_col,
-        float_nan_values=[
-            np.nan,
-            9999999999.0,
-            99999999998.0,
-            99999999999.0,
-            9999999998.0,
-            -9999999999.0,
-            -9999999998.0,
-            -8,
-            -9,
-        ],
+        float_nan_values=MISSING_SENTINELS["economic_situation_assets"],
     )
 
     return _add_imputed_values_from_categorical_column(
         value_col,
-        raw[f"ca{column_time_identifier}{categorical_code}"],
+        columns[f"{variable}_categ"],
     )
 
 
@@ -267,111 +414,86 @@ def _add_zeros_for_nas_in_indicator_column(
     return result
 
 
+def _normalize_bracket_label(label) -> str:
+    """Normalize a bracket label.
+
+    Drop the euro sign, also when it was decoded as a control character, collapse
+    whitespace and lowercase.
+    """
+    label = str(label).replace("\x80", " ").replace("€", " ")
+    return " ".join(label.split()).lower()
+
+
+def _compile_bracket_registry(midpoints, missing_labels) -> dict:
+    """Map the normalized bracket labels to their midpoints, NaN for missing labels.
+
+    Raises:
+        ValueError: If labels with different values have the same normalized label.
+
+    """
+    registry = {}
+    labels = {}
+    entries = [*midpoints.items(), *((label, np.nan) for label in missing_labels)]
+    for label, value in entries:
+        key = _normalize_bracket_label(label)
+        if key in registry and not (
+            registry[key] == value or (np.isnan(registry[key]) and np.isnan(value))
+        ):
+            msg = (
+                f"The bracket labels {labels[key]!r} and {label!r} are both read as "
+                f"{key!r}, but have different values."
+            )
+            raise ValueError(msg)
+        registry[key] = value
+        labels[key] = label
+    return registry
+
+
+BRACKET_REGISTRY = _compile_bracket_registry(BRACKET_MIDPOINTS, MISSING_BRACKET_LABELS)
+
+
 def _add_imputed_values_from_categorical_column(
     main_column: pd.Series, impute_from_column: pd.Series
 ) -> pd.Series:
-    """Impute missing values in main_asset_column from impute_from_column."""
-    try:
-        impute_from_column_str = impute_from_column.astype(str)
-        impute_from_column_str = impute_from_column_str.str.replace(
-            "\x80", "€", regex=False
-        )
+    """Impute missing values in main_column from the brackets in impute_from_column.
 
-        assets_from_categoricals = impute_from_column_str.replace(
-            {
-                "less than  50": 25.0,
-                "50 to  250": 150.0,
-                "250 to  500": 375.0,
-                "500 to  750": 625.0,
-                "750 to  1,000": 875.0,
-                "1,000 to  2,500": 1750.0,
-                "2,500 to  5,000": 3750.0,
-                "5,000 to  7,500": 6250.0,
-                "7,500 to  10,000": 8750.0,
-                "10,000 to  11,500": 10750.0,
-                "11,500 to  14,000": 12750.0,
-                "14,000 to  17,000": 15500.0,
-                "17,000 to  20,000": 18500.0,
-                "20,000 to  25,000": 22500.0,
-                "25,000 or more": 25000.0,
-                "less than € 50": 25.0,
-                "€ 50 to € 250": 150.0,
-                "€ 250 to € 500": 375.0,
-                "€ 500 to € 750": 625.0,
-                "€ 750 to € 1,000": 875.0,
-                "€ 1,000 to € 2,500": 1750.0,
-                "€ 2,500 to € 5,000": 3750.0,
-                "€ 5,000 to € 7,500": 6250.0,
-                "€ 7,500 to € 10,000": 8750.0,
-                "€ 10,000 to € 11,500": 10750.0,
-                "€ 11,500 to € 14,000": 12750.0,
-                "€ 14,000 to € 17,000": 15500.0,
-                "€ 17,000 to € 20,000": 18500.0,
-                "€ 20,000 to € 25,000": 22500.0,
-                "€ 25,000 or more": 25000.0,
-                "less than € 500": 250.0,
-                "€ 500 to € 1,500": 1000.0,
-                "€ 1,500 to € 2,500": 2000.0,
-                "€ 2,500 to € 5,000": 3750.0,
-                "€ 10,000 to € 12,000": 11000.0,
-                "€ 12,000 to € 15,000": 13500.0,
-                "€ 15,000 to € 20,000": 17500.0,
-                "€ 20,000 to € 25,000": 22500.0,
-                "€ 25,000 to € 50,000": 37500.0,
-                "€ 25,550 to € 50,000": 37775.0,
-                "€ 25,500 to € 50,000": 37750.0,
-                "€ 50,000 to € 75,000": 62500.0,
-                "€ 75,000 to € 100,000": 87500.0,
-                "€ 100,000 or more": 100000.0,
-                "less than € 50,000": 25000.0,
-                "€ 50,000 to € 100,000": 75000.0,
-                "€  50,000 to € 100,000": 75000.0,
-                "€ 100,000 to € 150,000": 125000.0,
-                "€ 150,000 to € 200,000": 175000.0,
-                "€ 200,000 to € 250,000": 225000.0,
-                "€ 250,000 to € 400,000": 325000.0,
-                "€ 400,000 to € 500,000": 450000.0,
-                "€ 500,000 to € 1,000,000": 750000.0,
-                "€ 1,000,000 to € 2,500,000": 1750000.0,
-                "€ 2,500,000 or more": 2500000.0,
-                "positive, but smaller than € 50,000": 25000.0,
-                "negative": np.nan,
-                "-9.0": np.nan,
-                "-9": np.nan,
-                "-150000.0": np.nan,
-                "-200.0": np.nan,
-                "-10000.0": np.nan,
-                "-70000.0": np.nan,
-                "-1180.0": np.nan,
-                -9.0: np.nan,
-                -9: np.nan,
-                -150000.0: np.nan,
-                -200.0: np.nan,
-                -10000.0: np.nan,
-                -70000.0: np.nan,
-                -1180.0: np.nan,
-                "999": np.nan,
-                "999.0": np.nan,
-                999: np.nan,
-                999.0: np.nan,
-                "I don't know": np.nan,
-                "I prefer not to say": np.nan,
-                "nan": np.nan,
-                "-5000000.0": np.nan,
-                "-500000.0": np.nan,
-                "-45000.0": np.nan,
-                "-88000.0": np.nan,
-            }
-        )
-        assets_from_categoricals = pd.to_numeric(
-            assets_from_categoricals, errors="coerce"
+    The value of each category of impute_from_column is looked up once and mapped to
+    the rows through the category codes. Labels that are not in the registry are not
+    imputed, and reported in a warning.
+    """
+    categorical = impute_from_column.astype("category")
+    codes = categorical.cat.codes.to_numpy()
+    is_used = np.bincount(codes[codes >= 0], minlength=len(categorical.cat.categories))
+    values, unmapped = _get_bracket_values(categorical.cat.categories, is_used > 0)
+    if unmapped:
+        warnings.warn(
+            f"The bracket labels {unmapped} of {impute_from_column.name!r} are not "
+            "in the bracket registry and are not imputed.",
+            stacklevel=2,
         )
-
-        if (assets_from_categoricals < 0).any():
-            raise ValueError(
-                "Negative values found in imputed assets from categoricals."
-            )
-        return main_column.fillna(assets_from_categoricals)
-    except Exception as e:
-        print(f"Error in imputing values from categorical column: {e}")
-        return main_column
+    imputed = pd.Series(
+        np.append(values, np.nan)[codes], index=impute_from_column.index
+    )
+    return main_column.fillna(imputed)
+
+
+def _get_bracket_values(labels: pd.Index, is_used: np.ndarray) -> tuple:
+    """Get the value of each bracket label, and the used labels that are unmapped."""
+    values = np.full(len(labels), np.nan)
+    unmapped = []
+    for i, label in enumerate(labels):
+        key = _normalize_bracket_label(label)
+        if key in BRACKET_REGISTRY:
+            values[i] = BRACKET_REGISTRY[key]
+            continue
+        try:
+            number = float(key)
+        except ValueError:
+            number = None
+        if number is not None and number in MISSING_BRACKET_CODES:
+            continue
+        if number is not None and number >= 0:
+            values[i] = number
+        elif is_used[i]:
+            unmapped.append(label)
+    return values, unmapped
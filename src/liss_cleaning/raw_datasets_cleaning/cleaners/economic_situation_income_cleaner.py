@@ -1,161 +1,148 @@
+import functools
+
 import numpy as np
 import pandas as pd
 
 from liss_cleaning.helper_modules.general_cleaners import (
+    MISSING_SENTINELS,
     _apply_lowest_float_dtype,
     _apply_lowest_int_dtype,
-    _handle_inconsistent_column_code_in_raw,
+    _compile_column_table,
+    _compile_recoding,
     _handle_missing_column,
     _replace_missing_floats,
     _replace_mixed_categoricals_floats,
     _replace_rename_categorical_column,
+    _select_columns,
+    narrow_dtypes,
 )
 
 pd.set_option("future.no_silent_downcasting", True)
 
+APPLIANCES_COLUMNS_TO_CODE = {
+    "camcorder": 279,
+    "car": 348,
+    "cd_dvd_writer": 276,
+    "cd_player": 273,
+    "computer": 282,
+    "deep_fryer": 291,
+    "digital_camera": 284,
+    "digital_tv": 270,
+    "dishwasher": 288,
+    "dvd_player": 274,
+    "dvd_recorder": 275,
+    "fixed_line_phone": 266,
+    "freezer": 289,
+    "games_console": 285,
+    "gps": 286,
+    "home_cinema": 272,
+    "microwave": 290,
+    "mp3_player": 277,
+    "mp4_player": 278,
+    "pda_with_inet": 281,
+    "pda_without_inet": 280,
+    "phone": 349,
+    "phone_w_inet": 268,
+    "phone_wo_inet": 267,
+    "printer": 283,
+    "satellite_dish": 271,
+    "widescreen_tv": 269,
+    "wash_dryer": 287,
+}
 
-def clean_dataset(raw, source_file_name) -> pd.DataFrame:
-    """Clean the economic situation income data from the LISS panel.
+# Code of the raw column of each variable, or (code before, code after, year of the
+# switch) for columns whose code changed between waves.
+COLUMN_CODES = {
+    "age": "002",
+    "alimony_children_amt": "208",
+    "alimony_partner_amt": "206",
+    **{
+        f"appliances_has_{appliance}": str(code)
+        for appliance, code in APPLIANCES_COLUMNS_TO_CODE.items()
+    },
+    "appliances_reason_nophone": "265",
+    "arrears_total_amount_other_bills": "300",
+    "arrears_total_amount_rent_mortgage": ("298", "381", 2019),
+    "arrears_total_amount_utilities": "299",
+    "benefit_anw_gross_amt": "111",
+    "benefit_anw_gross_amt_categ": ("112", "368", 2014),
+    "benefit_anw_net_amt": "113",
+    "benefit_healthcare_net_amt": "143",
+    # Read from the same column as the healthcare benefit.
+    "benefit_inval_gross_amt": "143",
+    "benefit_inval_gross_amt_categ": "114",
+    "benefit_inval_net_amt": "137",
+    "benefit_ioaw_gross_amt": "126",
+    "benefit_ioaw_gross_amt_categ": "127",
+    "benefit_ioaw_net_amt": "128",
+    "benefit_iow_gross_amt": "334",
+    "benefit_iow_gross_amt_categ": ("335", "371", 2014),
+    "benefit_iow_net_amt": "336",
+    "benefit_kindgebonden_net_amt": "330",
+    "benefit_orp_pens_gross_amt": "117",
+    "chance_to_lose_job": ("256", "379", 2019),
+}
+
+# Variables whose raw column is not asked in every wave. They are NA if missing.
+OPTIONAL_VARIABLES = (
+    *[f"appliances_has_{appliance}" for appliance in APPLIANCES_COLUMNS_TO_CODE],
+    "appliances_reason_nophone",
+    "benefit_anw_net_amt",
+    "benefit_healthcare_net_amt",
+    "benefit_inval_gross_amt",
+    "benefit_inval_net_amt",
+    "benefit_ioaw_gross_amt",
+    "benefit_ioaw_gross_amt_categ",
+    "benefit_iow_gross_amt",
+    "benefit_iow_gross_amt_categ",
+    "benefit_iow_net_amt",
+    "benefit_kindgebonden_net_amt",
+)
+
+
+def get_raw_columns(source_file_name) -> list:
+    """Get the raw columns used to clean a wave of the economic situation income data.
 
     Args:
-        raw (pd.DataFrame): The raw data.
         source_file_name (str): The name of the source file.
 
     Returns:
-        pd.DataFrame: The cleaned data.
+        list: The raw column names read by `clean_dataset`.
     """
-    cleaned = pd.DataFrame(index=raw.index)
-    column_time_identifier = str(source_file_name).split("/")[-1].split("_")[0][2:5]
-    cleaned["year"] = int(f"20{column_time_identifier[0:2]}")
-    cleaned["personal_id"] = _apply_lowest_int_dtype(raw["nomem_encr"])
-    cleaned["age"] = _apply_lowest_int_dtype(raw[f"ci{column_time_identifier}002"])
-    cleaned["alimony_children_amt"] = _replace_mixed_categoricals_floats(
-        float_nan_values=[9999999999, 9999999998],
-        categories_nan_entries=["I don't know", "I prefer not to say"],
-        series=raw[f"ci{column_time_identifier}208"],
-    )
-    cleaned["alimony_partner_amt"] = _replace_mixed_categoricals_floats(
-        float_nan_values=[9999999999, 9999999998],
-        categories_nan_entries=["I don't know", "I prefer not to say"],
-        series=raw[f"ci{column_time_identifier}206"],
-    )
+    column_table = _get_column_table(_get_column_time_identifier(source_file_name))
+    return ["nomem_encr", *dict.fromkeys(column_table.values())]
 
-    renaming_dict_appliances_columns = {
-        "yes": "Yes",
-        "no (not affordable)": "No",
-        "no (not necessary)": "No",
-        "no (other reason)": "No",
-        "no (don't need it)": "No",
-        "no (can't afford)": "No",
-        "don't know": pd.NA,
-        "nan": pd.NA,
-        "don\x92\t know": pd.NA,
-        "don\x92t know": pd.NA,
-    }
-    appliances_columns_to_code = {
-        "camcorder": 279,
-        "car": 348,
-        "cd_dvd_writer": 276,
-        "cd_player": 273,
-        "computer": 282,
-        "deep_fryer": 291,
-        "digital_camera": 284,
-        "digital_tv": 270,
-        "dishwasher": 288,
-        "dvd_player": 274,
-        "dvd_recorder": 275,
-        "fixed_line_phone": 266,
-        "freezer": 289,
-        "games_console": 285,
-        "gps": 286,
-        "home_cinema": 272,
-        "microwave": 290,
-        "mp3_player": 277,
-        "mp4_player": 278,
-        "pda_with_inet": 281,
-        "pda_without_inet": 280,
-        "phone": 349,
-        "phone_w_inet": 268,
-        "phone_wo_inet": 267,
-        "printer": 283,
-        "satellite_dish": 271,
-        "widescreen_tv": 269,
-        "wash_dryer": 287,
-    }
-    for appliance, column_code in appliances_columns_to_code.items():
-        handle_missing_dict = _handle_missing_column(
-            raw,
-            f"ci{column_time_identifier}{column_code}",
-        )
-        series = handle_missing_dict["series"]
-        is_missing = handle_missing_dict["is_missing"]
-        cleaned[f"appliances_has_{appliance}"] = _replace_rename_categorical_column(
-            series,
-            renaming_dict_appliances_columns,
-            is_missing=is_missing,
-        )
 
-    cleaned["appliances_reason_nophone"] = _replace_rename_categorical_column(
-        **_handle_missing_column(raw, f"ci{column_time_identifier}265"),
-        renaming_dict={
+@functools.lru_cache
+def _get_column_table(column_time_identifier):
+    """Get the raw column of each variable in one wave, see `COLUMN_CODES`."""
+    return _compile_column_table("ci", column_time_identifier, COLUMN_CODES)
+
+
+def get_wave_identifier(source_file_name):
+    """Get the time identifier of a source file, e.g. "08a" for "ca08a_1.1p_EN.dta"."""
+    return _get_column_time_identifier(source_file_name)
+
+
+def _get_column_time_identifier(source_file_name):
+    """Get the wave identifier used in the raw column names, e.g. '08a'."""
+    return str(source_file_name).split("/")[-1].split("_")[0][2:5]
+
+
+# The renaming dictionary of each recoded categorical column, compiled with the
+# dtype of the column once for all waves.
+RECODINGS = {
+    "appliances_reason_nophone": _compile_recoding(
+        {
             np.nan: pd.NA,
             99: pd.NA,
             98: pd.NA,
             "don't need it": "Don't need it",
             "can't afford it": "Can't afford",
         },
-    )
-
-    arrear_amt_columns_to_code = {
-        "other_bills": 300,
-        "rent_mortgage": _handle_inconsistent_column_code_in_raw(
-            298,
-            381,
-            2019,
-            cleaned["year"].unique(),
-        ),
-        "utilities": 299,
-    }
-
-    for arrear, column_code in arrear_amt_columns_to_code.items():
-        cleaned[f"arrears_total_amount_{arrear}"] = _replace_mixed_categoricals_floats(
-            float_nan_values=[9999999999, 9999999998],
-            categories_nan_entries=["I don't know", "I prefer not to say"],
-            series=raw[f"ci{column_time_identifier}{column_code}"],
-        )
-
-    cleaned["arrears_longest_duration_m_rent"] = _replace_mixed_categoricals_floats(
-        float_nan_values=[9999999999, 9999999998],
-        categories_nan_entries=["I don't know", "I prefer not to say"],
-        series=raw[f"ci{column_time_identifier}{column_code}"],
-    )
-    cleaned["arrears_longest_duration_m_utilities"] = (
-        _replace_mixed_categoricals_floats(
-            float_nan_values=[9999999999, 9999999998],
-            categories_nan_entries=["I don't know", "I prefer not to say"],
-            series=raw[f"ci{column_time_identifier}{column_code}"],
-        )
-    )
-
-    cleaned["benefit_anw_gross_amt"] = _replace_mixed_categoricals_floats(
-        float_nan_values=[9999999999, 9999999998],
-        categories_nan_entries=["I don't know"],
-        series=raw[f"ci{column_time_identifier}111"],
-    )
-
-    col_code_benefit_anw_gross_total_amount_categ = (
-        _handle_inconsistent_column_code_in_raw(
-            112,
-            368,
-            2014,
-            cleaned["year"].unique(),
-        )
-    )
-    cleaned["benefit_anw_gross_amt_categ"] = _replace_rename_categorical_column(
-        raw[
-            f"ci{column_time_identifier}{col_code_benefit_anw_gross_total_amount_categ}"
-        ],
-        renaming_dict={
+    ),
+    "benefit_anw_gross_amt_categ": _compile_recoding(
+        {
             "i don't know": pd.NA,
             "i don\x92t know": pd.NA,
             "i prefer not to say": pd.NA,
@@ -170,29 +157,9 @@ def clean_dataset(raw, source_file_name) -> pd.DataFrame:
             "8,000-12,000 euros": "8,000-12,000",
             "16,000-20,000 euros": "16,000-20,000",
         },
-        is_ordered=False,
-    )
-
-    cleaned["benefit_anw_net_amt"] = _replace_mixed_categoricals_floats(
-        **_handle_missing_column(raw, f"ci{column_time_identifier}113"),
-        float_nan_values=[9999999999, 9999999998],
-        categories_nan_entries=["I don't know", "I prefer not to say"],
-    )
-
-    cleaned["benefit_healthcare_net_amt"] = _replace_mixed_categoricals_floats(
-        **_handle_missing_column(raw, f"ci{column_time_identifier}143"),
-        float_nan_values=[9999999999, 9999999998],
-        categories_nan_entries=["I don't know", "I prefer not to say"],
-    )
-
-    cleaned["benefit_inval_gross_amt"] = _replace_mixed_categoricals_floats(
-        **_handle_missing_column(raw, f"ci{column_time_identifier}143"),
-        float_nan_values=[9999999999, 9999999998],
-        categories_nan_entries=["I don't know", "I prefer not to say"],
-    )
-    cleaned["benefit_inval_gross_amt_categ"] = _replace_rename_categorical_column(
-        raw[f"ci{column_time_identifier}114"],
-        renaming_dict={
+    ),
+    "benefit_inval_gross_amt_categ": _compile_recoding(
+        {
             "i don't know": pd.NA,
             "i don\x92t know": pd.NA,
             "i prefer not to say": pd.NA,
@@ -202,22 +169,9 @@ def clean_dataset(raw, source_file_name) -> pd.DataFrame:
             "6,000-12,000 euros": "6,000-12,000",
             "12,000-30,000 euros": "12,000-30,000",
         },
-        is_ordered=False,
-    )
-
-    series = _handle_missing_column(raw, f"ci{column_time_identifier}137")["series"]
-    cleaned["benefit_inval_net_amt"] = _apply_lowest_float_dtype(
-        _replace_missing_floats(series, [9999999999, 9999999998]),
-    )
-
-    series = _handle_missing_column(raw, f"ci{column_time_identifier}126")["series"]
-    cleaned["benefit_ioaw_gross_amt"] = _apply_lowest_float_dtype(
-        _replace_missing_floats(series, [9999999999, 9999999998]),
-    )
-
-    cleaned["benefit_ioaw_gross_amt_categ"] = _replace_rename_categorical_column(
-        **_handle_missing_column(raw, f"ci{column_time_identifier}127"),
-        renaming_dict={
+    ),
+    "benefit_ioaw_gross_amt_categ": _compile_recoding(
+        {
             "i don't know": pd.NA,
             "i don\x92t know": pd.NA,
             "i prefer not to say": pd.NA,
@@ -227,32 +181,9 @@ def clean_dataset(raw, source_file_name) -> pd.DataFrame:
             "6,000-12,000 euros": "6,000-12,000",
             "12,000-30,000 euros": "12,000-30,000",
         },
-        is_ordered=False,
-    )
-
-    cleaned["benefit_ioaw_net_amt"] = _replace_mixed_categoricals_floats(
-        series=raw[f"ci{column_time_identifier}128"],
-        float_nan_values=[9999999999, 9999999998],
-        categories_nan_entries=["I don't know", "I prefer not to say"],
-    )
-
-    series = _handle_missing_column(raw, f"ci{column_time_identifier}334")["series"]
-    cleaned["benefit_iow_gross_amt"] = _apply_lowest_float_dtype(
-        _replace_missing_floats(series, [9999999999, 9999999998]),
-    )
-
-    col_name = _handle_inconsistent_column_code_in_raw(
-        335,
-        371,
-        2014,
-        cleaned["year"].unique(),
-    )
-    cleaned["benefit_iow_gross_amt_categ"] = _replace_rename_categorical_column(
-        **_handle_missing_column(
-            raw,
-            f"ci{column_time_identifier}{col_name}",
-        ),
-        renaming_dict={
+    ),
+    "benefit_iow_gross_amt_categ": _compile_recoding(
+        {
             "i don't know": pd.NA,
             "i don\x92t know": pd.NA,
             "i prefer not to say": pd.NA,
@@ -263,34 +194,148 @@ def clean_dataset(raw, source_file_name) -> pd.DataFrame:
             "12,000-30,000 euros": "12,000-30,000",
         },
         is_ordered=True,
-    )
+    ),
+    "appliances_has": _compile_recoding(
+        {
+            "yes": "Yes",
+            "no (not affordable)": "No",
+            "no (not necessary)": "No",
+            "no (other reason)": "No",
+            "no (don't need it)": "No",
+            "no (can't afford)": "No",
+            "don't know": pd.NA,
+            "nan": pd.NA,
+            "don\x92\t know": pd.NA,
+            "don\x92t know": pd.NA,
+        },
+    ),
+}
+
+
+def clean_dataset(raw, source_file_name) -> pd.DataFrame:
+    """Clean the economic situation income data from the LISS panel.
+
+    Args:
+        raw (pd.DataFrame): The raw data.
+        source_file_name (str): The name of the source file.
 
-    cleaned["benefit_iow_net_amt"] = _replace_mixed_categoricals_floats(
-        **_handle_missing_column(raw, f"ci{column_time_identifier}336"),
-        float_nan_values=[9999999999, 9999999998],
+    Returns:
+        pd.DataFrame: The cleaned data.
+
+    Raises:
+        KeyError: If raw columns of required variables are missing.
+    """
+    cleaned = pd.DataFrame(index=raw.index)
+    column_time_identifier = _get_column_time_identifier(source_file_name)
+    columns = _select_columns(
+        raw, _get_column_table(column_time_identifier), optional=OPTIONAL_VARIABLES
+    )
+    cleaned["year"] = int(f"20{column_time_identifier[0:2]}")
+    cleaned["personal_id"] = _apply_lowest_int_dtype(raw["nomem_encr"])
+    cleaned["age"] = _apply_lowest_int_dtype(columns["age"])
+    cleaned["alimony_children_amt"] = _replace_mixed_categoricals_floats(
+        float_nan_values=MISSING_SENTINELS["economic_situation_income"],
+        categories_nan_entries=["I don't know", "I prefer not to say"],
+        series=columns["alimony_children_amt"],
+    )
+    cleaned["alimony_partner_amt"] = _replace_mixed_categoricals_floats(
+        float_nan_values=MISSING_SENTINELS["economic_situation_income"],
         categories_nan_entries=["I don't know", "I prefer not to say"],
+        series=columns["alimony_partner_amt"],
     )
 
-    cleaned["benefit_kindgebonden_net_amt"] = _replace_mixed_categoricals_floats(
-        **_handle_missing_column(raw, f"ci{column_time_identifier}330"),
-        float_nan_values=[9999999999, 9999999998],
+    for appliance in APPLIANCES_COLUMNS_TO_CODE:
+        variable = f"appliances_has_{appliance}"
+        cleaned[variable] = _replace_rename_categorical_column(
+            **_handle_missing_column(columns, variable), **RECODINGS["appliances_has"]
+        )
+
+    cleaned["appliances_reason_nophone"] = _replace_rename_categorical_column(
+        **_handle_missing_column(columns, "appliances_reason_nophone"),
+        **RECODINGS["appliances_reason_nophone"],
+    )
+
+    for variable in [
+        "arrears_total_amount_other_bills",
+        "arrears_total_amount_rent_mortgage",
+        "arrears_total_amount_utilities",
+    ]:
+        cleaned[variable] = _replace_mixed_categoricals_floats(
+            float_nan_values=MISSING_SENTINELS["economic_situation_income"],
+            categories_nan_entries=["I don't know", "I prefer not to say"],
+            series=columns[variable],
+        )
+
+    cleaned["benefit_anw_gross_amt"] = _replace_mixed_categoricals_floats(
+        float_nan_values=MISSING_SENTINELS["economic_situation_income"],
+        categories_nan_entries=["I don't know"],
+        series=columns["benefit_anw_gross_amt"],
+    )
+
+    cleaned["benefit_anw_gross_amt_categ"] = _replace_rename_categorical_column(
+        columns["benefit_anw_gross_amt_categ"],
+        **RECODINGS["benefit_anw_gross_amt_categ"],
+    )
+
+    for variable in [
+        "benefit_anw_net_amt",
+        "benefit_healthcare_net_amt",
+        "benefit_inval_gross_amt",
+    ]:
+        cleaned[variable] = _replace_mixed_categoricals_floats(
+            **_handle_missing_column(columns, variable),
+            float_nan_values=MISSING_SENTINELS["economic_situation_income"],
+            categories_nan_entries=["I don't know", "I prefer not to say"],
+        )
+    cleaned["benefit_inval_gross_amt_categ"] = _replace_rename_categorical_column(
+        columns["benefit_inval_gross_amt_categ"],
+        **RECODINGS["benefit_inval_gross_amt_categ"],
+    )
+
+    for variable in ["benefit_inval_net_amt", "benefit_ioaw_gross_amt"]:
+        series = _handle_missing_column(columns, variable)["series"]
+        cleaned[variable] = _apply_lowest_float_dtype(
+            _replace_missing_floats(
+                series, MISSING_SENTINELS["economic_situation_income"]
+            ),
+        )
+
+    cleaned["benefit_ioaw_gross_amt_categ"] = _replace_rename_categorical_column(
+        **_handle_missing_column(columns, "benefit_ioaw_gross_amt_categ"),
+        **RECODINGS["benefit_ioaw_gross_amt_categ"],
+    )
+
+    cleaned["benefit_ioaw_net_amt"] = _replace_mixed_categoricals_floats(
+        series=columns["benefit_ioaw_net_amt"],
+        float_nan_values=MISSING_SENTINELS["economic_situation_income"],
         categories_nan_entries=["I don't know", "I prefer not to say"],
     )
 
+    series = _handle_missing_column(columns, "benefit_iow_gross_amt")["series"]
+    cleaned["benefit_iow_gross_amt"] = _apply_lowest_float_dtype(
+        _replace_missing_floats(series, MISSING_SENTINELS["economic_situation_income"]),
+    )
+
+    cleaned["benefit_iow_gross_amt_categ"] = _replace_rename_categorical_column(
+        **_handle_missing_column(columns, "benefit_iow_gross_amt_categ"),
+        **RECODINGS["benefit_iow_gross_amt_categ"],
+    )
+
+    for variable in ["benefit_iow_net_amt", "benefit_kindgebonden_net_amt"]:
+        cleaned[variable] = _replace_mixed_categoricals_floats(
+            **_handle_missing_column(columns, variable),
+            float_nan_values=MISSING_SENTINELS["economic_situation_income"],
+            categories_nan_entries=["I don't know", "I prefer not to say"],
+        )
+
     cleaned["benefit_orp_pens_gross_amt"] = _replace_mixed_categoricals_floats(
-        series=raw[f"ci{column_time_identifier}117"],
-        float_nan_values=[9999999999, 9999999998],
+        series=columns["benefit_orp_pens_gross_amt"],
+        float_nan_values=MISSING_SENTINELS["economic_situation_income"],
         categories_nan_entries=["I don't know", "I prefer not to say"],
     )
 
-    col_name = _handle_inconsistent_column_code_in_raw(
-        256,
-        379,
-        2019,
-        cleaned["year"].unique(),
-    )
     cleaned["chance_to_lose_job"] = _replace_mixed_categoricals_floats(
-        float_nan_values=[9999999999, 9999999998],
+        float_nan_values=MISSING_SENTINELS["economic_situation_income"],
         categories_nan_entries=[
             998,
             999,
@@ -299,7 +344,9 @@ def clean_dataset(raw, source_file_name) -> pd.DataFrame:
             "n/a since I don\x92t have a job",
             "n/a since I don’t have a job",  # noqa: RUF001
         ],
-        series=raw[f"ci{column_time_identifier}{col_name}"],
+        series=columns["chance_to_lose_job"],
     )
 
-    return cleaned
+    return narrow_dtypes(
+        cleaned, {column: "currency" for column in cleaned if column.endswith("_amt")}
+    )
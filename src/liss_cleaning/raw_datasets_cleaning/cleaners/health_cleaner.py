@@ -1,6 +1,16 @@
 dependencies_time_index = {}
 
 
+def get_raw_columns(source_file_name: str) -> list | None:  # noqa: ARG001
+    """The health data is passed through as is, so all raw columns are read."""
+    return None
+
+
+def get_wave_identifier(source_file_name: str) -> str | None:  # noqa: ARG001
+    """The health data is passed through as is, so waves have no identifier."""
+    return None
+
+
 def clean_dataset(raw, source_file_name):
     source_file_name = source_file_name.split("/")[-1]
     return raw
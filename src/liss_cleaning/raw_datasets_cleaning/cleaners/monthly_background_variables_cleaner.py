@@ -1,11 +1,11 @@
 import pandas as pd
 
 from liss_cleaning.helper_modules.general_cleaners import (
-    _apply_lowest_float_dtype,
-    _apply_lowest_int_dtype,
     _categorical_to_float,
+    _compile_recoding,
     _handle_missing_column,
     _replace_rename_categorical_column,
+    narrow_dtypes,
 )
 
 
@@ -14,64 +14,103 @@ def _get_date_month(source_file_name):
     return time_identifier[:4] + "-" + time_identifier[4:]
 
 
-def clean_dataset(
-    raw,
-    source_file_name,
-) -> pd.DataFrame:
-    df = pd.DataFrame(index=raw.index)
-    time_identifier = _get_date_month(str(source_file_name))
+def get_wave_identifier(source_file_name):
+    """Get the survey month of a source file, e.g. "2019-05"."""
+    return _get_date_month(str(source_file_name))
 
-    income_categories = {
-        "no income": "No income",
-        "eur 500 or less": "Less than 500 euros",
-        "eur 501 to eur 1000": "501-1000 euros",
-        "eur 1001 to eur 1500": "1001-1500 euros",
-        "eur 1501 to eur 2000": "1501-2000 euros",
-        "eur 2001 to eur 2500": "2001-2500 euros",
-        "eur 3001 to eur 3500": "3001-3500 euros",
-        "eur 3501 to eur 4000": "3501-4000 euros",
-        "eur 4001 to eur 4500": "4001-4500 euros",
-        "eur 4501 to eur 5000": "4501-5000 euros",
-        "eur 5001 to eur 7500": "5001-7500 euros",
-        "more than eur 7500": "More than 7500 euros",
-        "i really don't know": pd.NA,
-        "i prefer not to say": pd.NA,
-    }
-    df["personal_id"] = _apply_lowest_int_dtype(raw["nomem_encr"])
-    df["age"] = _apply_lowest_int_dtype(raw["leeftijd"])
-    df["age_cbs"] = _replace_rename_categorical_column(
-        raw["lftdcat"],
-        is_ordered=True,
-        renaming_dict={
-            "55 - 64 years": "55-64",
-            "65 years and older": "65+",
+
+def _get_year_and_month(source_file_name):
+    """Get the survey year and month as integers from the source file name."""
+    year, month = _get_date_month(source_file_name).split("-")
+    return int(year), int(month)
+
+
+# Each row is cleaned on its own, so waves can be cleaned in chunks of rows.
+ROW_LOCAL = True
+
+RAW_COLUMNS = [
+    "nomem_encr",
+    "leeftijd",
+    "lftdcat",
+    "gebjaar",
+    "burgstat",
+    "doetmee",
+    "woonvorm",
+    "woning",
+    "oplcat",
+    "oplmet",
+    "oplzon",
+    "geslacht",
+    "brutocat",
+    "brutohh_f",
+    "brutoink_f",
+    "brutoink",
+    "aantalki",
+    "lftdhhh",
+    "nohouse_encr",
+    "aantalhh",
+    "positie",
+    "simpc",
+    "partner",
+    "nettocat",
+    "nettohh_f",
+    "nettoink_f",
+    "nettoink",
+    "netinc",
+    "belbezig",
+    "herkomstgroep",
+]
+
+
+# The numeric columns copied from the raw data, with their raw column and dtype kind.
+# Income columns that miss in some months are filled with NA.
+NUMERIC_COLUMNS = {
+    "personal_id": ("nomem_encr", "int"),
+    "age": ("leeftijd", "int"),
+    "birth_year": ("gebjaar", "int"),
+    "gross_income_hh": ("brutohh_f", "currency"),
+    "gross_income_imputed_personal": ("brutoink_f", "currency"),
+    "hh_head_age": ("lftdhhh", "int"),
+    "net_income_hh": ("nettohh_f", "currency"),
+    "net_income_imputed_personal": ("nettoink_f", "currency"),
+}
+
+
+def get_raw_columns(source_file_name):  # noqa: ARG001
+    """Get the raw columns used to clean a month of the background variables."""
+    return RAW_COLUMNS
+
+
+# The renaming dictionary of each recoded categorical column, compiled with the
+# dtype of the column once for all waves.
+RECODINGS = {
+    "age_cbs": _compile_recoding(
+        {
             "15 - 24 years": "18-24",
             "25 - 34 years": "25-34",
             "35 - 44 years": "35-44",
             "45 - 54 years": "45-54",
+            "55 - 64 years": "55-64",
+            "65 years and older": "65+",
         },
-    )
-    df["year_month"] = time_identifier
-    df["birth_year"] = _apply_lowest_int_dtype(raw["gebjaar"])
-    df["civil_status"] = _replace_rename_categorical_column(
-        raw["burgstat"],
-        renaming_dict={
+        is_ordered=True,
+    ),
+    "civil_status": _compile_recoding(
+        {
             "Married": "Married",
             "Never been married": "Never married",
             "Divorced": "Divorced",
             "Widow or widower": "Widowed",
         },
-    )
-    df["hh_member_participation"] = _replace_rename_categorical_column(
-        raw["doetmee"],
-        renaming_dict={
+    ),
+    "hh_member_participation": _compile_recoding(
+        {
             "yes": "Yes",
             "no": "No",
         },
-    )
-    df["dom_situation"] = _replace_rename_categorical_column(
-        raw["woonvorm"],
-        renaming_dict={
+    ),
+    "dom_situation": _compile_recoding(
+        {
             "(Un)married co-habitation, with child(ren)": (
                 "Co-habitation, " "with child(ren)"
             ),
@@ -91,83 +130,65 @@ def clean_dataset(
             "single": "Single",
             "other": "Other",
         },
-    )
-    df["dwelling_type"] = _replace_rename_categorical_column(
-        raw["woning"],
-        renaming_dict={
+    ),
+    "dwelling_type": _compile_recoding(
+        {
             "Self-owned dwelling": "Self-owned",
             "Rental dwelling": "Rental",
             "Cost-free dwelling": "Cost-free",
         },
-    )
-    renaming_dict_education = {
-        "wo (university)": "University",
-        "hbo (higher vocational education, us: college)": "Higher vocational education",
-        "mbo (intermediate vocational education, us: junior college)": (
-            "Intermediate " "vocational education"
-        ),
-        (
-            "havo/vwo (higher secondary education/preparatory university education, US:"
-            " senior high school)"
-        ): "Higher secondary education",
-        (
-            "vmbo (intermediate secondary education, us: junior " "high school)"
-        ): "Intermediate secondary education",
-        "primary school": "Primary school",
-        "other": "Other",
-        "not (yet) completed any education": "Other",
-        "not yet started any education": "Other",
-    }
-    df["education_cbs"] = _replace_rename_categorical_column(
-        raw["oplcat"],
-        renaming_dict=renaming_dict_education,
-    )
-    df["education_highest_diploma"] = _replace_rename_categorical_column(
-        raw["oplmet"],
-        renaming_dict=renaming_dict_education,
-    )
-    df["education_irrespective_diploma"] = _replace_rename_categorical_column(
-        raw["oplzon"],
-        renaming_dict=renaming_dict_education,
-    )
-    df["gender"] = _replace_rename_categorical_column(
-        raw["geslacht"],
-        renaming_dict={
+    ),
+    "education": _compile_recoding(
+        {
+            "wo (university)": "University",
+            "hbo (higher vocational education, us: college)": (
+                "Higher vocational education"
+            ),
+            "mbo (intermediate vocational education, us: junior college)": (
+                "Intermediate " "vocational education"
+            ),
+            (
+                "havo/vwo (higher secondary education/preparatory university "
+                "education, US: senior high school)"
+            ): "Higher secondary education",
+            (
+                "vmbo (intermediate secondary education, us: junior " "high school)"
+            ): "Intermediate secondary education",
+            "primary school": "Primary school",
+            "other": "Other",
+            "not (yet) completed any education": "Other",
+            "not yet started any education": "Other",
+        },
+    ),
+    "gender": _compile_recoding(
+        {
             "Male": "Male",
             "Female": "Female",
             "male": "Male",
             "female": "Female",
         },
-    )
-
-    df["female"] = (df["gender"] == "Female").astype(int)
-
-    df["gross_income_cat"] = _replace_rename_categorical_column(
-        raw["brutocat"],
-        renaming_dict=income_categories,
+    ),
+    "income_cat": _compile_recoding(
+        {
+            "no income": "No income",
+            "eur 500 or less": "Less than 500 euros",
+            "eur 501 to eur 1000": "501-1000 euros",
+            "eur 1001 to eur 1500": "1001-1500 euros",
+            "eur 1501 to eur 2000": "1501-2000 euros",
+            "eur 2001 to eur 2500": "2001-2500 euros",
+            "eur 3001 to eur 3500": "3001-3500 euros",
+            "eur 3501 to eur 4000": "3501-4000 euros",
+            "eur 4001 to eur 4500": "4001-4500 euros",
+            "eur 4501 to eur 5000": "4501-5000 euros",
+            "eur 5001 to eur 7500": "5001-7500 euros",
+            "more than eur 7500": "More than 7500 euros",
+            "i really don't know": pd.NA,
+            "i prefer not to say": pd.NA,
+        },
         is_ordered=True,
-    )
-
-    df["gross_income_hh"] = _apply_lowest_float_dtype(
-        _handle_missing_column(raw, "brutohh_f")["series"],
-    )
-    df["gross_income_imputed_personal"] = _apply_lowest_float_dtype(
-        _handle_missing_column(raw, "brutoink_f")["series"],
-    )
-
-    df["gross_income_incl_cat"] = _categorical_to_float(
-        raw["brutoink"],
-        nan_entries=[
-            "I don't know",
-            "Unknown (missing)",
-            "Prefer not to say",
-            "I dont know",
-        ],
-    )
-
-    df["hh_children"] = _replace_rename_categorical_column(
-        raw["aantalki"],
-        renaming_dict={
+    ),
+    "hh_children": _compile_recoding(
+        {
             "None": "No children",
             "One child": "One child",
             "Two children": "Two children",
@@ -180,14 +201,9 @@ def clean_dataset(
             "Nine children or more": "More than nine children",
         },
         is_ordered=True,
-    )
-    df["hh_head_age"] = _apply_lowest_int_dtype(
-        raw["lftdhhh"],
-    )
-    df["hh_id"] = raw["nohouse_encr"]
-    df["hh_members"] = _replace_rename_categorical_column(
-        raw["aantalhh"],
-        renaming_dict={
+    ),
+    "hh_members": _compile_recoding(
+        {
             "One person": "One person",
             "Two persons": "Two persons",
             "Three persons": "Three persons",
@@ -198,10 +214,9 @@ def clean_dataset(
             "Eight persons": "Eight persons",
             "Nine persons or more": "More than nine persons",
         },
-    )
-    df["respondent_position_hh"] = _replace_rename_categorical_column(
-        raw["positie"],
-        renaming_dict={
+    ),
+    "respondent_position_hh": _compile_recoding(
+        {
             "Household head": "Household head",
             "Wedded partner": "Wedded partner",
             "Unwedded partner": "Unwedded partner",
@@ -211,10 +226,9 @@ def clean_dataset(
             "Family member or boarder": "Family member or boarder",
             "Unknown (missing)": pd.NA,
         },
-    )
-    df["hh_position"] = _replace_rename_categorical_column(
-        raw["positie"],
-        renaming_dict={
+    ),
+    "hh_position": _compile_recoding(
+        {
             "Household head": "Household head",
             "Wedded partner": "Wedded partner",
             "Unwedded partner": "Unwedded partner",
@@ -224,57 +238,21 @@ def clean_dataset(
             "Family member or boarder": "Family member or boarder",
             "Unknown (missing)": pd.NA,
         },
-    )
-    df["hh_sim_computer"] = _replace_rename_categorical_column(
-        _handle_missing_column(raw, "simpc")["series"],
-        renaming_dict={
+    ),
+    "hh_sim_computer": _compile_recoding(
+        {
             "yes": "Yes",
             "no": "No",
         },
-    )
-    df["hh_head_lives_partner"] = _replace_rename_categorical_column(
-        raw["partner"],
-        renaming_dict={
+    ),
+    "hh_head_lives_partner": _compile_recoding(
+        {
             "Yes": "Yes",
             "No": "No",
         },
-    )
-    df["net_income_cat"] = _replace_rename_categorical_column(
-        raw["nettocat"],
-        renaming_dict=income_categories,
-        is_ordered=True,
-    )
-    df["net_income_hh"] = _apply_lowest_float_dtype(
-        _handle_missing_column(raw, "nettohh_f")["series"],
-    )
-    df["has_pos_net_income"] = df["net_income_hh"] > 0
-    df["net_income_imputed_personal"] = _apply_lowest_float_dtype(
-        _handle_missing_column(raw, "nettoink_f")["series"],
-    )
-    df["net_income_incl_cat"] = _categorical_to_float(
-        raw["nettoink"],
-        nan_entries=[
-            "I don't know",
-            "Unknown (missing)",
-            "Prefer not to say",
-            "I dont know",
-        ],
-    )
-    if _handle_missing_column(raw, "netinc")["is_missing"]:
-        df["net_income_personal"] = pd.NA
-    else:
-        df["net_income_personal"] = _categorical_to_float(
-            raw["netinc"],
-            nan_entries=[
-                "I don't know",
-                "Unknown (missing)",
-                "Prefer not to say",
-                "I dont know",
-            ],
-        )
-    df["occupation"] = _replace_rename_categorical_column(
-        raw["belbezig"],
-        renaming_dict={
+    ),
+    "occupation": _compile_recoding(
+        {
             "Paid employment": "Employed",
             "Works or assists in family business": "Works in family business",
             "Autonomous professional, freelancer, or self-employed": "Self-employed",
@@ -316,10 +294,9 @@ def clean_dataset(
             "performs voluntary work": "Voluntary work",
             "does something else": "Other occupation",
         },
-    )
-    df["origin"] = _replace_rename_categorical_column(
-        _handle_missing_column(raw, "herkomstgroep")["series"],
-        renaming_dict={
+    ),
+    "origin": _compile_recoding(
+        {
             "Dutch background": "Dutch",
             "First generation foreign, Western background": (
                 "First generation " "foreign, Western"
@@ -349,6 +326,142 @@ def clean_dataset(
             ),
             "origin unknown or part of the information unknown (missing values)": pd.NA,
         },
+    ),
+}
+
+
+def clean_dataset(
+    raw,
+    source_file_name,
+) -> pd.DataFrame:
+    df = pd.DataFrame(index=raw.index)
+    numeric = _get_numeric_columns(raw)
+    time_identifier = _get_date_month(str(source_file_name))
+
+    df["personal_id"] = numeric["personal_id"]
+    df["age"] = numeric["age"]
+    df["age_cbs"] = _replace_rename_categorical_column(
+        raw["lftdcat"], **RECODINGS["age_cbs"]
+    )
+    df["year_month"] = time_identifier
+    year, month = _get_year_and_month(str(source_file_name))
+    df["year"] = pd.Series(year, index=df.index, dtype="uint16[pyarrow]")
+    df["month"] = pd.Series(month, index=df.index, dtype="uint8[pyarrow]")
+    df["birth_year"] = numeric["birth_year"]
+    df["civil_status"] = _replace_rename_categorical_column(
+        raw["burgstat"], **RECODINGS["civil_status"]
+    )
+    df["hh_member_participation"] = _replace_rename_categorical_column(
+        raw["doetmee"], **RECODINGS["hh_member_participation"]
+    )
+    df["dom_situation"] = _replace_rename_categorical_column(
+        raw["woonvorm"], **RECODINGS["dom_situation"]
+    )
+    df["dwelling_type"] = _replace_rename_categorical_column(
+        raw["woning"], **RECODINGS["dwelling_type"]
+    )
+    df["education_cbs"] = _replace_rename_categorical_column(
+        raw["oplcat"], **RECODINGS["education"]
+    )
+    df["education_highest_diploma"] = _replace_rename_categorical_column(
+        raw["oplmet"], **RECODINGS["education"]
+    )
+    df["education_irrespective_diploma"] = _replace_rename_categorical_column(
+        raw["oplzon"], **RECODINGS["education"]
+    )
+    df["gender"] = _replace_rename_categorical_column(
+        raw["geslacht"], **RECODINGS["gender"]
+    )
+
+    df["female"] = (df["gender"] == "Female").astype(int)
+
+    df["gross_income_cat"] = _replace_rename_categorical_column(
+        raw["brutocat"], **RECODINGS["income_cat"]
+    )
+
+    df["gross_income_hh"] = numeric["gross_income_hh"]
+    df["gross_income_imputed_personal"] = numeric["gross_income_imputed_personal"]
+
+    df["gross_income_incl_cat"] = _categorical_to_float(
+        raw["brutoink"],
+        nan_entries=[
+            "I don't know",
+            "Unknown (missing)",
+            "Prefer not to say",
+            "I dont know",
+        ],
+    )
+
+    df["hh_children"] = _replace_rename_categorical_column(
+        raw["aantalki"], **RECODINGS["hh_children"]
+    )
+    df["hh_head_age"] = numeric["hh_head_age"]
+    df["hh_id"] = raw["nohouse_encr"]
+    df["hh_members"] = _replace_rename_categorical_column(
+        raw["aantalhh"], **RECODINGS["hh_members"]
+    )
+    df["respondent_position_hh"] = _replace_rename_categorical_column(
+        raw["positie"], **RECODINGS["respondent_position_hh"]
+    )
+    df["hh_position"] = _replace_rename_categorical_column(
+        raw["positie"], **RECODINGS["hh_position"]
+    )
+    df["hh_sim_computer"] = _replace_rename_categorical_column(
+        _handle_missing_column(raw, "simpc")["series"], **RECODINGS["hh_sim_computer"]
+    )
+    df["hh_head_lives_partner"] = _replace_rename_categorical_column(
+        raw["partner"], **RECODINGS["hh_head_lives_partner"]
+    )
+    df["net_income_cat"] = _replace_rename_categorical_column(
+        raw["nettocat"], **RECODINGS["income_cat"]
+    )
+    df["net_income_hh"] = numeric["net_income_hh"]
+    df["has_pos_net_income"] = df["net_income_hh"] > 0
+    df["net_income_imputed_personal"] = numeric["net_income_imputed_personal"]
+    df["net_income_incl_cat"] = _categorical_to_float(
+        raw["nettoink"],
+        nan_entries=[
+            "I don't know",
+            "Unknown (missing)",
+            "Prefer not to say",
+            "I dont know",
+        ],
+    )
+    if _handle_missing_column(raw, "netinc")["is_missing"]:
+        df["net_income_personal"] = pd.NA
+    else:
+        df["net_income_personal"] = _categorical_to_float(
+            raw["netinc"],
+            nan_entries=[
+                "I don't know",
+                "Unknown (missing)",
+                "Prefer not to say",
+                "I dont know",
+            ],
+        )
+    df["occupation"] = _replace_rename_categorical_column(
+        raw["belbezig"], **RECODINGS["occupation"]
+    )
+    df["origin"] = _replace_rename_categorical_column(
+        _handle_missing_column(raw, "herkomstgroep")["series"], **RECODINGS["origin"]
     )
 
     return df
+
+
+def _get_numeric_columns(raw):
+    """Copy the numeric columns from the raw data and narrow their dtypes at once."""
+    numeric = pd.DataFrame(
+        {
+            column: (
+                _handle_missing_column(raw, raw_column)["series"]
+                if kind != "int"
+                else raw[raw_column]
+            )
+            for column, (raw_column, kind) in NUMERIC_COLUMNS.items()
+        },
+        index=raw.index,
+    )
+    return narrow_dtypes(
+        numeric, {column: kind for column, (_, kind) in NUMERIC_COLUMNS.items()}
+    )
@@ -13,5 +13,17 @@ dependencies_time_index = {
 }
 
 
+# list the raw columns used by clean_dataset, so that only these are loaded from the
+# raw file (return None to load all of them)
+def get_raw_columns(dta_file):
+    pass
+
+
+# parse the wave or time identifier from the name of the raw file, with the same
+# rules as clean_dataset (return None if the waves have no identifier)
+def get_wave_identifier(dta_file):
+    pass
+
+
 def clean_dataset(raw, dta_file) -> pd.DataFrame:
     pass
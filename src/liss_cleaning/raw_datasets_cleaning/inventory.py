@@ -0,0 +1,184 @@
+"""Inventory of the raw files in `SRC_DATA`.
+
+For every raw file, the inventory stores its size, modification time, content hash,
+survey and wave identifier. Comparing it to the file system only needs a `stat` per
+file, so new, changed and deleted waves are found without reading them. The content
+hash of a file is only computed again if its size or modification time changed.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from liss_cleaning.config import BLD_RAW_INDEX, BLD_RAW_INVENTORY, SRC_DATA
+from liss_cleaning.helper_modules.load_save import atomic_write_path, get_file_hash
+from liss_cleaning.raw_datasets_cleaning.registry import (
+    CLEANER_MODULES,
+    SURVEY_FOLDERS,
+    get_raw_paths,
+)
+
+INVENTORY_FORMAT_VERSION = 1
+
+
+def diff_inventory(
+    src_data=SRC_DATA, inventory_path=BLD_RAW_INVENTORY, index_path=BLD_RAW_INDEX
+):
+    """Compare the inventory to the raw files, without reading them.
+
+    Args:
+        src_data (pathlib.Path): Folder of the raw data.
+        inventory_path (pathlib.Path): Path to the inventory.
+        index_path (pathlib.Path): Path to the index of the raw files.
+
+    Returns:
+        dict: The raw files, relative to `src_data`, that are "new", "changed" (size
+            or modification time differ) and "deleted" since the last update.
+
+    """
+    entries = read_inventory(inventory_path)
+    stats = _stat_raw_files(src_data, index_path)
+    return {
+        "new": sorted(name for name in stats if name not in entries),
+        "changed": sorted(
+            name
+            for name, (_, _, stat) in stats.items()
+            if name in entries and not _has_same_stat(entries[name], stat)
+        ),
+        "deleted": sorted(name for name in entries if name not in stats),
+    }
+
+
+def update_inventory(
+    src_data=SRC_DATA, inventory_path=BLD_RAW_INVENTORY, index_path=BLD_RAW_INDEX
+):
+    """Bring the inventory up to date with the raw files.
+
+    Only the files that are new or whose size or modification time changed are
+    hashed. A file that was touched but has the same content is not reported.
+
+    Args:
+        src_data (pathlib.Path): Folder of the raw data.
+        inventory_path (pathlib.Path): Path to the inventory.
+        index_path (pathlib.Path): Path to the index of the raw files.
+
+    Returns:
+        dict: The raw files, relative to `src_data`, that are "new", "changed" and
+            "deleted" since the last update.
+
+    """
+    previous = read_inventory(inventory_path)
+    entries = {}
+    changes = {"new": [], "changed": [], "deleted": []}
+    for name, (survey_name, path, stat) in _stat_raw_files(
+        src_data, index_path
+    ).items():
+        entry = previous.get(name)
+        if entry is not None and _has_same_stat(entry, stat):
+            entries[name] = entry
+            continue
+        entries[name] = {
+            "survey": survey_name,
+            "wave": CLEANER_MODULES[survey_name].get_wave_identifier(path.name),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": get_file_hash(path),
+        }
+        if entry is None:
+            changes["new"].append(name)
+        elif entry["sha256"] != entries[name]["sha256"]:
+            changes["changed"].append(name)
+    changes["deleted"] = sorted(name for name in previous if name not in entries)
+    _write_inventory(inventory_path, entries)
+    return {key: sorted(names) for key, names in changes.items()}
+
+
+def read_inventory(inventory_path=BLD_RAW_INVENTORY):
+    """Read the inventory of the raw files.
+
+    Args:
+        inventory_path (pathlib.Path): Path to the inventory.
+
+    Returns:
+        dict: The entries of the raw files, keyed by their path relative to
+            `SRC_DATA`. Empty if there is no inventory yet.
+
+    """
+    try:
+        inventory = json.loads(Path(inventory_path).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if inventory.get("version") != INVENTORY_FORMAT_VERSION:
+        return {}
+    return inventory["files"]
+
+
+def get_content_hash(path, src_data=SRC_DATA, inventory_path=BLD_RAW_INVENTORY):
+    """Get the content hash of a raw file from the inventory.
+
+    Args:
+        path (pathlib.Path): Path to the raw file.
+        src_data (pathlib.Path): Folder of the raw data.
+        inventory_path (pathlib.Path): Path to the inventory.
+
+    Returns:
+        str: The SHA-256 hash of the file, or None if the file is not in the
+            inventory or changed since the last update.
+
+    """
+    if not Path(path).is_relative_to(src_data):
+        return None
+    name = Path(path).relative_to(src_data).as_posix()
+    entry = read_inventory(inventory_path).get(name)
+    if entry is None or not _has_same_stat(entry, Path(path).stat()):
+        return None
+    return entry["sha256"]
+
+
+def _stat_raw_files(src_data, index_path):
+    """Get the survey, path and `stat` result of every raw file."""
+    stats = {}
+    for survey_name in SURVEY_FOLDERS:
+        for path in get_raw_paths(
+            survey_name, src_data=src_data, index_path=index_path
+        ):
+            name = path.relative_to(src_data).as_posix()
+            stats[name] = (survey_name, path, path.stat())
+    return stats
+
+
+def _has_same_stat(entry, stat):
+    """Check whether a file has the size and modification time of its entry."""
+    return entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+
+
+def _write_inventory(inventory_path, entries):
+    """Write the inventory atomically."""
+    inventory_path = Path(inventory_path)
+    inventory_path.parent.mkdir(parents=True, exist_ok=True)
+    inventory = {"version": INVENTORY_FORMAT_VERSION, "files": entries}
+    with atomic_write_path(inventory_path) as tmp_path:
+        tmp_path.write_text(json.dumps(inventory, indent=2))
+
+
+def inventory_cli(argv=None):
+    """Command line entry point to compare the inventory to the raw files."""
+    parser = argparse.ArgumentParser(
+        description="List the raw files that are new, changed or deleted."
+    )
+    parser.add_argument("--src-data", type=Path, default=SRC_DATA)
+    parser.add_argument("--inventory", type=Path, default=BLD_RAW_INVENTORY)
+    parser.add_argument("--index", type=Path, default=BLD_RAW_INDEX)
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Hash the new and changed files and update the inventory.",
+    )
+    args = parser.parse_args(argv)
+    function = update_inventory if args.update else diff_inventory
+    changes = function(args.src_data, args.inventory, args.index)
+    for key, symbol in [("new", "+"), ("changed", "~"), ("deleted", "-")]:
+        for name in changes[key]:
+            print(f"{symbol} {name}")  # noqa: T201
+    counts = ", ".join(f"{len(changes[key])} {key}" for key in changes)
+    print(f"{counts} raw files.")  # noqa: T201
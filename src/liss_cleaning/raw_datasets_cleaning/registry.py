@@ -0,0 +1,138 @@
+"""Registry of the surveys, their cleaners and their raw files.
+
+The raw files of a survey are found by walking its folder in `SRC_DATA`. The result is
+kept in an index in `BLD`, together with the modification times of the walked
+folders. The index is reused as long as no folder changed, so that collecting the
+tasks only costs a few `stat` calls instead of a walk of the data folders.
+"""
+
+import json
+import os
+import warnings
+from pathlib import Path
+
+from pytask import DataCatalog
+
+from liss_cleaning.config import BLD_RAW_INDEX, BLD_STACKED, SRC_DATA
+from liss_cleaning.helper_modules.load_save import atomic_write_path
+from liss_cleaning.helper_modules.stacked_store import get_manifest_path
+from liss_cleaning.raw_datasets_cleaning.cleaners import (
+    ambiguous_beliefs_cleaner,
+    corona_questionnaire_cleaner,
+    economic_situation_assets_cleaner,
+    economic_situation_income_cleaner,
+    health_cleaner,
+    monthly_background_variables_cleaner,
+)
+
+CLEANER_MODULES = {
+    "ambiguous_beliefs": ambiguous_beliefs_cleaner,
+    "monthly_background_variables": monthly_background_variables_cleaner,
+    "health": health_cleaner,
+    "economic_situation_assets": economic_situation_assets_cleaner,
+    "economic_situation_income": economic_situation_income_cleaner,
+    "corona_questionnaire": corona_questionnaire_cleaner,
+}
+
+SURVEY_FOLDERS = {
+    "ambiguous_beliefs": "xxx-ambiguous-beliefs",
+    "monthly_background_variables": "001-background-variables",
+    "health": "002-health",
+    "economic_situation_assets": "009-economic-situation-assets",
+    "economic_situation_income": "010-economic-situation-income",
+    "corona_questionnaire": "xyx-corona-questionnaire",
+}
+
+RAW_INDEX_FORMAT_VERSION = 1
+
+CATALOG_CLEANED_INDIVIDUAL_DATASETS = DataCatalog(name="individual_cleaned_datasets")
+
+CATALOG_STACKED_DATASETS = DataCatalog(name="stacked_datasets")
+
+# The stacked datasets of row-local surveys live in the partitioned store. Their
+# entries are registered here so that they do not depend on the raw files found.
+for _survey_name, _cleaner_module in CLEANER_MODULES.items():
+    if getattr(_cleaner_module, "ROW_LOCAL", False):
+        CATALOG_STACKED_DATASETS.add(
+            f"{_survey_name}_stacked", get_manifest_path(BLD_STACKED, _survey_name)
+        )
+
+
+def get_raw_paths(survey_name, src_data=SRC_DATA, index_path=BLD_RAW_INDEX):
+    """Get the paths to the raw files of a survey.
+
+    Files whose stem ends with "_do_not_use" are ignored. A survey whose folder does
+    not exist is skipped with a warning.
+
+    Args:
+        survey_name (str): Name of the survey, a key of `SURVEY_FOLDERS`.
+        src_data (pathlib.Path): Folder of the raw data.
+        index_path (pathlib.Path): Path to the index of the raw files.
+
+    Returns:
+        list: Paths to the raw .dta files of the survey, sorted.
+
+    """
+    folder = Path(src_data) / SURVEY_FOLDERS[survey_name]
+    if not folder.is_dir():
+        msg = f"Folder {folder} does not exist, skipping the survey {survey_name}."
+        warnings.warn(msg, stacklevel=2)
+        return []
+
+    index = _read_index(index_path)
+    entry = index.get(str(folder))
+    if entry is None or not _is_up_to_date(folder, entry["folder_mtimes"]):
+        entry = _scan_folder(folder)
+        index[str(folder)] = entry
+        _write_index(index_path, index)
+    return [folder / name for name in entry["files"]]
+
+
+def _scan_folder(folder):
+    """Walk a survey folder, listing its raw files and the times its folders changed."""
+    folder_mtimes = {}
+    files = []
+    for root, _, file_names in os.walk(folder):
+        relative_root = Path(root).relative_to(folder)
+        folder_mtimes[relative_root.as_posix()] = Path(root).stat().st_mtime_ns
+        files.extend(
+            (relative_root / name).as_posix()
+            for name in file_names
+            if name.endswith(".dta") and not name[:-4].endswith("_do_not_use")
+        )
+    return {"folder_mtimes": folder_mtimes, "files": sorted(files)}
+
+
+def _is_up_to_date(folder, folder_mtimes):
+    """Check whether none of the walked folders changed since the last walk.
+
+    Adding, removing or renaming a file or a subfolder changes the modification time
+    of the folder containing it.
+    """
+    for relative_folder, mtime_ns in folder_mtimes.items():
+        try:
+            if (folder / relative_folder).stat().st_mtime_ns != mtime_ns:
+                return False
+        except FileNotFoundError:
+            return False
+    return True
+
+
+def _read_index(index_path):
+    """Read the index of the raw files, or an empty one if it is missing or stale."""
+    try:
+        index = json.loads(Path(index_path).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if index.get("version") != RAW_INDEX_FORMAT_VERSION:
+        return {}
+    return index["folders"]
+
+
+def _write_index(index_path, folders):
+    """Write the index of the raw files atomically."""
+    index_path = Path(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    index = {"version": RAW_INDEX_FORMAT_VERSION, "folders": folders}
+    with atomic_write_path(index_path) as tmp_path:
+        tmp_path.write_text(json.dumps(index, indent=2))
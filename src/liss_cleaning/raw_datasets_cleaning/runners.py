@@ -0,0 +1,156 @@
+"""Functions to run the cleaners of the raw datasets outside of the in-memory tasks."""
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+
+from liss_cleaning.config import BLD_RAW_CACHE
+from liss_cleaning.helper_modules.load_save import (
+    load_data,
+    load_data_in_chunks,
+    save_data_in_chunks,
+)
+from liss_cleaning.helper_modules.stacked_store import concat_wave_tables
+from liss_cleaning.raw_datasets_cleaning.inventory import get_content_hash
+from liss_cleaning.raw_datasets_cleaning.registry import (
+    CLEANER_MODULES,
+    get_raw_paths,
+)
+
+CHUNKSIZE = 50_000
+
+
+def clean_dataset_in_chunks(
+    path,
+    out_path,
+    clean_dataset,
+    get_raw_columns,
+    chunksize=CHUNKSIZE,
+    cache_dir=None,
+    content_hash=None,
+):
+    """Clean one raw file chunk by chunk and append the results to a Parquet file.
+
+    Only valid for cleaners that are row-local, i.e. whose output for a row does not
+    depend on other rows (flagged by `ROW_LOCAL = True` in the cleaner module). Peak
+    memory is then bounded by the chunk size instead of the size of the file.
+
+    Args:
+        path (pathlib.Path): Path to the raw file.
+        out_path (pathlib.Path): Path to the cleaned Parquet file.
+        clean_dataset (callable): The `clean_dataset` function of the cleaner.
+        get_raw_columns (callable): The `get_raw_columns` function of the cleaner.
+        chunksize (int): The maximum number of rows per chunk.
+        cache_dir (pathlib.Path, optional): Folder of the raw-wave cache.
+        content_hash (str, optional): The SHA-256 hash of the raw file, see
+            `load_data`.
+
+    Returns:
+        pathlib.Path: Path to the cleaned Parquet file.
+
+    """
+    chunks = load_data_in_chunks(
+        path,
+        chunksize,
+        columns=get_raw_columns(path.name),
+        cache_dir=cache_dir,
+        content_hash=content_hash,
+    )
+    return save_data_in_chunks(
+        (clean_dataset(chunk, path.name) for chunk in chunks), out_path
+    )
+
+
+def clean_survey(
+    survey_name,
+    workers=None,
+    paths=None,
+    errors="raise",
+    cache_dir=BLD_RAW_CACHE,
+):
+    """Clean all waves of a survey in parallel and stack them.
+
+    Each wave is loaded and cleaned in a worker process and sent back as an Arrow
+    table. The waves are stacked in the order of `paths`, whatever the order in which
+    they finish.
+
+    Args:
+        survey_name (str): Name of the survey, e.g. "monthly_background_variables".
+        workers (int, optional): Number of worker processes. Defaults to the number
+            of CPUs. With 1, the waves are cleaned in the current process.
+        paths (list, optional): Paths to the raw files of the waves. Defaults to the
+            raw files of the survey in `SRC_DATA`.
+        errors (str): "raise" to raise if any wave fails, "warn" to warn about the
+            failed waves and stack the others.
+        cache_dir (pathlib.Path, optional): Folder of the raw-wave cache.
+
+    Returns:
+        pd.DataFrame: The stacked dataset, with a RangeIndex.
+
+    Raises:
+        ValueError: If `errors` is invalid, or if no wave could be cleaned.
+        RuntimeError: If `errors` is "raise" and any wave failed. The message lists
+            every failed wave.
+
+    """
+    if errors not in {"raise", "warn"}:
+        msg = f"errors must be 'raise' or 'warn', got {errors!r}."
+        raise ValueError(msg)
+    if paths is None:
+        paths = get_raw_paths(survey_name)
+    if not paths:
+        msg = f"No raw files to clean for {survey_name}."
+        raise ValueError(msg)
+
+    if workers == 1:
+        outcomes = [_get_outcome(_clean_wave, survey_name, p, cache_dir) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_clean_wave, survey_name, path, cache_dir)
+                for path in paths
+            ]
+            outcomes = [_get_outcome(future.result) for future in futures]
+
+    failures = {
+        path.name: error
+        for path, (_, error) in zip(paths, outcomes, strict=True)
+        if error is not None
+    }
+    if failures:
+        report = "\n".join(
+            f"  {name}: {type(error).__name__}: {error}"
+            for name, error in failures.items()
+        )
+        msg = f"Cleaning failed for {len(failures)} wave(s) of {survey_name}:\n{report}"
+        if errors == "raise":
+            raise RuntimeError(msg) from next(iter(failures.values()))
+        warnings.warn(msg, stacklevel=2)
+
+    tables = [table for table, error in outcomes if error is None]
+    if not tables:
+        msg = f"No wave of {survey_name} could be cleaned."
+        raise ValueError(msg)
+    return concat_wave_tables(tables)
+
+
+def _get_outcome(function, *args):
+    """Call a function, returning its result and the error it raised, if any."""
+    try:
+        return function(*args), None
+    except Exception as error:  # noqa: BLE001
+        return None, error
+
+
+def _clean_wave(survey_name, path, cache_dir):
+    """Load and clean one wave of a survey, returned as an Arrow table."""
+    cleaner_module = CLEANER_MODULES[survey_name]
+    raw = load_data(
+        path,
+        columns=cleaner_module.get_raw_columns(path.name),
+        cache_dir=cache_dir,
+        content_hash=get_content_hash(path),
+    )
+    cleaned = cleaner_module.clean_dataset(raw, path.name)
+    return pa.Table.from_pandas(cleaned, preserve_index=False)
@@ -1,70 +1,117 @@
 """Task to clean individual raw files for each survey, and stack them in a dataset."""
 
+from pathlib import Path
 from typing import Annotated
 
 import pandas as pd
-from pytask import DataCatalog, task
+from pytask import Product, task
 
-from liss_cleaning.config import SRC_DATA, SRC_RAW_DATASETS_CLEANING
-from liss_cleaning.helper_modules.general_error_handlers import _check_file_exists
+from liss_cleaning.config import (
+    BLD_RAW_CACHE,
+    BLD_RAW_INVENTORY,
+    BLD_STACKED,
+    SRC_RAW_DATASETS_CLEANING,
+)
 from liss_cleaning.helper_modules.load_save import load_data
-from liss_cleaning.raw_datasets_cleaning.cleaners import (
-    ambiguous_beliefs_cleaner,
-    corona_questionnaire_cleaner,
-    economic_situation_assets_cleaner,
-    economic_situation_income_cleaner,
-    health_cleaner,
-    monthly_background_variables_cleaner,
+from liss_cleaning.helper_modules.stacked_store import (
+    concat_waves,
+    get_partition_path,
+    update_manifest,
 )
+from liss_cleaning.raw_datasets_cleaning.inventory import (
+    get_content_hash,
+    update_inventory,
+)
+from liss_cleaning.raw_datasets_cleaning.registry import (
+    CATALOG_CLEANED_INDIVIDUAL_DATASETS,
+    CATALOG_STACKED_DATASETS,
+    CLEANER_MODULES,
+    SURVEY_FOLDERS,
+    get_raw_paths,
+)
+from liss_cleaning.raw_datasets_cleaning.runners import clean_dataset_in_chunks
 
+RAW_PATHS = {survey_name: get_raw_paths(survey_name) for survey_name in SURVEY_FOLDERS}
 
-CLEANER_MODULES = {
-    "ambiguous_beliefs": ambiguous_beliefs_cleaner,
-    "monthly_background_variables": monthly_background_variables_cleaner,
-    "health": health_cleaner,
-    "economic_situation_assets": economic_situation_assets_cleaner,
-    "economic_situation_income": economic_situation_income_cleaner,
-    "corona_questionnaire": corona_questionnaire_cleaner,
-}
-
-
-def get_dta_files_from_folder(folder_path):
-    """Get all .dta files from a folder, ignoring those ending with '_do_not_use'."""
-    _check_file_exists(folder_path)
-    return [p for p in folder_path.rglob("*.dta") if not p.stem.endswith("_do_not_use")]
-
-
-RAW_PATHS = {
-    "ambiguous_beliefs": get_dta_files_from_folder(SRC_DATA / "xxx-ambiguous-beliefs"),
-    "monthly_background_variables": get_dta_files_from_folder(
-        SRC_DATA / "001-background-variables"
-    ),
-    "health": get_dta_files_from_folder(SRC_DATA / "002-health"),
-    "economic_situation_assets": get_dta_files_from_folder(
-        SRC_DATA / "009-economic-situation-assets"
-    ),
-    "economic_situation_income": get_dta_files_from_folder(
-        SRC_DATA / "010-economic-situation-income"
-    ),
-    "corona_questionnaire": get_dta_files_from_folder(
-        SRC_DATA / "xyx-corona-questionnaire"
-    ),
-}
+ALL_RAW_PATHS = tuple(path for paths in RAW_PATHS.values() for path in paths)
 
 
-CATALOG_CLEANED_INDIVIDUAL_DATASETS = DataCatalog(name="individual_cleaned_datasets")
+def task_update_inventory(
+    inventory_path: Annotated[Path, Product] = BLD_RAW_INVENTORY,
+    raw_paths=ALL_RAW_PATHS,
+) -> None:
+    """Hash the new and changed raw files, the raw-wave cache reuses the hashes."""
+    update_inventory(inventory_path=inventory_path)
 
-CATALOG_STACKED_DATASETS = DataCatalog(name="stacked_datasets")
 
 for survey_name, paths_to_raw_files in RAW_PATHS.items():
+    if not paths_to_raw_files:
+        continue
     cleaner_module = CLEANER_MODULES[survey_name]
 
+    if getattr(cleaner_module, "ROW_LOCAL", False):
+        for path_to_raw_data in paths_to_raw_files:
+            CATALOG_CLEANED_INDIVIDUAL_DATASETS.add(
+                f"{path_to_raw_data.stem}_cleaned",
+                get_partition_path(BLD_STACKED, survey_name, path_to_raw_data.stem),
+            )
+
+            @task(
+                id=f"clean_{survey_name}_{path_to_raw_data.stem}",
+                after=task_update_inventory,
+            )
+            def task_clean_one_dataset_in_chunks(
+                cleaned_path: Annotated[
+                    Path,
+                    CATALOG_CLEANED_INDIVIDUAL_DATASETS[
+                        f"{path_to_raw_data.stem}_cleaned"
+                    ],
+                    Product,
+                ],
+                path=path_to_raw_data,
+                function=cleaner_module.clean_dataset,
+                get_raw_columns=cleaner_module.get_raw_columns,
+                script_path=SRC_RAW_DATASETS_CLEANING
+                / "cleaners"
+                / f"{survey_name}_cleaner.py",
+            ) -> None:
+                """Clean raw data from one wave of a survey, chunk by chunk."""
+                clean_dataset_in_chunks(
+                    path,
+                    cleaned_path,
+                    function,
+                    get_raw_columns,
+                    cache_dir=BLD_RAW_CACHE,
+                    content_hash=get_content_hash(path),
+                )
+
+        @task(id=f"stack_{survey_name}")
+        def task_update_stacked_dataset(
+            manifest_path: Annotated[
+                Path, CATALOG_STACKED_DATASETS[f"{survey_name}_stacked"], Product
+            ],
+            cleaned_paths=tuple(
+                CATALOG_CLEANED_INDIVIDUAL_DATASETS[f"{p.stem}_cleaned"]
+                for p in paths_to_raw_files
+            ),
+            dataset_name=survey_name,
+            waves=tuple(p.stem for p in paths_to_raw_files),
+        ) -> None:
+            """Register the cleaned waves of a survey in its stacked dataset."""
+            update_manifest(BLD_STACKED, dataset_name, waves)
+
+        continue
+
     for path_to_raw_data in paths_to_raw_files:
 
-        @task(id=f"clean_{survey_name}_{path_to_raw_data.stem}")
+        @task(
+            id=f"clean_{survey_name}_{path_to_raw_data.stem}",
+            after=task_update_inventory,
+        )
         def task_clean_one_dataset(
             path=path_to_raw_data,
             function=cleaner_module.clean_dataset,
+            get_raw_columns=cleaner_module.get_raw_columns,
             script_path=SRC_RAW_DATASETS_CLEANING
             / "cleaners"
             / f"{survey_name}_cleaner.py",
@@ -73,21 +120,21 @@ for survey_name, paths_to_raw_files in RAW_PATHS.items():
             CATALOG_CLEANED_INDIVIDUAL_DATASETS[f"{path_to_raw_data.stem}_cleaned"],
         ]:
             """Clean raw data from one wave of a survey."""
-            raw = load_data(path)
+            raw = load_data(
+                path,
+                columns=get_raw_columns(path.name),
+                cache_dir=BLD_RAW_CACHE,
+                content_hash=get_content_hash(path),
+            )
             return function(raw, path.name)
 
     @task(id=f"stack_{survey_name}")
     def task_stack_datasets(
-        cleaned_datasets=[
+        cleaned_datasets=tuple(
             CATALOG_CLEANED_INDIVIDUAL_DATASETS[f"{p.stem}_cleaned"]
             for p in paths_to_raw_files
-        ],
+        ),
         dataset_name=survey_name,
     ) -> Annotated[pd.DataFrame, CATALOG_STACKED_DATASETS[f"{survey_name}_stacked"]]:
         """Stack all the cleaned waves for each survey."""
-        return pd.concat(_drop_empty_columns(cleaned_datasets))
-
-
-def _drop_empty_columns(dataframes):
-    """Remove columns that are entirely NA before concatenation."""
-    return [df.dropna(axis=1, how="all") for df in dataframes]
+        return concat_waves(cleaned_datasets)
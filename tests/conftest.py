@@ -0,0 +1,19 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def make_interval_columns():
+    """Split {option: [(low, high) or pd.NA, ...]} into lower and upper columns."""
+
+    def _make_interval_columns(intervals):
+        columns = {}
+        for option, values in intervals.items():
+            for position, bound in enumerate(["lower", "upper"]):
+                columns[f"mp_{option}_{bound}"] = pd.array(
+                    [pd.NA if v is pd.NA else v[position] for v in values],
+                    dtype="float32[pyarrow]",
+                )
+        return columns
+
+    return _make_interval_columns
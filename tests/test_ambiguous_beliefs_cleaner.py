@@ -1,7 +1,6 @@
 """Tests for ambiguous_beliefs_cleaner helper functions."""
 
 import pandas as pd
-import pytest
 
 from liss_cleaning.raw_datasets_cleaning.cleaners.ambiguous_beliefs_cleaner import (
     _clean_aex_choice,
@@ -10,11 +9,11 @@ from liss_cleaning.raw_datasets_cleaning.cleaners.ambiguous_beliefs_cleaner impo
     _extract_wave_identifier,
     _parse_date_str,
     _parse_time_str,
+    get_raw_columns,
 )
 
 
 class TestExtractWaveIdentifier:
-
     def test_extracts_single_digit_wave(self):
         result = _extract_wave_identifier("survey_ab_1_2018.dta")
         assert result == 1
@@ -99,3 +98,15 @@ class TestParseDateStr:
     def test_space_returns_na(self):
         result = _parse_date_str(" ")
         assert pd.isna(result)
+
+
+class TestGetRawColumns:
+    def test_includes_identifier_and_choices(self):
+        result = get_raw_columns("survey_ab_1_2018.dta")
+        assert "nomem_encr" in result
+        assert "keuze_1_1" in result
+        assert "keuze_7_13" in result
+
+    def test_has_no_duplicates(self):
+        result = get_raw_columns("survey_ab_1_2018.dta")
+        assert len(result) == len(set(result))
@@ -0,0 +1,156 @@
+"""Tests for economic_situation_assets_cleaner helper functions."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from liss_cleaning.raw_datasets_cleaning.cleaners.economic_situation_assets_cleaner import (  # noqa: E501
+    ASSET_COLUMNS,
+    LIABILITY_COLUMNS,
+    _add_imputed_values_from_categorical_column,
+    _calculate_total_wealth,
+    _compile_bracket_registry,
+    _get_column_time_identifier,
+    _normalize_bracket_label,
+    get_raw_columns,
+    validate_asset_columns,
+)
+
+
+class TestGetColumnTimeIdentifier:
+    def test_extracts_identifier(self):
+        assert _get_column_time_identifier("ca08a_1.1p_EN.dta") == "08a"
+
+    def test_ignores_folder(self):
+        assert _get_column_time_identifier("data/ca12e_1.0p_EN.dta") == "12e"
+
+
+class TestGetRawColumns:
+    def test_uses_banking_code_before_switch(self):
+        result = get_raw_columns("ca08a_1.1p_EN.dta")
+        assert "ca08a004" in result
+        assert "ca08a001" not in result
+
+    def test_uses_banking_code_after_switch(self):
+        result = get_raw_columns("ca12e_1.0p_EN.dta")
+        assert "ca12e001" in result
+        assert "ca12e004" not in result
+
+    def test_includes_identifier_and_values(self):
+        result = get_raw_columns("ca12e_1.0p_EN.dta")
+        assert "nomem_encr" in result
+        assert "ca12e012" in result
+        assert "ca12e084" in result
+        assert len(result) == len(set(result))
+
+
+@pytest.fixture
+def cleaned():
+    columns = [*ASSET_COLUMNS, *LIABILITY_COLUMNS]
+    return pd.DataFrame({column: [100.0, np.nan, 0.0] for column in columns})
+
+
+class TestValidateAssetColumns:
+    def test_valid_columns_give_empty_report(self, cleaned):
+        assert validate_asset_columns(cleaned).empty
+
+    def test_reports_every_invalid_column(self, cleaned):
+        cleaned["value_vehicles"] = pd.Series([100.0, "abc", "12"], dtype=object)
+        cleaned["value_real_estate"] = [-1.0, -2.0, np.nan]
+        cleaned["value_real_estate_mortgage"] = [-3.0, 0.0, 5.0]
+        report = validate_asset_columns(cleaned)
+        assert report.to_dict("index") == {
+            "value_real_estate": {"non_numeric": 0, "negative": 2, "sample": [-1, -2]},
+            "value_vehicles": {
+                "non_numeric": 2,
+                "negative": 0,
+                "sample": ["abc", "12"],
+            },
+            "value_real_estate_mortgage": {
+                "non_numeric": 0,
+                "negative": 1,
+                "sample": [-3],
+            },
+        }
+
+    def test_allows_negative_values_where_allowed(self, cleaned):
+        cleaned["value_banking_assets"] = [-100.0, np.nan, 5.0]
+        assert validate_asset_columns(cleaned).empty
+
+    def test_missing_column_raises(self, cleaned):
+        with pytest.raises(KeyError, match="value_vehicles"):
+            validate_asset_columns(cleaned.drop(columns="value_vehicles"))
+
+
+class TestCalculateTotalWealth:
+    def test_subtracts_liabilities(self, cleaned):
+        result = _calculate_total_wealth(cleaned, "ca12e_1.0p_EN.dta")
+        assert result.tolist() == [800.0, 0.0, 0.0]
+
+    def test_invalid_values_raise_with_all_violations(self, cleaned):
+        cleaned["value_vehicles"] = [-1.0, np.nan, 0.0]
+        cleaned["value_other_assets"] = [-2.0, np.nan, 0.0]
+        with pytest.raises(ValueError, match="ca12e") as error:
+            _calculate_total_wealth(cleaned, "ca12e_1.0p_EN.dta")
+        assert "value_vehicles" in str(error.value)
+        assert "value_other_assets" in str(error.value)
+
+    def test_non_numeric_values_raise_type_error(self, cleaned):
+        cleaned["value_vehicles"] = pd.Series([100.0, "abc", 0.0], dtype=object)
+        cleaned["value_other_assets"] = [-2.0, np.nan, 0.0]
+        with pytest.raises(TypeError, match="ca12e") as error:
+            _calculate_total_wealth(cleaned, "ca12e_1.0p_EN.dta")
+        assert "value_other_assets" in str(error.value)
+
+
+class TestNormalizeBracketLabel:
+    def test_euro_sign_variants_match(self):
+        labels = [
+            "€ 50 to € 250",
+            "\x80 50 to \x80 250",
+            "50 to  250",
+            "€  50 To € 250",
+        ]
+        assert {_normalize_bracket_label(label) for label in labels} == {"50 to 250"}
+
+
+class TestCompileBracketRegistry:
+    def test_conflicting_labels_raise(self):
+        midpoints = {"€ 50 to € 250": 150.0, "50 to  250": 100.0}
+        with pytest.raises(ValueError, match="50 to 250"):
+            _compile_bracket_registry(midpoints, [])
+
+    def test_duplicate_labels_with_same_value(self):
+        midpoints = {"€ 50 to € 250": 150.0, "50 to  250": 150.0}
+        assert _compile_bracket_registry(midpoints, ["nan"]) == {
+            "50 to 250": 150.0,
+            "nan": pytest.approx(np.nan, nan_ok=True),
+        }
+
+
+class TestAddImputedValuesFromCategoricalColumn:
+    def test_imputes_missing_values_from_brackets(self):
+        main = pd.Series([np.nan, 10.0, np.nan, np.nan])
+        brackets = pd.Series(
+            pd.Categorical(["\x80 50 to \x80 250", "less than € 50", "negative", None])
+        )
+        result = _add_imputed_values_from_categorical_column(main, brackets)
+        assert result.tolist()[:2] == [150.0, 10.0]
+        assert result.iloc[2:].isna().all()
+
+    def test_uses_numeric_answers_except_missing_codes(self):
+        main = pd.Series([np.nan, np.nan, np.nan])
+        brackets = pd.Series([2500.0, -9.0, 999.0])
+        result = _add_imputed_values_from_categorical_column(main, brackets)
+        assert result.iloc[0] == 2500.0
+        assert result.iloc[1:].isna().all()
+
+    def test_warns_about_unmapped_labels(self):
+        main = pd.Series([np.nan, np.nan, np.nan])
+        brackets = pd.Series(
+            pd.Categorical(["€ 50 to € 250", "unknown", "-77"]), name="ca12e013"
+        )
+        with pytest.warns(UserWarning, match=r"\['-77', 'unknown'\] of 'ca12e013'"):
+            result = _add_imputed_values_from_categorical_column(main, brackets)
+        assert result.iloc[0] == 150.0
+        assert result.iloc[1:].isna().all()
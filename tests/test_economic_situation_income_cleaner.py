@@ -0,0 +1,36 @@
+"""Tests for economic_situation_income_cleaner helper functions."""
+
+import pandas as pd
+import pytest
+
+from liss_cleaning.raw_datasets_cleaning.cleaners.economic_situation_income_cleaner import (  # noqa: E501
+    clean_dataset,
+    get_raw_columns,
+)
+
+
+class TestGetRawColumns:
+    def test_uses_codes_before_switch(self):
+        result = get_raw_columns("ci13f_EN_1.0p.dta")
+        assert {"ci13f298", "ci13f112", "ci13f335", "ci13f256"}.issubset(result)
+        assert "ci13f381" not in result
+
+    def test_uses_codes_after_switch(self):
+        result = get_raw_columns("ci19l_EN_1.0p.dta")
+        assert {"ci19l381", "ci19l368", "ci19l371", "ci19l379"}.issubset(result)
+        assert "ci19l298" not in result
+
+    def test_includes_appliances(self):
+        result = get_raw_columns("ci19l_EN_1.0p.dta")
+        assert "ci19l279" in result
+        assert "ci19l002" in result
+        assert len(result) == len(set(result))
+
+
+class TestCleanDataset:
+    def test_reports_missing_columns_up_front(self):
+        raw = pd.DataFrame({"nomem_encr": [1, 2], "ci19l002": [40, 50]})
+        with pytest.raises(KeyError, match="alimony_children_amt") as error:
+            clean_dataset(raw, "ci19l_EN_1.0p.dta")
+        assert "chance_to_lose_job (ci19l379)" in str(error.value)
+        assert "appliances_has_car" not in str(error.value)
@@ -1,15 +1,23 @@
 """Tests for general_cleaners helper functions."""
 
+import numpy as np
 import pandas as pd
 import pytest
 
 from liss_cleaning.helper_modules.general_cleaners import (
+    MISSING_SENTINELS,
     _apply_lowest_int_dtype,
+    _categorical_to_float,
+    _compile_column_table,
+    _compile_recoding,
     _find_lowest_int_dtype,
     _handle_inconsistent_column_code_in_raw,
     _handle_missing_column,
     _replace_missing_floats,
+    _replace_rename_categorical_column,
     _replace_values,
+    _select_columns,
+    narrow_dtypes,
 )
 
 
@@ -72,6 +80,61 @@ class TestReplaceMissingFloats:
         assert result.iloc[0] == 1.0
         assert result.iloc[2] == 3.0
 
+    def test_keeps_float_dtype(self):
+        series = pd.Series([1.0, 9999999999, 3.0], index=[5, 6, 7], name="x")
+        result = _replace_missing_floats(series, [9999999999])
+        assert result.dtype == "float64"
+        assert result.index.tolist() == [5, 6, 7]
+        assert result.name == "x"
+        assert series.iloc[1] == 9999999999
+
+    def test_int_series_becomes_float_with_nan(self):
+        series = pd.Series([1, -9, 3])
+        result = _replace_missing_floats(
+            series, MISSING_SENTINELS["economic_situation_assets"]
+        )
+        assert result.dtype == "float64"
+        assert result.isna().tolist() == [False, True, False]
+
+    def test_nan_sentinel_replaces_missing_values(self):
+        series = pd.Series(["1.0", None, 9999999999.0], dtype=object)
+        result = _replace_missing_floats(series, [np.nan, 9999999999.0])
+        assert result.isna().tolist() == [False, True, True]
+        assert result.iloc[0] == "1.0"
+
+    def test_returns_series_without_sentinels_unchanged(self):
+        series = pd.Series([1, 2, 3])
+        result = _replace_missing_floats(series, [9999999999])
+        assert result is series
+
+
+class TestCategoricalToFloat:
+    def test_converts_labels_and_nan_entries(self):
+        series = pd.Series(
+            pd.Categorical(["1500", "I don't know", None, "-20.5", "1500"]),
+            index=[3, 4, 5, 6, 7],
+        )
+        result = _categorical_to_float(series, ["I don't know"])
+        assert result.index.tolist() == [3, 4, 5, 6, 7]
+        assert result.isna().tolist() == [False, True, True, False, False]
+        assert result.dropna().tolist() == [1500.0, -20.5, 1500.0]
+
+    def test_without_missing_values(self):
+        series = pd.Series(pd.Categorical(["1", "2", "2"]))
+        result = _categorical_to_float(series, ["I don't know"])
+        assert result.dtype == "float32[pyarrow]"
+        assert result.tolist() == [1.0, 2.0, 2.0]
+
+    def test_ignores_unused_categories(self):
+        series = pd.Series(pd.Categorical(["1", "2"], categories=["1", "2", "n/a"]))
+        result = _categorical_to_float(series, [])
+        assert result.tolist() == [1.0, 2.0]
+
+    def test_reports_all_unparseable_labels(self):
+        series = pd.Series(pd.Categorical(["1", "abc", "1,5"]), name="brutoink")
+        with pytest.raises(ValueError, match=r"'brutoink'.*\['1,5', 'abc'\]"):
+            _categorical_to_float(series, [])
+
 
 class TestFindLowestIntDtype:
     def test_small_positive_uses_uint8(self):
@@ -107,6 +170,78 @@ class TestApplyLowestIntDtype:
         assert list(result) == [1, 2, 3]
 
 
+class TestNarrowDtypes:
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                "id": [800001, 800002, 800003],
+                "age": [20.0, np.nan, 90.0],
+                "year": [-2018, 0, 2018],
+                "income": [1500.5, 0.0, 2300.0],
+                "wealth": [1.5, np.nan, -3.0],
+                "name": ["a", "b", "c"],
+            }
+        )
+
+    @pytest.fixture
+    def spec(self):
+        return {
+            "id": "int",
+            "age": "int",
+            "year": "int",
+            "income": "float",
+            "wealth": "float",
+        }
+
+    def test_matches_single_column_dtypes(self, df, spec):
+        result = narrow_dtypes(df, spec)
+        assert result["id"].dtype == _find_lowest_int_dtype(df["id"])
+        assert result["age"].dtype == "uint8[pyarrow]"
+        assert result["year"].dtype == "int16[pyarrow]"
+        assert result["income"].dtype == "float32[pyarrow]"
+        assert result["wealth"].dtype == "float64[pyarrow]"
+
+    def test_keeps_other_columns(self, df, spec):
+        result = narrow_dtypes(df, spec)
+        assert list(result.columns) == list(df.columns)
+        assert result["name"].equals(df["name"])
+
+    def test_all_missing_column(self):
+        df = pd.DataFrame({"a": pd.Series([pd.NA, pd.NA], dtype=object)})
+        result = narrow_dtypes(df, {"a": "float"})
+        assert result["a"].dtype == "float64[pyarrow]"
+        assert result["a"].isna().all()
+
+    def test_reports_bytes_saved(self, df, spec):
+        _, report = narrow_dtypes(df, spec, return_report=True)
+        assert list(report.index) == list(spec)
+        assert report.loc["age", "dtype_after"] == "uint8[pyarrow]"
+        assert report.loc["age", "bytes_before"] == 24
+        assert report.loc["age", "bytes_saved"] == 24 - report.loc["age", "bytes_after"]
+        assert report["bytes_saved"].sum() > 0
+
+    def test_currency_with_missing_values_uses_float32(self, df):
+        result = narrow_dtypes(df, {"wealth": "currency"})
+        assert result["wealth"].dtype == "float32[pyarrow]"
+        assert result["wealth"].isna().tolist() == [False, True, False]
+
+    def test_currency_keeps_float64_beyond_tolerance(self):
+        df = pd.DataFrame({"wealth": [1234567.89, np.nan]})
+        result = narrow_dtypes(df, {"wealth": "currency"})
+        assert result["wealth"].dtype == "float64[pyarrow]"
+
+    def test_currency_tolerance_is_configurable(self):
+        df = pd.DataFrame({"wealth": [1234567.89, np.nan]})
+        result = narrow_dtypes(df, {"wealth": "currency"}, currency_tolerance=0.1)
+        assert result["wealth"].dtype == "float32[pyarrow]"
+        assert abs(result["wealth"].iloc[0] - 1234567.89) <= 0.1
+
+    def test_invalid_kind_raises(self, df):
+        with pytest.raises(ValueError, match="category"):
+            narrow_dtypes(df, {"name": "category"})
+
+
 class TestHandleInconsistentColumnCodeInRaw:
     def test_returns_post_change_code_after_switch_year(self):
         result = _handle_inconsistent_column_code_in_raw(
@@ -134,3 +269,97 @@ class TestHandleInconsistentColumnCodeInRaw:
             year_current_df=2014,
         )
         assert result == "368"
+
+
+class TestCompileColumnTable:
+    def test_resolves_switching_codes(self):
+        codes = {"age": "002", "rent": ("298", "381", 2019)}
+        assert _compile_column_table("ci", "18k", codes) == {
+            "age": "ci18k002",
+            "rent": "ci18k298",
+        }
+        assert _compile_column_table("ci", "19l", codes)["rent"] == "ci19l381"
+
+
+class TestSelectColumns:
+    def test_renames_to_variables(self):
+        raw = pd.DataFrame({"ci19l002": [40, 50], "ci19l299": [1.0, 2.0]})
+        table = {"age": "ci19l002", "utilities": "ci19l299", "duration": "ci19l299"}
+        result = _select_columns(raw, table)
+        assert list(result.columns) == ["age", "utilities", "duration"]
+        assert result["duration"].tolist() == [1.0, 2.0]
+
+    def test_skips_missing_optional_variables(self):
+        raw = pd.DataFrame({"ci19l002": [40, 50]})
+        result = _select_columns(
+            raw, {"age": "ci19l002", "car": "ci19l348"}, optional=("car",)
+        )
+        assert list(result.columns) == ["age"]
+
+    def test_reports_all_missing_required_variables(self):
+        raw = pd.DataFrame({"ci19l002": [40, 50]})
+        table = {"age": "ci19l002", "car": "ci19l348", "phone": "ci19l349"}
+        with pytest.raises(KeyError, match="car \\(ci19l348\\), phone"):
+            _select_columns(raw, table)
+
+
+class TestReplaceRenameCategoricalColumn:
+    @pytest.mark.parametrize(
+        "values",
+        [
+            ["Yes", "no (not necessary)", None, "Don't know", "Yes"],
+            [1.0, 2.0, None, 99.0, 1.0],
+        ],
+    )
+    def test_categorical_matches_object_input(self, values):
+        renaming_dict = {
+            "yes": "Yes",
+            "no (not necessary)": "No",
+            "don't know": pd.NA,
+            "1.0": "Yes",
+            "2.0": "No",
+            "nan": "Missing",
+        }
+        expected = _replace_rename_categorical_column(
+            pd.Series(values, dtype=object).astype(str).replace("None", "nan"),
+            renaming_dict,
+            is_ordered=True,
+        )
+        result = _replace_rename_categorical_column(
+            pd.Series(pd.Categorical(values)), renaming_dict, is_ordered=True
+        )
+        pd.testing.assert_series_equal(result, expected)
+        assert result.iloc[2] == "Missing"
+
+    def test_unknown_categories_become_na(self):
+        series = pd.Series(pd.Categorical(["Yes", "maybe"]), index=[5, 6])
+        result = _replace_rename_categorical_column(series, {"yes": "Yes"})
+        assert result.tolist()[0] == "Yes"
+        assert pd.isna(result.iloc[1])
+        assert list(result.index) == [0, 1]
+
+    def test_categories_follow_renaming_dict(self):
+        renaming_dict = {"low": "Low", "high": "High", "very high": "High", "x": pd.NA}
+        waves = [
+            pd.Series(pd.Categorical(["High", "x"])),
+            pd.Series(pd.Categorical(["low", "Very high"])),
+            pd.Series(["low"], dtype=object),
+        ]
+        results = [
+            _replace_rename_categorical_column(wave, renaming_dict, is_ordered=True)
+            for wave in waves
+        ]
+        assert all(result.dtype == results[0].dtype for result in results)
+        assert list(results[0].cat.categories) == ["Low", "High"]
+        assert (results[1] < "High").tolist() == [True, False]
+
+    def test_compiled_recoding_matches_renaming_dict(self):
+        renaming_dict = {"low": "Low", "high": "High", "x": pd.NA}
+        recoding = _compile_recoding(renaming_dict, is_ordered=True)
+        series = pd.Series(pd.Categorical(["High", "x", "low"]))
+        result = _replace_rename_categorical_column(series, **recoding)
+        expected = _replace_rename_categorical_column(
+            series, renaming_dict, is_ordered=True
+        )
+        pd.testing.assert_series_equal(result, expected)
+        assert result.dtype == recoding["dtype"]
@@ -0,0 +1,128 @@
+"""Tests for inventory module."""
+
+import os
+
+import pytest
+
+from liss_cleaning.helper_modules.load_save import get_file_hash
+from liss_cleaning.raw_datasets_cleaning.inventory import (
+    diff_inventory,
+    get_content_hash,
+    inventory_cli,
+    read_inventory,
+    update_inventory,
+)
+from liss_cleaning.raw_datasets_cleaning.registry import SURVEY_FOLDERS
+
+MONTHLY = SURVEY_FOLDERS["monthly_background_variables"]
+CORONA = SURVEY_FOLDERS["corona_questionnaire"]
+
+
+@pytest.fixture
+def src_data(tmp_path):
+    src_data = tmp_path / "data"
+    for folder in SURVEY_FOLDERS.values():
+        (src_data / folder).mkdir(parents=True)
+    for name in [
+        f"{MONTHLY}/avars_201801_EN_1.0p.dta",
+        f"{MONTHLY}/avars_201802_EN_1.0p.dta",
+        f"{CORONA}/L_Corona_wave3_EN_1.0p.dta",
+    ]:
+        (src_data / name).write_bytes(name.encode())
+    return src_data
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {
+        "inventory_path": tmp_path / "inventory.json",
+        "index_path": tmp_path / "index.json",
+    }
+
+
+def _touch_folder(folder):
+    """Make a change of a folder visible with a coarse mtime resolution."""
+    os.utime(folder, ns=(0, 0))
+
+
+class TestUpdateInventory:
+    def test_records_raw_files(self, src_data, paths):
+        changes = update_inventory(src_data, **paths)
+        entries = read_inventory(paths["inventory_path"])
+        name = f"{MONTHLY}/avars_201802_EN_1.0p.dta"
+        assert changes["new"] == sorted(entries)
+        assert entries[name]["survey"] == "monthly_background_variables"
+        assert entries[name]["wave"] == "2018-02"
+        assert entries[name]["sha256"] == get_file_hash(src_data / name)
+        assert entries[f"{CORONA}/L_Corona_wave3_EN_1.0p.dta"]["wave"] == 3
+
+    def test_reports_changed_and_deleted_files(self, src_data, paths):
+        update_inventory(src_data, **paths)
+        changed = src_data / MONTHLY / "avars_201801_EN_1.0p.dta"
+        changed.write_bytes(b"new content")
+        (src_data / MONTHLY / "avars_201802_EN_1.0p.dta").unlink()
+        _touch_folder(src_data / MONTHLY)
+        changes = update_inventory(src_data, **paths)
+        assert changes == {
+            "new": [],
+            "changed": [f"{MONTHLY}/avars_201801_EN_1.0p.dta"],
+            "deleted": [f"{MONTHLY}/avars_201802_EN_1.0p.dta"],
+        }
+        assert update_inventory(src_data, **paths) == {
+            "new": [],
+            "changed": [],
+            "deleted": [],
+        }
+
+    def test_touched_file_with_same_content_is_not_changed(self, src_data, paths):
+        update_inventory(src_data, **paths)
+        os.utime(src_data / MONTHLY / "avars_201801_EN_1.0p.dta", ns=(0, 0))
+        assert diff_inventory(src_data, **paths)["changed"] == [
+            f"{MONTHLY}/avars_201801_EN_1.0p.dta"
+        ]
+        assert update_inventory(src_data, **paths)["changed"] == []
+        assert diff_inventory(src_data, **paths)["changed"] == []
+
+
+class TestDiffInventory:
+    def test_does_not_write_inventory(self, src_data, paths):
+        changes = diff_inventory(src_data, **paths)
+        assert len(changes["new"]) == 3
+        assert not paths["inventory_path"].exists()
+
+    def test_finds_new_file(self, src_data, paths):
+        update_inventory(src_data, **paths)
+        (src_data / MONTHLY / "avars_201803_EN_1.0p.dta").write_bytes(b"")
+        _touch_folder(src_data / MONTHLY)
+        assert diff_inventory(src_data, **paths)["new"] == [
+            f"{MONTHLY}/avars_201803_EN_1.0p.dta"
+        ]
+
+    def test_cli(self, src_data, paths, capsys):
+        args = [
+            "--src-data",
+            str(src_data),
+            "--inventory",
+            str(paths["inventory_path"]),
+            "--index",
+            str(paths["index_path"]),
+        ]
+        inventory_cli([*args, "--update"])
+        inventory_cli(args)
+        assert capsys.readouterr().out.splitlines()[-1] == (
+            "0 new, 0 changed, 0 deleted raw files."
+        )
+
+
+class TestGetContentHash:
+    def test_hash_of_unchanged_file(self, src_data, paths):
+        update_inventory(src_data, **paths)
+        path = src_data / MONTHLY / "avars_201801_EN_1.0p.dta"
+        result = get_content_hash(path, src_data, paths["inventory_path"])
+        assert result == get_file_hash(path)
+
+    def test_none_for_changed_file(self, src_data, paths):
+        update_inventory(src_data, **paths)
+        path = src_data / MONTHLY / "avars_201801_EN_1.0p.dta"
+        path.write_bytes(b"new content")
+        assert get_content_hash(path, src_data, paths["inventory_path"]) is None
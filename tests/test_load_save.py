@@ -1,9 +1,25 @@
 """Tests for load_save module."""
 
+import os
+from types import SimpleNamespace
+
 import pandas as pd
 import pytest
 
-from liss_cleaning.helper_modules.load_save import load_data, save_data
+from liss_cleaning.helper_modules import load_save
+from liss_cleaning.helper_modules.load_save import (
+    _get_stata_labels_by_column,
+    _iter_stata_chunks,
+    atomic_write_path,
+    get_cached_raw_path,
+    get_file_hash,
+    load_data,
+    load_data_in_chunks,
+    prune_raw_cache,
+    prune_raw_cache_cli,
+    save_data,
+    save_data_in_chunks,
+)
 
 
 class TestSaveData:
@@ -38,6 +54,31 @@ class TestSaveData:
             save_data(df, path)
 
 
+class TestAtomicWritePath:
+    def test_replaces_file(self, tmp_path):
+        path = tmp_path / "test.json"
+        path.write_text("old")
+        with atomic_write_path(path) as tmp_file:
+            tmp_file.write_text("new")
+            assert path.read_text() == "old"
+        assert path.read_text() == "new"
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_keeps_file_if_writing_fails(self, tmp_path):
+        path = tmp_path / "test.json"
+        path.write_text("old")
+
+        def write_partially():
+            with atomic_write_path(path) as tmp_file:
+                tmp_file.write_text("partial")
+                raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            write_partially()
+        assert path.read_text() == "old"
+        assert list(tmp_path.iterdir()) == [path]
+
+
 class TestLoadData:
     def test_loads_csv(self, tmp_path):
         df = pd.DataFrame({"a": [1, 2], "b": [3, 4]})
@@ -74,6 +115,260 @@ class TestLoadData:
             load_data(path)
 
 
+class TestLoadDataColumns:
+    @pytest.mark.parametrize(
+        "extension", [".csv", ".pickle", ".parquet", ".arrow", ".dta"]
+    )
+    def test_reads_requested_columns(self, tmp_path, extension):
+        df = pd.DataFrame({"a": [1, 2], "b": [3, 4], "c": [5, 6]})
+        path = tmp_path / f"test{extension}"
+        save_data(df, path)
+        result = load_data(path, columns=["c", "a"])
+        assert list(result.columns) == ["a", "c"]
+        assert result["c"].tolist() == [5, 6]
+
+    @pytest.mark.parametrize(
+        "extension", [".csv", ".pickle", ".parquet", ".arrow", ".dta"]
+    )
+    def test_skips_columns_not_in_file(self, tmp_path, extension):
+        df = pd.DataFrame({"a": [1, 2], "b": [3, 4]})
+        path = tmp_path / f"test{extension}"
+        save_data(df, path)
+        result = load_data(path, columns=["a", "not_in_file"])
+        assert list(result.columns) == ["a"]
+
+    def test_reads_all_columns_if_none(self, tmp_path):
+        df = pd.DataFrame({"a": [1, 2], "b": [3, 4]})
+        path = tmp_path / "test.parquet"
+        save_data(df, path)
+        result = load_data(path, columns=None)
+        pd.testing.assert_frame_equal(result, df)
+
+
+class TestLoadStata:
+    def test_matches_read_stata_with_unique_labels(self, tmp_path):
+        df = pd.DataFrame(
+            {"a": pd.Categorical(["x", "y", "x", None]), "b": [1, 2, 1, 3]}
+        )
+        path = tmp_path / "test.dta"
+        df.to_stata(path, write_index=False, value_labels={"b": {1: "p", 2: "q"}})
+        result = load_data(path)
+        pd.testing.assert_frame_equal(result, pd.read_stata(path))
+
+    def test_keeps_codes_for_duplicate_labels_only(self, tmp_path):
+        df = pd.DataFrame({"a": [1, 2, 1], "b": [1, 2, 3]})
+        path = tmp_path / "test.dta"
+        value_labels = {"a": {1: "p", 2: "q"}, "b": {1: "r", 2: "r", 3: "s"}}
+        df.to_stata(path, write_index=False, value_labels=value_labels)
+        result = load_data(path)
+        assert result["a"].tolist() == ["p", "q", "p"]
+        assert result["b"].tolist() == [1, 2, 3]
+        assert result.attrs["value_labels"] == {"b": {1: "r", 2: "r", 3: "s"}}
+
+    def test_applies_labels_to_selected_columns(self, tmp_path):
+        df = pd.DataFrame({"a": [1, 2, 1], "b": [1, 2, 3]})
+        path = tmp_path / "test.dta"
+        df.to_stata(path, write_index=False, value_labels={"b": {3: "s"}})
+        result = load_data(path, columns=["b"])
+        assert result["b"].tolist() == [1, 2, "s"]
+
+    def test_gets_value_labels_by_column(self, tmp_path):
+        df = pd.DataFrame({"a": [1, 2], "b": [1, 2], "c": [1, 2]})
+        path = tmp_path / "test.dta"
+        value_labels = {"a": {1: "p", 2: "q"}, "c": {2: "r"}}
+        df.to_stata(path, write_index=False, value_labels=value_labels)
+        with pd.io.stata.StataReader(path, convert_categoricals=False) as reader:
+            assert _get_stata_labels_by_column(reader) == value_labels
+
+    def test_raises_if_pandas_hides_label_names(self):
+        reader = SimpleNamespace(variable_labels=lambda: {"a": ""})
+        with pytest.raises(RuntimeError, match="value labels of the Stata variables"):
+            _get_stata_labels_by_column(reader)
+
+
+class TestRawCache:
+    @pytest.fixture
+    def raw_path(self, tmp_path):
+        df = pd.DataFrame({"a": pd.Categorical(["x", "y", "x"]), "b": [1.0, 2.0, 3.0]})
+        path = tmp_path / "wave.dta"
+        df.to_stata(path, write_index=False)
+        return path
+
+    def test_serves_converted_wave(self, tmp_path, raw_path):
+        cache_dir = tmp_path / "cache"
+        result = load_data(raw_path, columns=["b"], cache_dir=cache_dir)
+        cached = load_data(raw_path, columns=["b"], cache_dir=cache_dir)
+        pd.testing.assert_frame_equal(result, load_data(raw_path, columns=["b"]))
+        pd.testing.assert_frame_equal(cached, result)
+        assert [p.suffix for p in cache_dir.iterdir()] == [".parquet"]
+
+    def test_reuses_cached_file(self, tmp_path, raw_path):
+        first = get_cached_raw_path(raw_path, tmp_path / "cache")
+        second = get_cached_raw_path(raw_path, tmp_path / "cache")
+        assert first == second
+
+    def test_changed_file_gets_new_entry(self, tmp_path, raw_path):
+        first = get_cached_raw_path(raw_path, tmp_path / "cache")
+        pd.DataFrame({"a": [1]}).to_stata(raw_path, write_index=False)
+        second = get_cached_raw_path(raw_path, tmp_path / "cache")
+        assert first != second
+
+    def test_uses_given_content_hash(self, tmp_path, raw_path):
+        first = get_cached_raw_path(raw_path, tmp_path / "cache")
+        second = get_cached_raw_path(
+            raw_path, tmp_path / "cache", content_hash=get_file_hash(raw_path)
+        )
+        assert first == second
+
+    def test_uses_pickle_for_mixed_categories(self, tmp_path):
+        path = tmp_path / "wave.dta"
+        pd.DataFrame({"a": [1, 2]}).to_stata(
+            path, write_index=False, value_labels={"a": {1: "x"}}
+        )
+        cached = get_cached_raw_path(path, tmp_path / "cache")
+        assert cached.suffix == ".pickle"
+        pd.testing.assert_frame_equal(load_data(cached), load_data(path))
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        for i, name in enumerate(["old", "new"]):
+            path = tmp_path / f"{name}.parquet"
+            pd.DataFrame({"a": range(100)}).to_parquet(path)
+            os.utime(path, (i, i))
+        evicted = prune_raw_cache(tmp_path, (tmp_path / "new.parquet").stat().st_size)
+        assert evicted == [tmp_path / "old.parquet"]
+        assert (tmp_path / "new.parquet").exists()
+
+    def test_cli_clears_cache(self, tmp_path, raw_path):
+        cache_dir = tmp_path / "cache"
+        get_cached_raw_path(raw_path, cache_dir)
+        prune_raw_cache_cli(["--cache-dir", str(cache_dir), "--max-gb", "0"])
+        assert list(cache_dir.iterdir()) == []
+
+
+class TestLoadDataInChunks:
+    @pytest.mark.parametrize(
+        "extension", [".csv", ".pickle", ".parquet", ".arrow", ".dta"]
+    )
+    def test_chunks_add_up_to_dataset(self, tmp_path, extension):
+        df = pd.DataFrame({"a": range(10), "b": [float(i) for i in range(10)]})
+        path = tmp_path / f"test{extension}"
+        save_data(df, path)
+        chunks = list(load_data_in_chunks(path, 4, columns=["b"]))
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        assert all(chunk.index.equals(pd.RangeIndex(len(chunk))) for chunk in chunks)
+        result = pd.concat(chunks, ignore_index=True)
+        pd.testing.assert_frame_equal(result, load_data(path, columns=["b"]))
+
+    def test_labels_stata_chunks_consistently(self, tmp_path):
+        df = pd.DataFrame({"a": [1, 2, 1, 3], "b": [1, 2, 3, 3]})
+        path = tmp_path / "test.dta"
+        value_labels = {"a": {1: "p", 2: "q"}, "b": {1: "r", 2: "r", 3: "s"}}
+        df.to_stata(path, write_index=False, value_labels=value_labels)
+        chunks = list(load_data_in_chunks(path, 2))
+        assert [chunk["a"].tolist() for chunk in chunks] == [["p", "q"], ["p", 3]]
+        assert [chunk["b"].tolist() for chunk in chunks] == [[1, 2], [3, 3]]
+
+    def test_cold_cache_does_not_read_full_wave(self, tmp_path, monkeypatch):
+        df = pd.DataFrame({"a": range(10), "b": [float(i) for i in range(10)]})
+        path = tmp_path / "test.dta"
+        save_data(df, path)
+        expected = load_data(path)
+
+        def read_full_wave(*_args, **_kwargs):
+            msg = "The full wave was read."
+            raise AssertionError(msg)
+
+        monkeypatch.setattr(load_save, "load_data", read_full_wave)
+        monkeypatch.setattr(load_save, "_read_stata", read_full_wave)
+        cache_dir = tmp_path / "cache"
+        chunks = list(load_data_in_chunks(path, 4, cache_dir=cache_dir))
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+        (cached,) = cache_dir.iterdir()
+        assert cached.name.endswith("_chunks.parquet")
+
+    def test_second_run_reads_cache_filled_by_chunks(self, tmp_path, monkeypatch):
+        df = pd.DataFrame({"a": [1, 2, 1, 2, 1], "b": [float(i) for i in range(5)]})
+        path = tmp_path / "test.dta"
+        df.to_stata(path, write_index=False, value_labels={"a": {1: "p", 2: "q"}})
+        expected = list(load_data_in_chunks(path, 2))
+        calls = []
+
+        def count_stata_reads(*args):
+            calls.append(args)
+            return _iter_stata_chunks(*args)
+
+        monkeypatch.setattr(load_save, "_iter_stata_chunks", count_stata_reads)
+        cache_dir = tmp_path / "cache"
+        first = list(load_data_in_chunks(path, 2, columns=["b"], cache_dir=cache_dir))
+        second = list(load_data_in_chunks(path, 2, cache_dir=cache_dir))
+        assert len(calls) == 1
+        for result, chunk in zip(first, expected, strict=True):
+            pd.testing.assert_frame_equal(result, chunk[["b"]])
+        for result, chunk in zip(second, expected, strict=True):
+            assert result["a"].tolist() == chunk["a"].tolist()
+            pd.testing.assert_series_equal(result["b"], chunk["b"])
+
+    def test_partial_read_leaves_cache_cold(self, tmp_path):
+        path = tmp_path / "test.dta"
+        save_data(pd.DataFrame({"a": range(10)}), path)
+        cache_dir = tmp_path / "cache"
+        chunks = load_data_in_chunks(path, 4, cache_dir=cache_dir)
+        next(chunks)
+        chunks.close()
+        assert list(cache_dir.iterdir()) == []
+
+    def test_reads_chunks_from_warm_cache(self, tmp_path):
+        df = pd.DataFrame({"a": range(10), "b": [float(i) for i in range(10)]})
+        path = tmp_path / "test.dta"
+        save_data(df, path)
+        expected = load_data(path)
+        content_hash = get_file_hash(path)
+        cache_dir = tmp_path / "cache"
+        get_cached_raw_path(path, cache_dir)
+        path.unlink()
+        chunks = list(
+            load_data_in_chunks(path, 4, cache_dir=cache_dir, content_hash=content_hash)
+        )
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+    def test_raises_for_unsupported_format(self, tmp_path):
+        with pytest.raises(ValueError, match="Format .* not supported"):
+            list(load_data_in_chunks(tmp_path / "test.xyz", 2))
+
+
+class TestSaveDataInChunks:
+    def test_widens_types_across_chunks(self, tmp_path):
+        first = pd.DataFrame(
+            {
+                "a": pd.array([1, 2], dtype="uint8[pyarrow]"),
+                "b": pd.Categorical(["x", "y"]),
+            }
+        )
+        second = pd.DataFrame(
+            {
+                "a": pd.array([300, None], dtype="uint16[pyarrow]"),
+                "b": pd.Categorical(["z", None]),
+                "c": [1.5, 2.5],
+            }
+        )
+        path = save_data_in_chunks([first, second], tmp_path / "test.parquet")
+        result = load_data(path)
+        assert result["a"].dtype == "uint16[pyarrow]"
+        assert result["a"].tolist()[:3] == [1, 2, 300]
+        assert list(result["b"].cat.categories) == ["x", "y", "z"]
+        assert result["c"].isna().tolist() == [True, True, False, False]
+
+    def test_raises_without_chunks(self, tmp_path):
+        with pytest.raises(ValueError, match="No chunks"):
+            save_data_in_chunks([], tmp_path / "test.parquet")
+
+    def test_raises_for_unsupported_format(self, tmp_path):
+        with pytest.raises(ValueError, match="not supported"):
+            save_data_in_chunks([pd.DataFrame({"a": [1]})], tmp_path / "test.csv")
+
+
 class TestRoundTrip:
     @pytest.mark.parametrize("extension", [".csv", ".pickle", ".parquet", ".arrow"])
     def test_save_load_roundtrip(self, tmp_path, extension):
@@ -1,83 +1,38 @@
 """Tests for matching_probabilities cleaner functions."""
 
+import numpy as np
 import pandas as pd
 import pytest
 
 from liss_cleaning.make_final_datasets.cleaners.matching_probabilities import (
-    _check_answered_all_questions,
-    _check_eligible,
     _get_interval,
+    _get_interval_bounds,
+    clean_dataset,
+    get_interval_tuples,
 )
 
-
-class TestCheckAnsweredAllQuestions:
-    def test_returns_true_when_all_answered(self):
-        df = pd.DataFrame({
-            "mp_e0": [(0, 0.1)],
-            "mp_e1": [(0.1, 0.2)],
-            "mp_e2": [(0.2, 0.3)],
-            "mp_e3": [(0.3, 0.4)],
-            "mp_e1c": [(0.4, 0.5)],
-            "mp_e2c": [(0.5, 0.6)],
-            "mp_e3c": [(0.6, 0.7)],
-        })
-        assert _check_answered_all_questions(df)
-
-    def test_returns_false_when_one_missing(self):
-        df = pd.DataFrame({
-            "mp_e0": [pd.NA],
-            "mp_e1": [(0.1, 0.2)],
-            "mp_e2": [(0.2, 0.3)],
-            "mp_e3": [(0.3, 0.4)],
-            "mp_e1c": [(0.4, 0.5)],
-            "mp_e2c": [(0.5, 0.6)],
-            "mp_e3c": [(0.6, 0.7)],
-        })
-        assert not _check_answered_all_questions(df)
-
-    def test_returns_false_when_all_missing(self):
-        df = pd.DataFrame({
-            "mp_e0": [pd.NA],
-            "mp_e1": [pd.NA],
-            "mp_e2": [pd.NA],
-            "mp_e3": [pd.NA],
-            "mp_e1c": [pd.NA],
-            "mp_e2c": [pd.NA],
-            "mp_e3c": [pd.NA],
-        })
-        assert not _check_answered_all_questions(df)
-
-
-class TestCheckEligible:
-    def test_returns_true_with_two_waves(self):
-        df = pd.DataFrame({
-            "personal_id": [1, 1],
-            "wave": [1, 2],
-            "mp_e0": [(0, 0.1), (0, 0.1)],
-        })
-        assert _check_eligible(df)
-
-    def test_returns_false_with_one_wave(self):
-        df = pd.DataFrame({
-            "personal_id": [1],
-            "wave": [1],
-            "mp_e0": [(0, 0.1)],
-        })
-        assert not _check_eligible(df)
-
-    def test_returns_true_with_many_waves(self):
-        df = pd.DataFrame({
-            "personal_id": [1, 1, 1, 1],
-            "wave": [1, 2, 3, 4],
-            "mp_e0": [(0, 0.1)] * 4,
-        })
-        assert _check_eligible(df)
+PROBABILITIES = [
+    "50",
+    "90",
+    "10",
+    "95",
+    "70",
+    "30",
+    "5",
+    "99",
+    "80",
+    "60",
+    "40",
+    "20",
+    "1",
+]
 
 
 class TestGetInterval:
     @pytest.fixture
     def make_choice_row(self):
         """Factory to create a row with specified choices."""
+
         def _make_row(option, choices):
             """Create a series with choice columns for a given option.
 
@@ -86,11 +41,25 @@ class TestGetInterval:
                 choices: Dict mapping probability to choice ('AEX' or 'Lottery')
             """
             data = {}
-            for prob in ["50", "90", "10", "95", "70", "30", "5", "99", "80", "60",
-                         "40", "20", "1"]:
+            for prob in [
+                "50",
+                "90",
+                "10",
+                "95",
+                "70",
+                "30",
+                "5",
+                "99",
+                "80",
+                "60",
+                "40",
+                "20",
+                "1",
+            ]:
                 col = f"choice_aex_{option}_vs_{prob}"
                 data[col] = choices.get(prob, pd.NA)
             return pd.Series(data)
+
         return _make_row
 
     def test_returns_na_when_all_na(self, make_choice_row):
@@ -99,31 +68,126 @@ class TestGetInterval:
         assert pd.isna(result)
 
     def test_high_confidence_aex_returns_99_100(self, make_choice_row):
-        row = make_choice_row("e0", {
-            "50": "AEX",
-            "90": "AEX",
-            "95": "AEX",
-            "99": "AEX",
-        })
+        row = make_choice_row(
+            "e0",
+            {
+                "50": "AEX",
+                "90": "AEX",
+                "95": "AEX",
+                "99": "AEX",
+            },
+        )
         result = _get_interval(row, "e0")
         assert result == (0.99, 1)
 
     def test_low_confidence_lottery_returns_0_001(self, make_choice_row):
-        row = make_choice_row("e0", {
-            "50": "Lottery",
-            "10": "Lottery",
-            "5": "Lottery",
-            "1": "Lottery",
-        })
+        row = make_choice_row(
+            "e0",
+            {
+                "50": "Lottery",
+                "10": "Lottery",
+                "5": "Lottery",
+                "1": "Lottery",
+            },
+        )
         result = _get_interval(row, "e0")
         assert result == (0, 0.01)
 
     def test_middle_range_returns_correct_interval(self, make_choice_row):
-        row = make_choice_row("e0", {
-            "50": "AEX",
-            "90": "Lottery",
-            "70": "AEX",
-            "80": "Lottery",
-        })
+        row = make_choice_row(
+            "e0",
+            {
+                "50": "AEX",
+                "90": "Lottery",
+                "70": "AEX",
+                "80": "Lottery",
+            },
+        )
         result = _get_interval(row, "e0")
         assert result == (0.7, 0.8)
+
+
+class TestGetIntervalBounds:
+    @pytest.fixture
+    def random_choices(self):
+        rng = np.random.default_rng(0)
+        values = rng.choice(["AEX", "Lottery", None], size=(2000, len(PROBABILITIES)))
+        values[rng.random(2000) < 0.1] = None
+        dtype = pd.CategoricalDtype(categories=["AEX", "Lottery"])
+        return pd.DataFrame(
+            {
+                f"choice_aex_e0_vs_{prob}": pd.Series(values[:, i], dtype=dtype)
+                for i, prob in enumerate(PROBABILITIES)
+            }
+        )
+
+    def test_matches_row_wise_intervals(self, random_choices):
+        expected = random_choices.apply(lambda x: _get_interval(x, "e0"), axis=1)
+        lower, upper = _get_interval_bounds(random_choices, "e0")
+        for exp, low, high in zip(expected, lower, upper, strict=True):
+            if exp is pd.NA:
+                assert np.isnan(low)
+                assert np.isnan(high)
+            else:
+                assert exp == (low, high)
+
+    def test_accepts_object_columns(self, random_choices):
+        lower, upper = _get_interval_bounds(random_choices.astype(object), "e0")
+        expected_lower, expected_upper = _get_interval_bounds(random_choices, "e0")
+        np.testing.assert_array_equal(lower, expected_lower)
+        np.testing.assert_array_equal(upper, expected_upper)
+
+    def test_missing_answer_gives_zero_interval(self):
+        choices = pd.DataFrame(
+            {f"choice_aex_e0_vs_{prob}": [pd.NA] for prob in PROBABILITIES}
+        )
+        choices["choice_aex_e0_vs_50"] = "AEX"
+        lower, upper = _get_interval_bounds(choices, "e0")
+        assert (lower[0], upper[0]) == (0, 0)
+
+
+class TestGetIntervalTuples:
+    def test_reconstructs_exact_tuples(self, make_interval_columns):
+        df = pd.DataFrame(make_interval_columns({"e0": [(0.99, 1), (0, 0.01)]}))
+        result = get_interval_tuples(df, "e0")
+        assert result.tolist() == [(0.99, 1), (0, 0.01)]
+
+    def test_missing_interval_is_na(self, make_interval_columns):
+        df = pd.DataFrame(make_interval_columns({"e0": [pd.NA, (0.3, 0.4)]}))
+        result = get_interval_tuples(df, "e0")
+        assert result.iloc[0] is pd.NA
+        assert result.iloc[1] == (0.3, 0.4)
+
+
+class TestCleanDataset:
+    @pytest.fixture
+    def raw(self):
+        dtype = pd.CategoricalDtype(categories=["AEX", "Lottery"])
+        choices = {
+            f"choice_aex_{option}_vs_{prob}": pd.Series(
+                ["AEX", "AEX", "Lottery"], dtype=dtype
+            )
+            for option in ["e0", "e1", "e2", "e3", "e1c", "e2c", "e3c"]
+            for prob in PROBABILITIES
+        }
+        return pd.DataFrame(
+            {
+                "personal_id": [1, 1, 2],
+                "wave": [1, 2, 1],
+                "data_completion": pd.to_datetime(["2018-01-01"] * 3),
+                **choices,
+            }
+        )
+
+    def test_interval_columns_are_float32(self, raw):
+        result = clean_dataset(raw)
+        assert result["mp_e0_lower"].dtype == "float32[pyarrow]"
+        assert result["mp_e3c_upper"].dtype == "float32[pyarrow]"
+
+    def test_keeps_only_eligible_respondents(self, raw):
+        result = clean_dataset(raw)
+        assert result["personal_id"].tolist() == [1, 1]
+
+    def test_intervals_match_tuples(self, raw):
+        result = clean_dataset(raw)
+        assert get_interval_tuples(result, "e0").tolist() == [(0.99, 1), (0.99, 1)]
@@ -1,46 +1,110 @@
+import numpy as np
 import pandas as pd
 import pytest
 
 # Import the functions under test
+from liss_cleaning.helper_modules.general_cleaners import filter_complete_panel
 from liss_cleaning.make_final_datasets.cleaners.matching_probabilities import (
-    _check_answered_all_questions,
+    _get_question_columns,
 )
 
+ANSWERED = {
+    "e0": [(0, 0.1)],
+    "e1": [(0.1, 0.2)],
+    "e2": [(0.2, 0.3)],
+    "e3": [(0.3, 0.4)],
+    "e1c": [(0.4, 0.5)],
+    "e2c": [(0.5, 0.6)],
+    "e3c": [(0.6, 0.7)],
+}
+
+
+def _make_waves(make_interval_columns, personal_id, waves, missing_e0=()):
+    """Stack one row per wave of a respondent who answered all questions."""
+    rows = []
+    for wave in waves:
+        intervals = {**ANSWERED}
+        if wave in missing_e0:
+            intervals["e0"] = [pd.NA]
+        rows.append(
+            pd.DataFrame(
+                {
+                    "personal_id": [personal_id],
+                    "wave": [wave],
+                    **make_interval_columns(intervals),
+                    "survey_completion": pd.to_datetime(["2018-01-01"]),
+                }
+            )
+        )
+    return pd.concat(rows, ignore_index=True)
+
 
 @pytest.fixture
-def individuals():
+def individuals(make_interval_columns):
     return {
-        "answered_all_participated_waves": pd.DataFrame(
-            {
-                "personal_id": [1],
-                "wave": [1],
-                "mp_e0": [(0, 0.1)],
-                "mp_e1": [(0.1, 0.2)],
-                "mp_e2": [(0.2, 0.3)],
-                "mp_e3": [(0.3, 0.4)],
-                "mp_e1c": [(0.4, 0.5)],
-                "mp_e2c": [(0.5, 0.6)],
-                "mp_e3c": [(0.6, 0.7)],
-            }
+        "answered_all_participated_waves": _make_waves(
+            make_interval_columns, 1, [1, 2]
         ),
-        "not_answered_all_participated_waves": pd.DataFrame(
-            {
-                "personal_id": [1],
-                "wave": [1],
-                "mp_e0": [pd.NA],
-                "mp_e1": [(0.1, 0.2)],
-                "mp_e2": [(0.2, 0.3)],
-                "mp_e3": [(0.3, 0.4)],
-                "mp_e1c": [(0.4, 0.5)],
-                "mp_e2c": [(0.5, 0.6)],
-                "mp_e3c": [(0.6, 0.7)],
-            }
+        "not_answered_all_participated_waves": _make_waves(
+            make_interval_columns, 1, [1, 2], missing_e0=[1]
         ),
+        "one_wave": _make_waves(make_interval_columns, 1, [1]),
+        "many_waves": _make_waves(make_interval_columns, 1, [1, 2, 3, 4]),
     }
 
 
+def _filter(df):
+    return filter_complete_panel(df, _get_question_columns(), min_waves=2)
+
+
 def test_check_answered_all_participated_waves(individuals):
     df_true = individuals["answered_all_participated_waves"]
     df_false = individuals["not_answered_all_participated_waves"]
-    assert _check_answered_all_questions(df_true)
-    assert not _check_answered_all_questions(df_false)
+    assert len(_filter(df_true)) == 2
+    assert _filter(df_false).empty
+
+
+def test_drops_respondents_with_one_wave(individuals):
+    assert _filter(individuals["one_wave"]).empty
+
+
+def test_keeps_respondents_with_many_waves(individuals):
+    assert len(_filter(individuals["many_waves"])) == 4
+
+
+def test_drops_unanswered_wave_but_keeps_respondent(make_interval_columns):
+    df = _make_waves(make_interval_columns, 1, [1, 2, 3], missing_e0=[2])
+    assert _filter(df)["wave"].tolist() == [1, 3]
+
+
+def test_counts_complete_rows_of_one_wave_once(make_interval_columns):
+    df = _make_waves(make_interval_columns, 1, [1, 1])
+    assert _filter(df).empty
+
+
+def test_rows_with_other_missing_values_do_not_count(individuals):
+    df = individuals["answered_all_participated_waves"]
+    df.loc[1, "survey_completion"] = pd.NaT
+    assert _filter(df).empty
+
+
+def test_matches_groupby_filter():
+    rng = np.random.default_rng(0)
+    n_rows = 500
+    df = pd.DataFrame(
+        {
+            "personal_id": rng.integers(0, 100, n_rows),
+            "wave": rng.integers(1, 5, n_rows),
+            "q1": np.where(rng.random(n_rows) < 0.1, np.nan, 1.0),
+            "q2": np.where(rng.random(n_rows) < 0.1, np.nan, 1.0),
+            "other": np.where(rng.random(n_rows) < 0.1, np.nan, 1.0),
+        }
+    )
+    expected = df.groupby(["personal_id", "wave"]).filter(
+        lambda x: x[["q1", "q2"]].notna().all(axis=1).all()
+    )
+    expected = expected.groupby("personal_id").filter(
+        lambda x: x.dropna()["wave"].nunique() >= 2
+    )
+    result = filter_complete_panel(df, ["q1", "q2"], min_waves=2)
+    pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,64 @@
+"""Tests for monthly_background_variables_cleaner helper functions."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from liss_cleaning.raw_datasets_cleaning.cleaners.monthly_background_variables_cleaner import (  # noqa: E501
+    RAW_COLUMNS,
+    _get_date_month,
+    _get_year_and_month,
+    clean_dataset,
+)
+
+INCOME_COLUMNS = ["brutohh_f", "brutoink_f", "nettohh_f", "nettoink_f"]
+
+
+class TestGetDateMonth:
+    def test_formats_year_and_month(self):
+        result = _get_date_month("avars_201905_EN_1.0p.dta")
+        assert result == "2019-05"
+
+    def test_ignores_folder(self):
+        result = _get_date_month("001-background-variables/avars_201905_EN_1.0p.dta")
+        assert result == "2019-05"
+
+
+class TestGetYearAndMonth:
+    def test_returns_integers(self):
+        result = _get_year_and_month("avars_201905_EN_1.0p.dta")
+        assert result == (2019, 5)
+
+
+@pytest.fixture
+def raw():
+    rng = np.random.default_rng(0)
+    n = 20
+    raw = pd.DataFrame({column: rng.integers(1, 5, n) for column in RAW_COLUMNS})
+    raw["nomem_encr"] = rng.integers(800000, 900000, n)
+    for column in INCOME_COLUMNS:
+        raw[column] = rng.choice([0.0, 1500.0, np.nan], n)
+    for column in ["brutoink", "nettoink", "netinc"]:
+        raw[column] = pd.Categorical(rng.choice(["1500", "2300", "I don't know"], n))
+    return raw
+
+
+class TestCleanDataset:
+    def test_keeps_income_columns(self, raw):
+        result = clean_dataset(raw, "avars_201905_EN_1.0p.dta")
+        assert result["gross_income_hh"].dtype == "float32[pyarrow]"
+        assert (
+            result["net_income_hh"].isna().tolist() == raw["nettohh_f"].isna().tolist()
+        )
+
+    def test_missing_income_columns_are_na(self, raw):
+        result = clean_dataset(
+            raw.drop(columns=INCOME_COLUMNS), "avars_201905_EN_1.0p.dta"
+        )
+        for column in [
+            "gross_income_hh",
+            "gross_income_imputed_personal",
+            "net_income_hh",
+            "net_income_imputed_personal",
+        ]:
+            assert result[column].isna().all()
@@ -0,0 +1,81 @@
+"""Tests for registry module."""
+
+import json
+import os
+
+import pytest
+
+from liss_cleaning.config import BLD_STACKED
+from liss_cleaning.helper_modules.stacked_store import get_manifest_path
+from liss_cleaning.raw_datasets_cleaning.registry import (
+    CATALOG_STACKED_DATASETS,
+    SURVEY_FOLDERS,
+    get_raw_paths,
+)
+
+SURVEY = "monthly_background_variables"
+
+
+@pytest.fixture
+def src_data(tmp_path):
+    folder = tmp_path / "data" / SURVEY_FOLDERS[SURVEY]
+    (folder / "2019").mkdir(parents=True)
+    for name in [
+        "avars_201801_EN_1.0p.dta",
+        "avars_201802_EN_1.0p_do_not_use.dta",
+        "notes.txt",
+        "2019/avars_201901_EN_1.0p.dta",
+    ]:
+        (folder / name).write_bytes(b"")
+    return tmp_path / "data"
+
+
+def _get_raw_names(src_data, index_path):
+    paths = get_raw_paths(SURVEY, src_data=src_data, index_path=index_path)
+    folder = src_data / SURVEY_FOLDERS[SURVEY]
+    return [path.relative_to(folder).as_posix() for path in paths]
+
+
+class TestGetRawPaths:
+    def test_finds_raw_files(self, tmp_path, src_data):
+        result = _get_raw_names(src_data, tmp_path / "index.json")
+        assert result == ["2019/avars_201901_EN_1.0p.dta", "avars_201801_EN_1.0p.dta"]
+
+    def test_reuses_index_if_folders_unchanged(self, tmp_path, src_data):
+        index_path = tmp_path / "index.json"
+        _get_raw_names(src_data, index_path)
+        index = json.loads(index_path.read_text())
+        folder = str(src_data / SURVEY_FOLDERS[SURVEY])
+        index["folders"][folder]["files"] = ["from_index.dta"]
+        index_path.write_text(json.dumps(index))
+        assert _get_raw_names(src_data, index_path) == ["from_index.dta"]
+
+    def test_finds_new_file_in_subfolder(self, tmp_path, src_data):
+        index_path = tmp_path / "index.json"
+        _get_raw_names(src_data, index_path)
+        subfolder = src_data / SURVEY_FOLDERS[SURVEY] / "2019"
+        (subfolder / "avars_201902_EN_1.0p.dta").write_bytes(b"")
+        # Make sure the change is visible with a coarse mtime resolution.
+        os.utime(subfolder, ns=(0, 0))
+        assert "2019/avars_201902_EN_1.0p.dta" in _get_raw_names(src_data, index_path)
+
+    def test_forgets_removed_subfolder(self, tmp_path, src_data):
+        index_path = tmp_path / "index.json"
+        _get_raw_names(src_data, index_path)
+        subfolder = src_data / SURVEY_FOLDERS[SURVEY] / "2019"
+        (subfolder / "avars_201901_EN_1.0p.dta").unlink()
+        subfolder.rmdir()
+        assert _get_raw_names(src_data, index_path) == ["avars_201801_EN_1.0p.dta"]
+
+    def test_skips_missing_survey_with_warning(self, tmp_path):
+        with pytest.warns(UserWarning, match=SURVEY):
+            result = get_raw_paths(
+                SURVEY, src_data=tmp_path, index_path=tmp_path / "index.json"
+            )
+        assert result == []
+
+
+class TestCatalogs:
+    def test_stacked_row_local_survey_is_registered(self):
+        node = CATALOG_STACKED_DATASETS[f"{SURVEY}_stacked"]
+        assert node.path == get_manifest_path(BLD_STACKED, SURVEY)
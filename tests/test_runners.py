@@ -0,0 +1,176 @@
+"""Tests for runners module."""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from liss_cleaning.helper_modules import load_save
+from liss_cleaning.helper_modules.load_save import (
+    _iter_stata_chunks,
+    get_file_hash,
+    load_data,
+)
+from liss_cleaning.helper_modules.stacked_store import concat_waves
+from liss_cleaning.raw_datasets_cleaning.cleaners import (
+    monthly_background_variables_cleaner,
+)
+from liss_cleaning.raw_datasets_cleaning.runners import (
+    clean_dataset_in_chunks,
+    clean_survey,
+)
+
+
+@pytest.fixture
+def raw_path(tmp_path):
+    rng = np.random.default_rng(0)
+    n_rows = 1000
+    raw = pd.DataFrame(
+        {
+            column: rng.integers(1, 5, n_rows)
+            for column in monthly_background_variables_cleaner.RAW_COLUMNS
+        }
+    )
+    raw["nomem_encr"] = rng.integers(800000, 900000, n_rows)
+    raw["geslacht"] = pd.Categorical(rng.choice(["Male", "Female"], n_rows))
+    for column in ["brutoink", "nettoink", "netinc"]:
+        raw[column] = pd.Categorical(
+            rng.choice(["1500", "2300.5", "I don't know"], n_rows)
+        )
+    raw["nettoink_f"] = rng.normal(2000, 500, n_rows)
+    raw.loc[::7, "nettoink_f"] = np.nan
+    # Only the first chunk needs a wider integer type.
+    raw.loc[:100, "leeftijd"] = 300
+    path = tmp_path / "avars_201801_EN_1.0p.parquet"
+    raw.to_parquet(path)
+    return path
+
+
+class TestCleanDatasetInChunks:
+    def test_matches_cleaning_in_memory(self, tmp_path, raw_path):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expected = monthly_background_variables_cleaner.clean_dataset(
+                load_data(raw_path), raw_path.name
+            )
+            out_path = clean_dataset_in_chunks(
+                raw_path,
+                tmp_path / "cleaned.parquet",
+                monthly_background_variables_cleaner.clean_dataset,
+                monthly_background_variables_cleaner.get_raw_columns,
+                chunksize=300,
+            )
+        result = load_data(out_path)
+        pd.testing.assert_frame_equal(
+            result, expected, check_categorical=False, check_dtype=False
+        )
+        assert result.dtypes.astype(str).equals(expected.dtypes.astype(str))
+
+    def test_second_run_reads_cached_stata_wave(self, tmp_path, raw_path, monkeypatch):
+        stata_path = raw_path.with_suffix(".dta")
+        pd.read_parquet(raw_path).to_stata(stata_path, write_index=False)
+        calls = []
+
+        def count_stata_reads(*args):
+            calls.append(args)
+            return _iter_stata_chunks(*args)
+
+        monkeypatch.setattr(load_save, "_iter_stata_chunks", count_stata_reads)
+        results = []
+        for run in ["cold", "warm"]:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                out_path = clean_dataset_in_chunks(
+                    stata_path,
+                    tmp_path / f"{run}.parquet",
+                    monthly_background_variables_cleaner.clean_dataset,
+                    monthly_background_variables_cleaner.get_raw_columns,
+                    chunksize=300,
+                    cache_dir=tmp_path / "cache",
+                    content_hash=get_file_hash(stata_path),
+                )
+            results.append(load_data(out_path))
+        assert len(calls) == 1
+        pd.testing.assert_frame_equal(results[1], results[0])
+
+    def test_monthly_cleaner_is_row_local(self):
+        assert monthly_background_variables_cleaner.ROW_LOCAL
+
+
+@pytest.fixture
+def raw_paths(tmp_path, raw_path):
+    raw = pd.read_parquet(raw_path)
+    paths = [raw_path]
+    for month, n_rows in [("201802", 400), ("201803", 10)]:
+        path = tmp_path / f"avars_{month}_EN_1.0p.parquet"
+        raw.iloc[:n_rows].to_parquet(path)
+        paths.append(path)
+    return paths
+
+
+def _clean_in_memory(paths):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return concat_waves(
+            [
+                monthly_background_variables_cleaner.clean_dataset(
+                    load_data(path), path.name
+                )
+                for path in paths
+            ]
+        )
+
+
+class TestCleanSurvey:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_matches_stacking_in_memory(self, tmp_path, raw_paths, workers):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            result = clean_survey(
+                "monthly_background_variables",
+                workers=workers,
+                paths=raw_paths,
+                cache_dir=tmp_path / "cache",
+            )
+        pd.testing.assert_frame_equal(result, _clean_in_memory(raw_paths))
+
+    def test_keeps_order_of_paths(self, raw_paths):
+        paths = raw_paths[::-1]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            result = clean_survey(
+                "monthly_background_variables", workers=2, paths=paths, cache_dir=None
+            )
+        assert result["month"].tolist() == _clean_in_memory(paths)["month"].tolist()
+
+    def test_raises_with_every_failed_wave(self, tmp_path, raw_paths):
+        broken = [tmp_path / "avars_201804_EN_1.0p.parquet"]
+        broken.append(tmp_path / "avars_201805_EN_1.0p.parquet")
+        for path in broken:
+            path.write_text("not a parquet file")
+        with pytest.raises(RuntimeError, match="2 wave") as error:
+            clean_survey(
+                "monthly_background_variables",
+                workers=2,
+                paths=raw_paths + broken,
+                cache_dir=None,
+            )
+        assert all(path.name in str(error.value) for path in broken)
+
+    def test_warns_and_stacks_the_other_waves(self, tmp_path, raw_paths):
+        broken = tmp_path / "avars_201804_EN_1.0p.parquet"
+        broken.write_text("not a parquet file")
+        with pytest.warns(UserWarning, match=broken.name):
+            result = clean_survey(
+                "monthly_background_variables",
+                workers=1,
+                paths=[broken, *raw_paths],
+                errors="warn",
+                cache_dir=None,
+            )
+        pd.testing.assert_frame_equal(result, _clean_in_memory(raw_paths))
+
+    def test_invalid_errors(self, raw_paths):
+        with pytest.raises(ValueError, match="errors"):
+            clean_survey("monthly_background_variables", paths=raw_paths, errors="x")
@@ -0,0 +1,197 @@
+"""Tests for stacked_store module."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from liss_cleaning.helper_modules.stacked_store import (
+    concat_waves,
+    get_partition_path,
+    load_stacked,
+    open_stacked,
+    update_manifest,
+)
+
+
+def _write_wave(store_dir, wave, df):
+    path = get_partition_path(store_dir, "survey", wave)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path, index=False)
+    return path
+
+
+@pytest.fixture
+def store_dir(tmp_path):
+    _write_wave(
+        tmp_path,
+        "w1",
+        pd.DataFrame(
+            {
+                "a": pd.array([1, 2], dtype="uint8[pyarrow]"),
+                "b": pd.Categorical(["x", "y"]),
+                "empty": [None, None],
+            }
+        ),
+    )
+    _write_wave(
+        tmp_path,
+        "w2",
+        pd.DataFrame(
+            {
+                "a": pd.array([300], dtype="uint16[pyarrow]"),
+                "b": pd.Categorical(["z"]),
+                "empty": [None],
+                "c": [1.5],
+            }
+        ),
+    )
+    return tmp_path
+
+
+class TestUpdateManifest:
+    def test_registers_waves(self, store_dir):
+        manifest_path = update_manifest(store_dir, "survey", ["w1", "w2"])
+        result = load_stacked(manifest_path)
+        assert result["a"].tolist() == [1, 2, 300]
+        assert result["a"].dtype == "uint16[pyarrow]"
+        assert list(result["b"].cat.categories) == ["x", "y", "z"]
+        assert result["c"].isna().tolist() == [True, True, False]
+
+    def test_keeps_columns_empty_in_all_waves(self, store_dir):
+        manifest_path = update_manifest(store_dir, "survey", ["w1", "w2"])
+        assert load_stacked(manifest_path)["empty"].isna().all()
+
+    def test_matches_concat_waves(self, store_dir):
+        manifest_path = update_manifest(store_dir, "survey", ["w1", "w2"])
+        waves = [
+            pd.read_parquet(get_partition_path(store_dir, "survey", wave))
+            for wave in ["w1", "w2"]
+        ]
+        pd.testing.assert_frame_equal(load_stacked(manifest_path), concat_waves(waves))
+
+    def test_removes_partitions_of_dropped_waves(self, store_dir):
+        update_manifest(store_dir, "survey", ["w1", "w2"])
+        manifest_path = update_manifest(store_dir, "survey", ["w2"])
+        assert not get_partition_path(store_dir, "survey", "w1").exists()
+        assert load_stacked(manifest_path)["a"].tolist() == [300]
+
+    def test_rereads_only_changed_partitions(self, store_dir, monkeypatch):
+        update_manifest(store_dir, "survey", ["w1", "w2"])
+        _write_wave(store_dir, "w3", pd.DataFrame({"a": [7]}))
+        read = []
+        monkeypatch.setattr(
+            "liss_cleaning.helper_modules.stacked_store._get_partition_entry",
+            lambda path: read.append(path.name) or {"file": path.name},
+        )
+        update_manifest(store_dir, "survey", ["w1", "w2", "w3"])
+        assert read == ["wave=w3.parquet"]
+
+
+class TestConcatWaves:
+    def test_unifies_numeric_types(self):
+        result = concat_waves(
+            [
+                pd.DataFrame({"a": pd.array([1], dtype="uint8[pyarrow]")}),
+                pd.DataFrame({"a": pd.array([-1], dtype="int16[pyarrow]")}),
+            ]
+        )
+        assert result["a"].dtype == "int16[pyarrow]"
+        assert result["a"].tolist() == [1, -1]
+
+    def test_ignores_types_of_empty_columns(self):
+        result = concat_waves(
+            [
+                pd.DataFrame({"a": pd.array([1.5], dtype="float32[pyarrow]")}),
+                pd.DataFrame({"a": [np.nan]}),
+            ]
+        )
+        assert result["a"].dtype == "float32[pyarrow]"
+
+    def test_unions_categories(self):
+        result = concat_waves(
+            [
+                pd.DataFrame({"a": pd.Categorical(["x"], categories=["x", "y"])}),
+                pd.DataFrame({"a": pd.Categorical(["z"])}),
+            ]
+        )
+        assert isinstance(result["a"].dtype, pd.CategoricalDtype)
+        assert list(result["a"].cat.categories) == ["x", "y", "z"]
+        assert result["a"].tolist() == ["x", "z"]
+
+    def test_fills_missing_columns(self):
+        result = concat_waves(
+            [pd.DataFrame({"a": [1]}), pd.DataFrame({"a": [2], "b": [3.0]})]
+        )
+        assert result.columns.tolist() == ["a", "b"]
+        assert result["b"].isna().tolist() == [True, False]
+        assert result.index.equals(pd.RangeIndex(2))
+
+    def test_stacks_incompatible_types_as_strings(self):
+        with pytest.warns(UserWarning, match="stacked as strings"):
+            result = concat_waves(
+                [
+                    pd.DataFrame({"a": [1.5, np.nan]}),
+                    pd.DataFrame({"a": pd.Categorical(["x"])}),
+                ]
+            )
+        assert result["a"].tolist() == ["1.5", None, "x"]
+
+    def test_warns_for_different_orders_of_ordered_categories(self):
+        with pytest.warns(UserWarning, match="different order"):
+            result = concat_waves(
+                [
+                    pd.DataFrame(
+                        {"a": pd.Categorical(["low"], ["low", "high"], ordered=True)}
+                    ),
+                    pd.DataFrame(
+                        {"a": pd.Categorical(["low"], ["high", "low"], ordered=True)}
+                    ),
+                ]
+            )
+        assert result["a"].tolist() == ["low", "low"]
+
+    def test_keeps_consistent_orders_of_ordered_categories(self, recwarn):
+        result = concat_waves(
+            [
+                pd.DataFrame(
+                    {"a": pd.Categorical(["low"], ["low", "mid"], ordered=True)}
+                ),
+                pd.DataFrame(
+                    {"a": pd.Categorical(["high"], ["mid", "high"], ordered=True)}
+                ),
+            ]
+        )
+        assert not recwarn.list
+        assert result["a"].cat.ordered
+        assert list(result["a"].cat.categories) == ["low", "mid", "high"]
+
+    def test_mixed_ordered_categories_become_unordered(self):
+        with pytest.warns(UserWarning, match="unordered categorical"):
+            result = concat_waves(
+                [
+                    pd.DataFrame({"a": pd.Categorical(["x"], ordered=True)}),
+                    pd.DataFrame({"a": pd.Categorical(["y"])}),
+                ]
+            )
+        assert not result["a"].cat.ordered
+        assert result["a"].tolist() == ["x", "y"]
+
+
+class TestOpenStacked:
+    def test_reads_selected_columns(self, store_dir):
+        manifest_path = update_manifest(store_dir, "survey", ["w1", "w2"])
+        result = open_stacked(manifest_path).to_table(columns=["c"]).to_pandas()
+        assert list(result.columns) == ["c"]
+
+    def test_raises_without_waves(self, store_dir):
+        manifest_path = update_manifest(store_dir, "survey", [])
+        with pytest.raises(ValueError, match="No waves"):
+            open_stacked(manifest_path)
+
+    def test_reads_incompatible_types_as_strings(self, tmp_path):
+        _write_wave(tmp_path, "w1", pd.DataFrame({"a": pd.Categorical(["x"])}))
+        _write_wave(tmp_path, "w2", pd.DataFrame({"a": [1.5]}))
+        manifest_path = update_manifest(tmp_path, "survey", ["w1", "w2"])
+        with pytest.warns(UserWarning, match="stacked as strings"):
+            result = load_stacked(manifest_path)
+        assert result["a"].tolist() == ["x", "1.5"]
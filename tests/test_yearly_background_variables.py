@@ -0,0 +1,154 @@
+"""Tests for yearly_background_variables cleaner functions."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from liss_cleaning.make_final_datasets.cleaners.yearly_background_variables import (
+    YEARLY_AGGREGATIONS,
+    _aggregate_by_index,
+    _get_most_common_for_index,
+    _groupwise_mode,
+    clean_dataset,
+)
+
+
+@pytest.fixture
+def monthly():
+    return pd.DataFrame(
+        {
+            "personal_id": [1, 1, 1, 2, 2],
+            "year": [2020, 2020, 2020, 2020, 2021],
+            "age": [40, 41, 41, 30, np.nan],
+            "income": [100.0, np.nan, 200.0, 50.0, 60.0],
+            "gender": pd.Categorical([np.nan, "Male", "Female", "Female", "Female"]),
+        }
+    )
+
+
+@pytest.fixture
+def aggregations():
+    return {
+        "age": ("median", "int"),
+        "income": ("mean", "float"),
+        "gender": ("first", "category"),
+    }
+
+
+class TestAggregateByIndex:
+    def test_returns_one_row_per_group(self, monthly, aggregations):
+        result = _aggregate_by_index(monthly, ["personal_id", "year"], aggregations)
+        assert result.index.tolist() == [(1, 2020), (2, 2020), (2, 2021)]
+
+    def test_median_is_rounded_to_lowest_int_dtype(self, monthly, aggregations):
+        result = _aggregate_by_index(monthly, ["personal_id", "year"], aggregations)
+        assert result["age"].dtype == "uint8[pyarrow]"
+        assert result["age"].tolist()[:2] == [41, 30]
+
+    def test_mean_skips_missing_values(self, monthly, aggregations):
+        result = _aggregate_by_index(monthly, ["personal_id", "year"], aggregations)
+        assert result.loc[(1, 2020), "income"] == 150.0
+
+    def test_first_skips_missing_values(self, monthly, aggregations):
+        result = _aggregate_by_index(monthly, ["personal_id", "year"], aggregations)
+        assert result.loc[(1, 2020), "gender"] == "Male"
+        assert isinstance(result["gender"].dtype, pd.CategoricalDtype)
+
+    def test_all_missing_group_is_na(self, monthly, aggregations):
+        result = _aggregate_by_index(monthly, ["personal_id", "year"], aggregations)
+        assert pd.isna(result.loc[(2, 2021), "age"])
+
+    def test_missing_column_is_na(self, monthly):
+        result = _aggregate_by_index(
+            monthly, ["personal_id", "year"], {"origin": ("first", "category")}
+        )
+        assert result["origin"].isna().all()
+
+
+class TestGroupwiseMode:
+    def test_picks_most_common_value(self):
+        sr = pd.Series(["b", "a", "a", "c", "c", "c"], dtype="category")
+        result = _groupwise_mode(np.array([0, 0, 0, 1, 1, 1]), 2, sr)
+        assert list(result) == ["a", "c"]
+
+    def test_ties_go_to_first_observed_value(self):
+        sr = pd.Series(["b", "a", "a", "b"], dtype="category")
+        result = _groupwise_mode(np.array([0, 0, 1, 1]), 2, sr)
+        assert list(result) == ["b", "a"]
+
+    def test_ignores_missing_values(self):
+        sr = pd.Series([np.nan, np.nan, "a", np.nan], dtype="category")
+        result = _groupwise_mode(np.array([0, 0, 0, 1]), 2, sr)
+        assert result[0] == "a"
+        assert pd.isna(result[1])
+
+    def test_ignores_rows_without_group(self):
+        sr = pd.Series(["a", "b", "b"], dtype="category")
+        result = _groupwise_mode(np.array([0, -1, -1]), 1, sr)
+        assert list(result) == ["a"]
+
+    def test_keeps_categorical_dtype(self):
+        dtype = pd.CategoricalDtype(["low", "high"], ordered=True)
+        sr = pd.Series(["high", "low", "high"], dtype=dtype)
+        result = _groupwise_mode(np.array([0, 0, 0]), 1, sr)
+        assert result.dtype == dtype
+
+
+class TestGetMostCommonForIndex:
+    def test_returns_mode_per_group(self, monthly):
+        result = _get_most_common_for_index(monthly, ["personal_id", "year"], "gender")
+        assert result.tolist() == ["Male", "Female", "Female"]
+
+
+class TestCleanDataset:
+    @pytest.fixture
+    def monthly_background_variables(self):
+        default_values = {"int": 40, "float": 1.0, "category": "a"}
+        df = pd.DataFrame(
+            {
+                column: [default_values[dtype]] * 4
+                for column, (_, dtype) in YEARLY_AGGREGATIONS.items()
+            }
+        )
+        df["personal_id"] = [1, 1, 2, 2]
+        df["year"] = pd.array([2020, 2020, 2020, 2021], dtype="uint16[pyarrow]")
+        df["month"] = pd.array([1, 2, 1, 1], dtype="uint8[pyarrow]")
+        df["gender"] = pd.Categorical([np.nan, "Male", "Female", "Female"])
+        df["net_income_hh"] = [np.nan, 1000.0, 2000.0, 3000.0]
+        return df
+
+    @pytest.fixture
+    def economic_situation_assets(self):
+        return pd.DataFrame(
+            {
+                "personal_id": [1, 2],
+                "year": [2020, 2020],
+                "total_wealth": [10.0, 20.0],
+                "has_risky_assets": ["No", "Yes"],
+                "share_risky_assets": [0.0, 0.5],
+            }
+        )
+
+    def test_returns_one_row_per_person_year(
+        self, monthly_background_variables, economic_situation_assets
+    ):
+        result = clean_dataset(monthly_background_variables, economic_situation_assets)
+        assert result[["personal_id", "year"]].values.tolist() == [
+            [1, 2020],
+            [2, 2020],
+            [2, 2021],
+        ]
+
+    def test_uses_later_months_if_first_is_missing(
+        self, monthly_background_variables, economic_situation_assets
+    ):
+        result = clean_dataset(monthly_background_variables, economic_situation_assets)
+        assert result.loc[0, "gender"] == "Male"
+        assert result.loc[0, "net_income_hh"] == 1000.0
+
+    def test_merges_assets(
+        self, monthly_background_variables, economic_situation_assets
+    ):
+        result = clean_dataset(monthly_background_variables, economic_situation_assets)
+        assert result["total_wealth"].tolist()[:2] == [10.0, 20.0]
+        assert pd.isna(result.loc[2, "total_wealth"])